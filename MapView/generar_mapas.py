@@ -1,7 +1,16 @@
 import json
+import os
+import sys
+
 import folium
-from collections import Counter
-import random
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data_loader import dataset_hash
+from src.visualizations.capas import add_network_layers, network_layers
+
+
+ARCHIVOS = ('../data/processed/aeropuertos.json', '../data/processed/rutas.json')
 
 
 def cargar_datos():
@@ -22,62 +31,14 @@ def mapa_global(aeropuertos, rutas):
         tiles='OpenStreetMap'
     )
 
-    # Número total de vuelos que llegan y salen de un aeropuerto
-    grados = Counter()
-    for ruta in rutas:
-        grados[ruta['origen']] += 1
-        grados[ruta['destino']] += 1
-
-    # Agregar aeropuertos
-    aeropuertos_muestra = random.sample(
-        list(aeropuertos.items()),
-        min(800, len(aeropuertos))
+    # Toda la red sin muestreo: rutas agregadas por zoom y aeropuertos en
+    # clusters; las capas se regeneran solo si cambian los datos
+    capas = network_layers(
+        aeropuertos, rutas,
+        cache_path='../data/processed/red_global.json',
+        version=dataset_hash(ARCHIVOS)
     )
-
-    for iata, datos in aeropuertos_muestra:
-        # Tamaño según conexiones
-        conexiones = grados.get(iata, 0)
-
-        if conexiones > 100:
-            radius = 6
-            color = 'red'
-            fillColor = 'red'
-        elif conexiones > 50:
-            radius = 4
-            color = 'orange'
-            fillColor = 'orange'
-        else:
-            radius = 2
-            color = 'blue'
-            fillColor = 'lightblue'
-
-        folium.CircleMarker(
-            location=[datos['latitud'], datos['longitud']],
-            radius=radius,
-            popup=f"<b>{iata}</b><br>{datos['ciudad']}<br>{datos['pais']}<br>{conexiones} conexiones",
-            color=color,
-            fill=True,
-            fillColor=fillColor,
-            fillOpacity=0.7
-        ).add_to(mapa)
-
-    # Agregar rutas
-    rutas_muestra = random.sample(rutas, min(300, len(rutas)))
-
-    for ruta in rutas_muestra:
-        origen_datos = aeropuertos.get(ruta['origen'])
-        destino_datos = aeropuertos.get(ruta['destino'])
-
-        if origen_datos and destino_datos:
-            folium.PolyLine(
-                locations=[
-                    [origen_datos['latitud'], origen_datos['longitud']],
-                    [destino_datos['latitud'], destino_datos['longitud']]
-                ],
-                color='red',
-                weight=1,
-                opacity=0.2
-            ).add_to(mapa)
+    add_network_layers(mapa, capas, color='red', opacity=0.2)
 
     # Guardar
     mapa.save('mapa_global.html')
@@ -93,6 +54,10 @@ def mapa_sudamerica(aeropuertos, rutas):
         iata: datos for iata, datos in aeropuertos.items()
         if datos['pais'] in paises_sudamerica
     }
+    rutas_sa = [
+        ruta for ruta in rutas
+        if ruta['origen'] in aeropuertos_sa and ruta['destino'] in aeropuertos_sa
+    ]
 
     # Mapa  Sudamérica
     mapa = folium.Map(
@@ -101,52 +66,15 @@ def mapa_sudamerica(aeropuertos, rutas):
         tiles='OpenStreetMap'
     )
 
-    # Calcular conexiones
-    grados = Counter()
-    for ruta in rutas:
-        if ruta['origen'] in aeropuertos_sa and ruta['destino'] in aeropuertos_sa:
-            grados[ruta['origen']] += 1
-            grados[ruta['destino']] += 1
-
-    # Agregar aeropuertos
-    for iata, datos in aeropuertos_sa.items():
-        conexiones = grados.get(iata, 0)
-
-        if conexiones > 20:
-            radius = 8
-            color = 'red'
-        elif conexiones > 10:
-            radius = 5
-            color = 'orange'
-        else:
-            radius = 3
-            color = 'blue'
-
-        folium.CircleMarker(
-            location=[datos['latitud'], datos['longitud']],
-            radius=radius,
-            popup=f"<b>{iata}</b><br>{datos['ciudad']}<br>{conexiones} conexiones",
-            color=color,
-            fill=True,
-            fillColor=color,
-            fillOpacity=0.8
-        ).add_to(mapa)
-
-    # Agregar rutas internas de Sudamérica
-    for ruta in rutas:
-        if ruta['origen'] in aeropuertos_sa and ruta['destino'] in aeropuertos_sa:
-            origen_datos = aeropuertos_sa[ruta['origen']]
-            destino_datos = aeropuertos_sa[ruta['destino']]
-
-            folium.PolyLine(
-                locations=[
-                    [origen_datos['latitud'], origen_datos['longitud']],
-                    [destino_datos['latitud'], destino_datos['longitud']]
-                ],
-                color='blue',
-                weight=1.5,
-                opacity=0.4
-            ).add_to(mapa)
+    # Rutas internas agregadas por zoom; tamaños segun conexiones internas
+    capas = network_layers(
+        aeropuertos_sa, rutas_sa,
+        levels=((0, 2.0), (5, 0.0)),
+        cache_path='../data/processed/red_sudamerica.json',
+        version=dataset_hash(ARCHIVOS),
+        degree_styles=((21, 8, 'red'), (11, 5, 'orange'), (0, 3, 'blue'))
+    )
+    add_network_layers(mapa, capas, color='blue', opacity=0.4)
 
     mapa.save('mapa_sudamerica.html')
 
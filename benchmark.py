@@ -0,0 +1,412 @@
+import argparse
+import csv
+import heapq
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from src.algorithms.all_pairs import attach_all_pairs
+from src.algorithms.alt import attach_landmarks, find_shortest_path_alt
+from src.algorithms.astar import find_shortest_path_astar, heuristic_is_valid
+from src.algorithms.bfs import find_fewest_stops
+from src.algorithms.constrained import find_shortest_path_constrained
+from src.algorithms.contraction import attach_hierarchies
+from src.algorithms.csa import Timetable, earliest_arrival
+from src.algorithms.dfs import reachability_index
+from src.algorithms.dijkstra import (
+    find_shortest_path, find_shortest_path_bidirectional, find_shortest_path_forward,
+    find_shortest_path_legacy
+)
+from src.algorithms.hop_bounded import find_shortest_path_hop_bounded
+from src.algorithms.pareto import find_pareto_front
+from src.algorithms.yen import find_k_shortest_paths
+from src.calculators.distancia import haversine
+from src.data_loader import dataset_hash, load_processed_data, loaded_files
+from src.graph.grafo import CompiledGraph, Graph
+from src.instrumentacion import snapshot, start_run
+from src.validators.restricciones import Constraints
+
+
+PROCESSED_DIR = 'data/processed'
+OUTPUT_PREFIX = 'data/benchmarks/benchmark'
+
+CATEGORIES = ('local', 'continental', 'intercontinental', 'inalcanzable')
+CONTINENTAL_KM = 3000
+INTERCONTINENTAL_KM = 5000
+
+# Presupuesto fijo del motor con restricciones: un dia de viaje y 1500 USD
+BENCHMARK_CONSTRAINTS = Constraints(max_price=1500, max_duration=24 * 60)
+CSA_DEPARTURE_MIN = 8 * 60
+
+SUMMARY_FIELDS = (
+    'engine', 'metric', 'category', 'indices', 'queries', 'found', 'cold_ms',
+    'p50_ms', 'p90_ms', 'p99_ms', 'mean_ms',
+    'settled', 'stale_pops', 'heap_pushes', 'heap_pops', 'peak_kb'
+)
+ROW_FIELDS = (
+    'engine', 'metric', 'category', 'indices', 'origin', 'destination', 'found', 'cost',
+    'median_ms', 'settled', 'stale_pops', 'heap_pushes', 'heap_pops', 'peak_kb'
+)
+
+
+class CountingHeap:
+    # Sustituye al modulo heapq dentro de los motores mientras se mide y
+    # cuenta todas las operaciones de cola (tambien las de motores sin
+    # instrumentacion, como la construccion de cotas o los candidatos de Yen)
+    def __init__(self):
+        self.pushes = 0
+        self.pops = 0
+
+    def heappush(self, heap, item):
+        self.pushes += 1
+        heapq.heappush(heap, item)
+
+    def heappop(self, heap):
+        self.pops += 1
+        return heapq.heappop(heap)
+
+    def heapify(self, heap):
+        heapq.heapify(heap)
+
+    def __getattr__(self, name):
+        return getattr(heapq, name)
+
+
+def _engine_modules():
+    return [
+        module for name, module in sorted(sys.modules.items())
+        if name.startswith('src.algorithms.') and getattr(module, 'heapq', None) is heapq
+    ]
+
+
+def measure(call):
+    # Una ejecucion con contadores de cola, instrumentacion y tracemalloc
+    # (encarecen la llamada, por eso la latencia se toma aparte). Los nodos
+    # asentados los informa cada motor con record_search; si ninguno lo hizo
+    # (APSP, BFS, CSA: sin busqueda con cola) quedan sin dato.
+    counter = CountingHeap()
+    modules = _engine_modules()
+    for module in modules:
+        module.heapq = counter
+    start_run(enabled=True)
+    tracemalloc.start()
+    try:
+        result = call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        recorded = snapshot()['counters'].values()
+        start_run(enabled=False)
+        for module in modules:
+            module.heapq = heapq
+    settled = sum(counters['settled'] for counters in recorded) if recorded else None
+    stale = sum(counters['stale_pops'] for counters in recorded) if recorded else None
+    return result, {
+        'settled': settled,
+        'stale_pops': stale,
+        'heap_pushes': counter.pushes,
+        'heap_pops': counter.pops,
+        'peak_kb': round(peak / 1024, 2)
+    }
+
+
+def timed(call, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _distance(airports, origin, destination):
+    a = airports[origin]
+    b = airports[destination]
+    return haversine(a['latitud'], a['longitud'], b['latitud'], b['longitud'])
+
+
+def category_of(graph, airports, origin, destination):
+    if not reachability_index(graph).reachable(origin, destination):
+        return 'inalcanzable'
+    if airports[origin]['pais'] == airports[destination]['pais']:
+        return 'local'
+    distance = _distance(airports, origin, destination)
+    if distance < CONTINENTAL_KM:
+        return 'continental'
+    if distance >= INTERCONTINENTAL_KM:
+        return 'intercontinental'
+    return None
+
+
+def sample_pairs(graph, airports, per_category, seed, max_attempts=200000):
+    # Pares origen-destino reproducibles: misma semilla y mismos datos dan
+    # los mismos pares. Solo aeropuertos con al menos una ruta.
+    rng = random.Random(seed)
+    codes = [code for code in graph.codes if graph.neighbors(graph.index[code])]
+    pairs = {category: [] for category in CATEGORIES}
+    seen = set()
+    for _ in range(max_attempts):
+        if all(len(found) >= per_category for found in pairs.values()):
+            break
+        origin, destination = rng.sample(codes, 2)
+        if (origin, destination) in seen:
+            continue
+        seen.add((origin, destination))
+        category = category_of(graph, airports, origin, destination)
+        if category is not None and len(pairs[category]) < per_category:
+            pairs[category].append((origin, destination))
+    return pairs
+
+
+def engines(graph, legacy, timetable, max_stops):
+    # (nombre, metricas, disponible(metrica), llamada(origen, destino, metrica))
+    def ch_available(metric):
+        return ('ch', metric) in graph.derived
+
+    def alt_available(metric):
+        landmarks = graph.derived.get('alt')
+        return landmarks is not None and landmarks.covers(metric)
+
+    def apsp_available(metric):
+        return ('apsp', metric) in graph.derived
+
+    def always(metric):
+        return True
+
+    weighted = ('price_usd', 'duration_min')
+    return [
+        ('legacy', weighted, always,
+         lambda o, d, m: find_shortest_path_legacy(legacy[m], o, d)),
+        ('dijkstra', weighted, always,
+         lambda o, d, m: find_shortest_path_forward(graph, o, d, m)),
+        ('bidireccional', weighted, always,
+         lambda o, d, m: find_shortest_path_bidirectional(graph, o, d, m)),
+        ('astar', weighted, lambda m: heuristic_is_valid(graph, m),
+         lambda o, d, m: find_shortest_path_astar(graph, o, d, m)),
+        ('alt', weighted, alt_available,
+         lambda o, d, m: find_shortest_path_alt(graph, o, d, m)),
+        ('ch', weighted, ch_available,
+         lambda o, d, m: graph.derived[('ch', m)].query(graph, o, d)),
+        ('apsp', weighted, apsp_available,
+         lambda o, d, m: graph.derived[('apsp', m)].query(graph, o, d)),
+        ('acotado', weighted, always,
+         lambda o, d, m: find_shortest_path_hop_bounded(graph, o, d, max_stops, m)),
+        ('restricciones', weighted, always,
+         lambda o, d, m: find_shortest_path_constrained(graph, o, d, BENCHMARK_CONSTRAINTS, max_stops, m)),
+        ('yen', weighted, always,
+         lambda o, d, m: find_k_shortest_paths(graph, o, d, 5, max_stops, m)),
+        ('bfs', ('hops',), always,
+         lambda o, d, m: find_fewest_stops(graph, o, d, max_stops)),
+        ('despacho', weighted + ('hops',), always,
+         lambda o, d, m: find_shortest_path(graph, o, d, max_stops, m)),
+        ('pareto', ('pareto',), always,
+         lambda o, d, m: find_pareto_front(graph, o, d, min(max_stops, 3))[0]),
+        ('csa', ('arrival',), lambda m: timetable is not None,
+         lambda o, d, m: earliest_arrival(timetable, o, d, CSA_DEPARTURE_MIN, max_stops)),
+    ]
+
+
+def attached_indices(graph, metric):
+    # Indices precalculados que el despacho puede usar con esta metrica; con
+    # APSP cargado responde la matriz y no se mide ningun motor de busqueda
+    found = [name for name in ('apsp', 'ch') if (name, metric) in graph.derived]
+    landmarks = graph.derived.get('alt')
+    if landmarks is not None and landmarks.covers(metric):
+        found.append('alt')
+    return '+'.join(found)
+
+
+def reset_derived(graph, baseline):
+    # Descarta lo que los motores construyeron de forma perezosa (cotas,
+    # pareto_legs, bitsets...) para que cada motor lo pague en su llamada
+    # en frio y el resultado no dependa del orden de los motores
+    for key in set(graph.derived) - baseline:
+        del graph.derived[key]
+
+
+def _cost(result, metric):
+    if not result:
+        return None
+    if metric == 'pareto':
+        return len(result)
+    if metric == 'arrival':
+        return result['llegada']
+    if isinstance(result, list):
+        result = result[0]
+    return result.get('total_cost')
+
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 4) if values else None
+
+
+def summarize(rows, latencies):
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['engine'], row['metric'], row['category']), []).append(row)
+
+    summary = []
+    for (engine, metric, category), group in groups.items():
+        times = [t for row in group for t in latencies[id(row)]]
+        entry = {
+            'engine': engine,
+            'metric': metric,
+            'category': category,
+            'queries': len(group),
+            'found': sum(1 for row in group if row['found']),
+            'p50_ms': percentile(times, 50),
+            'p90_ms': percentile(times, 90),
+            'p99_ms': percentile(times, 99),
+            'mean_ms': round(float(np.mean(times)), 4) if times else None
+        }
+        entry['indices'] = group[0]['indices']
+        entry['cold_ms'] = group[0]['cold_ms']
+        for field in ('settled', 'stale_pops', 'heap_pushes', 'heap_pops', 'peak_kb'):
+            values = [row[field] for row in group if row[field] is not None]
+            entry[field] = round(float(np.mean(values)), 2) if values else None
+        summary.append(entry)
+    return summary
+
+
+def run_benchmark(per_category=10, seed=42, repeat=5, max_stops=2, selected=None,
+                  directory=PROCESSED_DIR, progress=print, indices=True):
+    airports, routes, _ = load_processed_data(directory)
+    graph = CompiledGraph(airports, routes)
+    if indices:
+        attach_hierarchies(graph, directory)
+        attach_landmarks(graph, directory)
+        attach_all_pairs(graph, directory)
+    reachability_index(graph)
+
+    legacy = {}
+    for metric, optimization in (('price_usd', 'precio'), ('duration_min', 'duracion')):
+        legacy[metric] = Graph()
+        legacy[metric].build_from_data(airports, routes, optimization)
+
+    timetable = None
+    if selected is None or 'csa' in selected:
+        timetable = Timetable.generate(airports, routes, datetime(2024, 1, 1))
+
+    pairs = sample_pairs(graph, airports, per_category, seed)
+    first_pair = next((found[0] for found in pairs.values() if found), None)
+    baseline = set(graph.derived)
+    rows = []
+    latencies = {}
+    skipped = []
+
+    for name, metrics, available, call in engines(graph, legacy, timetable, max_stops):
+        if selected is not None and name not in selected:
+            continue
+        for metric in metrics:
+            if not available(metric):
+                skipped.append(f'{name}/{metric}')
+                continue
+            start = time.perf_counter()
+            # Llamada en frio, excluida de los percentiles: la primera del
+            # motor con esta metrica, sobre un grafo sin estructuras
+            # perezosas de motores anteriores. Despues de ella cada consulta
+            # se mide en caliente (measure deja memoizado lo que construya).
+            reset_derived(graph, baseline)
+            cold_ms = None
+            if first_pair is not None:
+                cold_ms = round(timed(lambda: call(*first_pair, metric), 1)[0], 4)
+            engine_indices = attached_indices(graph, metric) if name == 'despacho' else ''
+            for category in CATEGORIES:
+                for origin, destination in pairs[category]:
+                    query = lambda: call(origin, destination, metric)
+                    result, counters = measure(query)
+                    times = timed(query, repeat)
+                    row = {
+                        'engine': name,
+                        'metric': metric,
+                        'category': category,
+                        'indices': engine_indices,
+                        'cold_ms': cold_ms,
+                        'origin': origin,
+                        'destination': destination,
+                        'found': bool(result),
+                        'cost': _cost(result, metric),
+                        'median_ms': percentile(times, 50),
+                        **counters
+                    }
+                    rows.append(row)
+                    latencies[id(row)] = times
+            cold = f", en frio {cold_ms:.1f} ms" if cold_ms is not None else ''
+            progress(f"{name}/{metric}: {time.perf_counter() - start:.2f}s{cold}")
+
+    return {
+        'meta': {
+            'seed': seed,
+            'per_category': per_category,
+            'repeat': repeat,
+            'max_stops': max_stops,
+            'indices': {metric: attached_indices(graph, metric) for metric in ('price_usd', 'duration_min')},
+            'dataset': dataset_hash(loaded_files(directory)),
+            'airports': len(airports),
+            'routes': len(routes),
+            'python': platform.python_version(),
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'skipped': skipped,
+            'pairs': {category: [list(pair) for pair in found] for category, found in pairs.items()}
+        },
+        'summary': summarize(rows, latencies),
+        'rows': rows
+    }
+
+
+def save_results(results, prefix=OUTPUT_PREFIX):
+    # JSON completo (metadatos, resumen y filas) y dos CSV para hojas de calculo
+    directory = os.path.dirname(prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(f'{prefix}.json', 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    for suffix, fields, entries in (('_resumen', SUMMARY_FIELDS, results['summary']),
+                                    ('_consultas', ROW_FIELDS, results['rows'])):
+        with open(f'{prefix}{suffix}.csv', 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(entries)
+    return f'{prefix}.json'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide los motores de busqueda sobre pares origen-destino fijos")
+    parser.add_argument('--pairs', type=int, default=10, help="Pares por categoria")
+    parser.add_argument('--seed', type=int, default=42, help="Semilla para elegir los pares")
+    parser.add_argument('--repeat', type=int, default=5, help="Repeticiones cronometradas por consulta")
+    parser.add_argument('--max-stops', type=int, default=2, help="Escalas maximas de los motores acotados")
+    parser.add_argument('--engines', nargs='*', help="Subconjunto de motores (por defecto todos)")
+    parser.add_argument('--no-indices', action='store_true',
+                        help="No cargar APSP, CH ni ALT: el despacho usa sus motores de busqueda")
+    parser.add_argument('--output', default=OUTPUT_PREFIX, help="Prefijo de los archivos de salida")
+    parser.add_argument('--plot', action='store_true', help="Generar graficos comparativos (PNG)")
+    parser.add_argument('--baseline', help="JSON de una corrida anterior para graficar aceleraciones")
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        per_category=args.pairs, seed=args.seed, repeat=args.repeat,
+        max_stops=args.max_stops, selected=args.engines, indices=not args.no_indices
+    )
+    path = save_results(results, args.output)
+    print(f"Resultados en {path}")
+    if results['meta']['skipped']:
+        print(f"Sin indices precalculados: {', '.join(results['meta']['skipped'])}")
+
+    if args.plot:
+        from src.visualizations.comparativas import load_results, save_report
+        baseline = load_results(args.baseline) if args.baseline else None
+        for filepath in save_report(results, os.path.dirname(args.output) or '.', baseline):
+            print(f"Grafico: {filepath}")
+
+
+if __name__ == "__main__":
+    main()
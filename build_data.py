@@ -0,0 +1,323 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from enrich_routes import enrich_arrays
+from procesar_datos import crear_carpetas, parse_aeropuerto, parse_aerolinea, parse_ruta
+from src.algorithms.all_pairs import APSP_METRICS, AllPairsMatrix, build_all_pairs
+from src.algorithms.alt import build_landmarks, load_landmarks
+from src.algorithms.contraction import CH_METRICS, build_hierarchies, load_hierarchy
+from src.calculators import duracion, precio
+from src.data_loader import (
+    load_airports_columns, load_routes_columns, load_processed_data,
+    save_airports_columns, save_airlines_columns, save_routes_columns
+)
+from src.graph.grafo import CompiledGraph
+
+
+BUILD_VERSION = 1
+
+RAW_FILES = {
+    'airports': 'data/raw/airports.dat',
+    'airlines': 'data/raw/airlines.dat',
+    'routes': 'data/raw/routes.dat'
+}
+
+PROCESSED_DIR = 'data/processed'
+MANIFEST_PATH = os.path.join(PROCESSED_DIR, 'manifest.json')
+
+
+def file_fingerprint(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def params_fingerprint():
+    params = {
+        'version': BUILD_VERSION,
+        'cruise_speed': duracion.CRUISE_SPEED_KMH,
+        'extra_time': duracion.EXTRA_TIME_MIN,
+        'price_per_km': precio.PRICE_PER_KM,
+        'min_price': precio.MIN_PRICE,
+        'variation_range': precio.VARIATION_RANGE
+    }
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def stream_rows(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from csv.reader(f)
+
+
+def parse_dataset(path, parser):
+    result = {}
+    for fila in stream_rows(path):
+        try:
+            item = parser(fila)
+        except (IndexError, ValueError):
+            continue
+        if item is not None:
+            result[item['iata']] = item
+    return result
+
+
+def write_dataset(name, data, save_columns):
+    with open(os.path.join(PROCESSED_DIR, f'{name}.json'), 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    save_columns(data, os.path.join(PROCESSED_DIR, f'{name}.bin'))
+
+
+def previous_enrichment():
+    # (origen, destino, aerolinea) -> (distance_km, duration_min, price_usd)
+    try:
+        table = load_routes_columns(os.path.join(PROCESSED_DIR, 'rutas.bin'))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+    if 'price_usd' not in table.columns:
+        return {}
+
+    return dict(zip(
+        zip(table.column('origen'), table.column('destino'), table.column('aerolinea')),
+        zip(table.column('distance_km').tolist(),
+            table.column('duration_min').tolist(),
+            table.column('price_usd').tolist())
+    ))
+
+
+def build_routes(path, airports, cache):
+    routes = []
+    pending = []
+
+    # Un solo recorrido: parsear -> validar -> reutilizar o marcar para enriquecer
+    for fila in stream_rows(path):
+        try:
+            ruta = parse_ruta(fila, airports)
+        except (IndexError, ValueError):
+            continue
+        if ruta is None:
+            continue
+
+        cached = cache.get((ruta['origen'], ruta['destino'], ruta['aerolinea']))
+        if cached is None:
+            pending.append(len(routes))
+        else:
+            ruta['distance_km'], ruta['duration_min'], ruta['price_usd'] = cached
+        routes.append(ruta)
+
+    if pending:
+        distances, durations, prices = enrich_arrays(airports, [routes[i] for i in pending])
+        for i, distance, duration, price in zip(
+            pending, distances.tolist(), durations.tolist(), prices.tolist()
+        ):
+            routes[i]['distance_km'] = distance
+            routes[i]['duration_min'] = duration
+            routes[i]['price_usd'] = price
+
+    return routes, len(pending)
+
+
+def shard_ranges(path, shards):
+    size = os.path.getsize(path)
+    step = max(1, -(-size // shards))
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def read_shard(path, start, end):
+    # Una linea pertenece al fragmento donde empieza, asi cada linea se
+    # procesa exactamente una vez aunque el corte caiga en medio de ella.
+    lines = []
+    with open(path, 'rb') as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            lines.append(line.decode('utf-8'))
+    return lines
+
+
+_worker_airports = None
+
+
+def _init_worker(airports):
+    global _worker_airports
+    _worker_airports = airports
+
+
+def _process_shard(path, start, end):
+    t0 = time.perf_counter()
+    routes = []
+    for fila in csv.reader(read_shard(path, start, end)):
+        try:
+            ruta = parse_ruta(fila, _worker_airports)
+        except (IndexError, ValueError):
+            continue
+        if ruta is not None:
+            routes.append(ruta)
+
+    t1 = time.perf_counter()
+    if routes:
+        distances, durations, prices = enrich_arrays(_worker_airports, routes)
+        for ruta, distance, duration, price in zip(
+            routes, distances.tolist(), durations.tolist(), prices.tolist()
+        ):
+            ruta['distance_km'] = distance
+            ruta['duration_min'] = duration
+            ruta['price_usd'] = price
+
+    t2 = time.perf_counter()
+    return routes, t1 - t0, t2 - t1
+
+
+def build_routes_parallel(path, airports, workers):
+    coordinates = {
+        code: {'latitud': airports[code]['latitud'], 'longitud': airports[code]['longitud']}
+        for code in airports
+    }
+    ranges = shard_ranges(path, workers)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(coordinates,)) as pool:
+        futures = [pool.submit(_process_shard, path, a, b) for a, b in ranges]
+        # Se une en el orden de los fragmentos: el resultado es identico al secuencial
+        results = [future.result() for future in futures]
+    wall = time.perf_counter() - start
+
+    routes = []
+    for shard_routes, _, _ in results:
+        routes.extend(shard_routes)
+
+    stages = {
+        'parse+filtrar': [parse for _, parse, _ in results],
+        'enriquecer': [enrich for _, _, enrich in results]
+    }
+    # Son estimaciones a partir de los tiempos de CPU de cada proceso, no
+    # una aceleracion medida: para eso hay que comparar con --workers 1
+    print(f"Procesamiento paralelo: {len(ranges)} fragmentos, {workers} procesos, {wall:.2f}s")
+    for stage, times in stages.items():
+        total = sum(times)
+        critical = max(times, default=0.0)
+        estimate = total / critical if critical else 1.0
+        print(f"  {stage}: {total:.2f}s CPU, {critical:.2f}s ruta critica, "
+              f"paralelismo estimado {estimate:.1f}x (CPU / ruta critica)")
+    busy = sum(sum(times) for times in stages.values())
+    print(f"  total: {busy / wall if wall else 1.0:.1f} procesos ocupados en promedio (CPU / tiempo de pared); "
+          f"la aceleracion real se mide contra --workers 1")
+
+    return routes
+
+
+def build_search_indexes(force=False, hierarchies=False, landmarks=False, all_pairs=False, workers=1):
+    airports, routes, _ = load_processed_data(PROCESSED_DIR)
+    graph = CompiledGraph(airports, routes)
+
+    if hierarchies:
+        metrics = [metric for metric in CH_METRICS
+                   if force or load_hierarchy(graph, metric, PROCESSED_DIR) is None]
+        if metrics:
+            start = time.time()
+            build_hierarchies(graph, PROCESSED_DIR, metrics)
+            print(f"Jerarquias de contraccion en {time.time() - start:.2f}s")
+
+    if landmarks and (force or load_landmarks(graph, PROCESSED_DIR) is None):
+        start = time.time()
+        build_landmarks(graph, PROCESSED_DIR)
+        print(f"Distancias a landmarks en {time.time() - start:.2f}s")
+
+    if all_pairs:
+        for metric in APSP_METRICS:
+            if force or AllPairsMatrix.load(graph, metric, PROCESSED_DIR) is None:
+                build_all_pairs(graph, metric, PROCESSED_DIR, workers)
+
+
+def build(force=False, workers=1):
+    crear_carpetas()
+
+    manifest = load_manifest()
+    current = {name: file_fingerprint(path) for name, path in RAW_FILES.items()}
+    current['params'] = params_fingerprint()
+
+    def changed(*names):
+        return force or any(manifest.get(name) != current[name] for name in names)
+
+    if not changed('airports', 'airlines', 'routes', 'params'):
+        print("Sin cambios en los datos de entrada; nada que construir.")
+        return current
+
+    start = time.time()
+
+    if changed('airports'):
+        airports = parse_dataset(RAW_FILES['airports'], parse_aeropuerto)
+        write_dataset('aeropuertos', airports, save_airports_columns)
+        print(f"Aeropuertos: {len(airports)}")
+    else:
+        airports = load_airports_columns(os.path.join(PROCESSED_DIR, 'aeropuertos.bin')).as_mapping()
+
+    if changed('airlines'):
+        airlines = parse_dataset(RAW_FILES['airlines'], parse_aerolinea)
+        write_dataset('aerolineas', airlines, save_airlines_columns)
+        print(f"Aerolineas: {len(airlines)}")
+
+    if changed('airports', 'routes', 'params'):
+        # El enriquecimiento previo solo es valido si no cambiaron las
+        # coordenadas ni los parametros de los calculadores.
+        if workers > 1:
+            routes = build_routes_parallel(RAW_FILES['routes'], airports, workers)
+            enriched = len(routes)
+        else:
+            cache = {} if changed('airports', 'params') else previous_enrichment()
+            routes, enriched = build_routes(RAW_FILES['routes'], airports, cache)
+        write_dataset('rutas', routes, save_routes_columns)
+        print(f"Rutas: {len(routes)} ({enriched} enriquecidas, {len(routes) - enriched} reutilizadas)")
+
+    save_manifest(current)
+    print(f"Construccion completa en {time.time() - start:.2f}s")
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construye data/processed a partir de data/raw")
+    parser.add_argument('--force', action='store_true', help="Reconstruir aunque no haya cambios")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Procesos para parsear y enriquecer las rutas en paralelo")
+    parser.add_argument('--hierarchies', action='store_true',
+                        help="Preprocesar jerarquias de contraccion para consultas rapidas")
+    parser.add_argument('--landmarks', action='store_true',
+                        help="Precalcular distancias a landmarks (heuristica ALT)")
+    parser.add_argument('--all-pairs', action='store_true',
+                        help="Precalcular la matriz de costos entre todos los pares (usa --workers)")
+    args = parser.parse_args()
+    build(force=args.force, workers=args.workers)
+    if args.hierarchies or args.landmarks or args.all_pairs:
+        build_search_indexes(
+            force=args.force, hierarchies=args.hierarchies, landmarks=args.landmarks,
+            all_pairs=args.all_pairs, workers=args.workers
+        )
+
+
+if __name__ == "__main__":
+    main()
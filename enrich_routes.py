@@ -2,9 +2,35 @@ import json
 import sys
 sys.path.append('src')
 
-from calculators.distancia import calculate_airport_distance
-from calculators.duracion import calculate_flight_duration
-from calculators.precio import calculate_route_price
+import numpy as np
+
+from calculators.distancia import calculate_airport_distances
+from calculators.duracion import calculate_flight_durations
+from calculators.precio import calculate_route_prices
+from src.data_loader import save_routes_columns
+
+
+def enrich_arrays(airports, routes):
+    origin_codes = [route['origen'] for route in routes]
+    dest_codes = [route['destino'] for route in routes]
+
+    codes = list(airports)
+    index = {code: i for i, code in enumerate(codes)}
+    lats = np.array([airports[code]['latitud'] for code in codes], dtype=np.float64)
+    lons = np.array([airports[code]['longitud'] for code in codes], dtype=np.float64)
+
+    origin_idx = np.fromiter((index[code] for code in origin_codes), dtype=np.int64, count=len(routes))
+    dest_idx = np.fromiter((index[code] for code in dest_codes), dtype=np.int64, count=len(routes))
+
+    distances = calculate_airport_distances(
+        lats[origin_idx], lons[origin_idx], lats[dest_idx], lons[dest_idx]
+    )
+    durations = calculate_flight_durations(distances)
+    prices = calculate_route_prices(
+        distances, origin_codes, dest_codes, [route['aerolinea'] for route in routes]
+    )
+
+    return distances, durations, prices
 
 
 def enrich_routes():
@@ -19,45 +45,38 @@ def enrich_routes():
     print(f"Processing {len(routes)} routes...")
 
     enriched_routes = []
-    processed = 0
     skipped = 0
 
     for route in routes:
-        origin_code = route['origen']
-        dest_code = route['destino']
-
-        if origin_code not in airports or dest_code not in airports:
+        if route['origen'] not in airports or route['destino'] not in airports:
             skipped += 1
             continue
+        enriched_routes.append(route)
 
-        origin_airport = airports[origin_code]
-        dest_airport = airports[dest_code]
-
-        distance = calculate_airport_distance(origin_airport, dest_airport)
-        duration = calculate_flight_duration(distance)
-        price = calculate_route_price(distance, origin_code, dest_code, route['aerolinea'])
+    distances, durations, prices = enrich_arrays(airports, enriched_routes)
 
-        enriched_route = {
+    enriched_routes = [
+        {
             **route,
             'distance_km': distance,
             'duration_min': duration,
             'price_usd': price
         }
-
-        enriched_routes.append(enriched_route)
-        processed += 1
-
-        if processed % 10000 == 0:
-            print(f"  Processed {processed} routes...")
+        for route, distance, duration, price in zip(
+            enriched_routes, distances.tolist(), durations.tolist(), prices.tolist()
+        )
+    ]
+    processed = len(enriched_routes)
 
     print(f"\nSaving enriched routes...")
     with open('data/processed/rutas.json', 'w', encoding='utf-8') as f:
         json.dump(enriched_routes, f, indent=2, ensure_ascii=False)
+    save_routes_columns(enriched_routes)
 
     print(f"\nDone!")
     print(f"  Total routes processed: {processed}")
     print(f"  Skipped (missing airports): {skipped}")
-    print(f"  Output: data/processed/rutas.json")
+    print(f"  Output: data/processed/rutas.json, data/processed/rutas.bin")
 
     if len(enriched_routes) > 0:
         sample = enriched_routes[0]
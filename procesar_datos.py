@@ -2,6 +2,8 @@ import csv
 import json
 import os
 
+from src.data_loader import save_airports_columns, save_airlines_columns, save_routes_columns
+
 
 def crear_carpetas():
 
@@ -10,6 +12,116 @@ def crear_carpetas():
 
 
 
+def parse_aeropuerto(fila):
+    # Formato OpenFlights airports.dat:
+    # [0]=Airport ID, [1]=Name, [2]=City, [3]=Country,
+    # [4]=IATA, [5]=ICAO, [6]=Latitude, [7]=Longitude,
+    # [8]=Altitude, [9]=Timezone, [10]=DST, [11]=Tz
+
+    airport_id = fila[0]
+    nombre = fila[1]
+    ciudad = fila[2]
+    pais = fila[3]
+    iata = fila[4]
+    icao = fila[5]
+    latitud = fila[6]
+    longitud = fila[7]
+    altitud = fila[8]
+    timezone = fila[9]
+
+    # Filtrar aeropuertos sin código IATA
+    if iata == "\\N" or iata == "" or len(iata) != 3:
+        return None
+
+    # Validar coordenadas
+    try:
+        lat = float(latitud)
+        lon = float(longitud)
+    except ValueError:
+        return None
+
+    return {
+        'id': airport_id,
+        'nombre': nombre,
+        'ciudad': ciudad,
+        'pais': pais,
+        'iata': iata,
+        'icao': icao if icao != "\\N" else None,
+        'latitud': lat,
+        'longitud': lon,
+        'altitud': int(altitud) if altitud != "\\N" else 0,
+        'timezone': timezone if timezone != "\\N" else None
+    }
+
+
+def parse_ruta(fila, aeropuertos_validos):
+    # Formato OpenFlights routes.dat:
+    # [0]=Airline, [1]=Airline ID, [2]=Source airport,
+    # [3]=Source airport ID, [4]=Destination airport,
+    # [5]=Destination airport ID, [6]=Codeshare,
+    # [7]=Stops, [8]=Equipment
+
+    aerolinea = fila[0]
+    aerolinea_id = fila[1]
+    origen = fila[2]
+    destino = fila[4]
+    codeshare = fila[6]
+    escalas = fila[7]
+    equipo = fila[8]
+
+    # Solo incluir rutas entre aeropuertos que tenemos
+    if origen not in aeropuertos_validos or destino not in aeropuertos_validos:
+        return None
+
+    # Solo vuelos directos (0 escalas)
+    if escalas != "0":
+        return None
+
+    return {
+        'aerolinea': aerolinea,
+        'aerolinea_id': aerolinea_id,
+        'origen': origen,
+        'destino': destino,
+        'codeshare': codeshare,
+        'escalas': int(escalas) if escalas else 0,
+        'equipo': equipo.split() if equipo else []
+    }
+
+
+def parse_aerolinea(fila):
+    # Formato OpenFlights airlines.dat:
+    # [0]=Airline ID, [1]=Name, [2]=Alias, [3]=IATA,
+    # [4]=ICAO, [5]=Callsign, [6]=Country, [7]=Active
+
+    airline_id = fila[0]
+    nombre = fila[1]
+    alias = fila[2]
+    iata = fila[3]
+    icao = fila[4]
+    callsign = fila[5]
+    pais = fila[6]
+    activa = fila[7]
+
+    # Filtrar aerolíneas sin código IATA
+    if iata == "\\N" or iata == "" or len(iata) != 2:
+        return None
+
+    # Solo aerolíneas activas
+    if activa != "Y":
+        return None
+
+    return {
+        'id': airline_id,
+        'nombre': nombre,
+        'alias': alias if alias != "\\N" else None,
+        'iata': iata,
+        'icao': icao if icao != "\\N" else None,
+        'callsign': callsign if callsign != "\\N" else None,
+        'pais': pais,
+        'activa': True
+    }
+
+
 def csv_a_json_aeropuertos(csv_path='data/raw/airports.dat',
                            json_path='data/processed/aeropuertos.json',
                            limite=None):
@@ -29,47 +141,14 @@ def csv_a_json_aeropuertos(csv_path='data/raw/airports.dat',
                     break
 
                 try:
-                    # Formato OpenFlights airports.dat:
-                    # [0]=Airport ID, [1]=Name, [2]=City, [3]=Country,
-                    # [4]=IATA, [5]=ICAO, [6]=Latitude, [7]=Longitude,
-                    # [8]=Altitude, [9]=Timezone, [10]=DST, [11]=Tz
-
-                    airport_id = fila[0]
-                    nombre = fila[1]
-                    ciudad = fila[2]
-                    pais = fila[3]
-                    iata = fila[4]
-                    icao = fila[5]
-                    latitud = fila[6]
-                    longitud = fila[7]
-                    altitud = fila[8]
-                    timezone = fila[9]
-
-                    # Filtrar aeropuertos sin código IATA
-                    if iata == "\\N" or iata == "" or len(iata) != 3:
-                        skipped += 1
-                        continue
+                    aeropuerto = parse_aeropuerto(fila)
 
-                    # Validar coordenadas
-                    try:
-                        lat = float(latitud)
-                        lon = float(longitud)
-                    except ValueError:
+                    # Filtrar aeropuertos sin código IATA o sin coordenadas
+                    if aeropuerto is None:
                         skipped += 1
                         continue
 
-                    aeropuertos[iata] = {
-                        'id': airport_id,
-                        'nombre': nombre,
-                        'ciudad': ciudad,
-                        'pais': pais,
-                        'iata': iata,
-                        'icao': icao if icao != "\\N" else None,
-                        'latitud': lat,
-                        'longitud': lon,
-                        'altitud': int(altitud) if altitud != "\\N" else 0,
-                        'timezone': timezone if timezone != "\\N" else None
-                    }
+                    aeropuertos[aeropuerto['iata']] = aeropuerto
 
                     count += 1
 
@@ -81,6 +160,8 @@ def csv_a_json_aeropuertos(csv_path='data/raw/airports.dat',
         with open(json_path, 'w', encoding='utf-8') as f:
             json.dump(aeropuertos, f, indent=2, ensure_ascii=False)
 
+        save_airports_columns(aeropuertos, json_path.replace('.json', '.bin'))
+
 
         return aeropuertos
 
@@ -107,39 +188,14 @@ def csv_a_json_rutas(csv_path='data/raw/routes.dat',
 
             for fila in reader:
                 try:
-                    # Formato OpenFlights routes.dat:
-                    # [0]=Airline, [1]=Airline ID, [2]=Source airport,
-                    # [3]=Source airport ID, [4]=Destination airport,
-                    # [5]=Destination airport ID, [6]=Codeshare,
-                    # [7]=Stops, [8]=Equipment
-
-                    aerolinea = fila[0]
-                    aerolinea_id = fila[1]
-                    origen = fila[2]
-                    destino = fila[4]
-                    codeshare = fila[6]
-                    escalas = fila[7]
-                    equipo = fila[8]
-
-                    # Solo incluir rutas entre aeropuertos que tenemos
-                    if origen not in aeropuertos_validos or destino not in aeropuertos_validos:
-                        skipped += 1
-                        continue
+                    ruta = parse_ruta(fila, aeropuertos_validos)
 
-                    # Solo vuelos directos (0 escalas)
-                    if escalas != "0":
+                    # Solo vuelos directos entre aeropuertos que tenemos
+                    if ruta is None:
                         skipped += 1
                         continue
 
-                    rutas.append({
-                        'aerolinea': aerolinea,
-                        'aerolinea_id': aerolinea_id,
-                        'origen': origen,
-                        'destino': destino,
-                        'codeshare': codeshare,
-                        'escalas': int(escalas) if escalas else 0,
-                        'equipo': equipo.split() if equipo else []
-                    })
+                    rutas.append(ruta)
 
                     count += 1
 
@@ -151,6 +207,8 @@ def csv_a_json_rutas(csv_path='data/raw/routes.dat',
         with open(json_path, 'w', encoding='utf-8') as f:
             json.dump(rutas, f, indent=2, ensure_ascii=False)
 
+        # Sin esto quedaria el rutas.bin enriquecido de una corrida anterior
+        save_routes_columns(rutas, json_path.replace('.json', '.bin'))
 
 
         return rutas
@@ -173,39 +231,14 @@ def csv_a_json_aerolineas(csv_path='data/raw/airlines.dat',
 
             for fila in reader:
                 try:
-                    # Formato OpenFlights airlines.dat:
-                    # [0]=Airline ID, [1]=Name, [2]=Alias, [3]=IATA,
-                    # [4]=ICAO, [5]=Callsign, [6]=Country, [7]=Active
-
-                    airline_id = fila[0]
-                    nombre = fila[1]
-                    alias = fila[2]
-                    iata = fila[3]
-                    icao = fila[4]
-                    callsign = fila[5]
-                    pais = fila[6]
-                    activa = fila[7]
-
-                    # Filtrar aerolíneas sin código IATA
-                    if iata == "\\N" or iata == "" or len(iata) != 2:
-                        skipped += 1
-                        continue
+                    aerolinea = parse_aerolinea(fila)
 
-                    # Solo aerolíneas activas
-                    if activa != "Y":
+                    # Filtrar aerolíneas sin código IATA o inactivas
+                    if aerolinea is None:
                         skipped += 1
                         continue
 
-                    aerolineas[iata] = {
-                        'id': airline_id,
-                        'nombre': nombre,
-                        'alias': alias if alias != "\\N" else None,
-                        'iata': iata,
-                        'icao': icao if icao != "\\N" else None,
-                        'callsign': callsign if callsign != "\\N" else None,
-                        'pais': pais,
-                        'activa': True
-                    }
+                    aerolineas[aerolinea['iata']] = aerolinea
 
                     count += 1
 
@@ -217,6 +250,8 @@ def csv_a_json_aerolineas(csv_path='data/raw/airlines.dat',
         with open(json_path, 'w', encoding='utf-8') as f:
             json.dump(aerolineas, f, indent=2, ensure_ascii=False)
 
+        save_airlines_columns(aerolineas, json_path.replace('.json', '.bin'))
+
 
         return aerolineas
 
@@ -279,6 +314,9 @@ def main():
     print("  - data/processed/aeropuertos.json")
     print("  - data/processed/rutas.json")
     print("  - data/processed/aerolineas.json")
+    print("  - data/processed/aeropuertos.bin")
+    print("  - data/processed/rutas.bin")
+    print("  - data/processed/aerolineas.bin")
 
 
 
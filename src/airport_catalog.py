@@ -0,0 +1,108 @@
+import bisect
+import unicodedata
+
+
+def normalize(text):
+    # Minusculas y sin tildes: "Bogotá" y "bogota" dan la misma clave
+    decomposed = unicodedata.normalize('NFKD', str(text or ''))
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower().strip()
+
+
+def _trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AirportCatalog:
+    # Catalogo de aeropuertos con rutas: etiquetas ya formateadas, un indice
+    # de prefijos por palabra (codigo, ciudad, pais, nombre) y otro de
+    # trigramas para coincidencias parciales. Se construye una vez por
+    # version de los datos.
+    def __init__(self, airports, codes):
+        self.codes = sorted(codes)
+        self.labels = {
+            code: f"{airports[code]['ciudad']}, {airports[code]['pais']} ({code})"
+            for code in self.codes
+        }
+        self._position = {code: i for i, code in enumerate(self.codes)}
+
+        self._texts = []
+        words = []
+        self._trigram_index = {}
+        for i, code in enumerate(self.codes):
+            airport = airports[code]
+            fields = [code, airport['ciudad'], airport['pais'], airport['nombre']]
+            text = ' '.join(normalize(field) for field in fields if field)
+            self._texts.append(text)
+            for word in set(text.split()):
+                words.append((word, i))
+            for trigram in _trigrams(text):
+                self._trigram_index.setdefault(trigram, []).append(i)
+
+        words.sort()
+        self._words = [word for word, _ in words]
+        self._word_ids = [i for _, i in words]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return code in self._position
+
+    def label(self, code):
+        return self.labels.get(code, code)
+
+    def _prefix_matches(self, prefix):
+        start = bisect.bisect_left(self._words, prefix)
+        matches = set()
+        for k in range(start, len(self._words)):
+            if not self._words[k].startswith(prefix):
+                break
+            matches.add(self._word_ids[k])
+        return matches
+
+    def search(self, query, limit=50):
+        # Orden: codigo IATA exacto, todas las palabras como prefijo y, si no
+        # alcanza, textos que contienen la consulta (filtrados por trigramas)
+        query = normalize(query)
+        if not query:
+            return self.codes[:limit]
+
+        ranked = []
+        exact = self._position.get(query.upper())
+        if exact is not None:
+            ranked.append(exact)
+
+        terms = query.split()
+        prefix = self._prefix_matches(terms[0])
+        for term in terms[1:]:
+            prefix &= self._prefix_matches(term)
+        ranked.extend(sorted(prefix, key=lambda i: (len(self._texts[i]), i)))
+
+        if len(ranked) < limit and len(query) >= 3:
+            candidates = None
+            for trigram in {query[i:i + 3] for i in range(len(query) - 2)}:
+                ids = set(self._trigram_index.get(trigram, ()))
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    break
+            for i in sorted(candidates or ()):
+                if query in self._texts[i]:
+                    ranked.append(i)
+
+        seen = set()
+        result = []
+        for i in ranked:
+            if i in seen:
+                continue
+            seen.add(i)
+            result.append(self.codes[i])
+            if len(result) >= limit:
+                break
+        return result
+
+
+def catalog_from_graph(graph):
+    # Aeropuertos con al menos una ruta, sin recorrer la lista de rutas
+    codes = [code for node, code in enumerate(graph.codes) if graph.offsets[node + 1] > graph.offsets[node]]
+    return AirportCatalog(graph.airports, codes)
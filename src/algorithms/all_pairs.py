@@ -0,0 +1,188 @@
+import heapq
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+APSP_METRICS = ('price_usd', 'duration_min')
+
+UNREACHABLE_COST = np.iinfo(np.uint32).max
+UNREACHABLE_HOPS = np.iinfo(np.uint8).max
+
+
+def _paths(directory, metric):
+    prefix = os.path.join(directory, f'apsp_{metric}')
+    return {
+        'meta': f'{prefix}.json',
+        'cost': f'{prefix}_cost.npy',
+        'hops': f'{prefix}_hops.npy',
+        'pred': f'{prefix}_pred.npy'
+    }
+
+
+def active_nodes(graph):
+    # Solo aeropuertos con al menos una ruta: los demas no aportan filas utiles
+    return [node for node in range(len(graph)) if graph.offsets[node + 1] > graph.offsets[node]]
+
+
+_worker = {}
+
+
+def _init_worker(offsets, targets, weights, local, paths):
+    _worker['offsets'] = offsets
+    _worker['targets'] = targets
+    _worker['weights'] = weights
+    _worker['local'] = local
+    _worker['cost'] = np.load(paths['cost'], mmap_mode='r+')
+    _worker['hops'] = np.load(paths['hops'], mmap_mode='r+')
+    _worker['pred'] = np.load(paths['pred'], mmap_mode='r+')
+
+
+def _solve_rows(rows, nodes):
+    offsets = _worker['offsets']
+    targets = _worker['targets']
+    weights = _worker['weights']
+    local = _worker['local']
+    size = _worker['cost'].shape[1]
+
+    for row, source in zip(rows, nodes):
+        distances = {source: 0}
+        hops = {source: 0}
+        previous = {}
+        visited = set()
+        priority_queue = [(0, source)]
+
+        while priority_queue:
+            current_distance, current = heapq.heappop(priority_queue)
+            if current in visited:
+                continue
+            visited.add(current)
+
+            for edge in range(offsets[current], offsets[current + 1]):
+                next_node = targets[edge]
+                new_distance = current_distance + weights[edge]
+                if new_distance < distances.get(next_node, float('inf')):
+                    distances[next_node] = new_distance
+                    hops[next_node] = hops[current] + 1
+                    previous[next_node] = current
+                    heapq.heappush(priority_queue, (new_distance, next_node))
+
+        cost_row = np.full(size, UNREACHABLE_COST, dtype=np.uint32)
+        hops_row = np.full(size, UNREACHABLE_HOPS, dtype=np.uint8)
+        pred_row = np.full(size, -1, dtype=_worker['pred'].dtype)
+        for node, distance in distances.items():
+            column = local[node]
+            cost_row[column] = distance
+            hops_row[column] = min(hops[node], UNREACHABLE_HOPS - 1)
+            if node in previous:
+                pred_row[column] = local[previous[node]]
+
+        _worker['cost'][row] = cost_row
+        _worker['hops'][row] = hops_row
+        _worker['pred'][row] = pred_row
+
+    _worker['cost'].flush()
+    _worker['hops'].flush()
+    _worker['pred'].flush()
+    return len(rows)
+
+
+def build_all_pairs(graph, metric, directory='data/processed', workers=1, chunk_size=64):
+    nodes = active_nodes(graph)
+    size = len(nodes)
+    local = {node: i for i, node in enumerate(nodes)}
+    paths = _paths(directory, metric)
+    pred_dtype = np.int16 if size < np.iinfo(np.int16).max else np.int32
+
+    np.lib.format.open_memmap(paths['cost'], mode='w+', dtype=np.uint32, shape=(size, size)).flush()
+    np.lib.format.open_memmap(paths['hops'], mode='w+', dtype=np.uint8, shape=(size, size)).flush()
+    np.lib.format.open_memmap(paths['pred'], mode='w+', dtype=pred_dtype, shape=(size, size)).flush()
+
+    initargs = (graph.offsets, graph.targets, graph.weights[metric], local, paths)
+    chunks = [(list(range(start, min(start + chunk_size, size))), nodes[start:start + chunk_size])
+              for start in range(0, size, chunk_size)]
+
+    start = time.time()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            list(pool.map(_solve_rows, *zip(*chunks)))
+    else:
+        _init_worker(*initargs)
+        for rows, chunk_nodes in chunks:
+            _solve_rows(rows, chunk_nodes)
+        _worker.clear()
+
+    with open(paths['meta'], 'w', encoding='utf-8') as f:
+        json.dump({
+            'metric': metric,
+            'signature': graph.signature(metric),
+            'nodes': [graph.codes[node] for node in nodes]
+        }, f)
+
+    print(f"Matriz {metric}: {size}x{size} en {time.time() - start:.2f}s ({workers} procesos)")
+
+
+class AllPairsMatrix:
+    def __init__(self, metric, codes, cost, hops, pred):
+        self.metric = metric
+        self.codes = codes
+        self.local = {code: i for i, code in enumerate(codes)}
+        self.cost = cost
+        self.hops = hops
+        self.pred = pred
+
+    @classmethod
+    def load(cls, graph, metric, directory='data/processed'):
+        paths = _paths(directory, metric)
+        if not all(os.path.exists(path) for path in paths.values()):
+            return None
+        with open(paths['meta'], 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['signature'] != graph.signature(metric):
+            return None
+        return cls(
+            metric, meta['nodes'],
+            np.load(paths['cost'], mmap_mode='r'),
+            np.load(paths['hops'], mmap_mode='r'),
+            np.load(paths['pred'], mmap_mode='r')
+        )
+
+    def lookup(self, origin, destination):
+        # Costo minimo y tramos en O(1); None si no hay conexion
+        i = self.local.get(origin)
+        j = self.local.get(destination)
+        if i is None or j is None:
+            return None
+        cost = int(self.cost[i, j])
+        if cost == UNREACHABLE_COST:
+            return None
+        return cost, int(self.hops[i, j])
+
+    def query(self, graph, origin, destination):
+        if self.lookup(origin, destination) is None:
+            return None
+
+        i = self.local[origin]
+        j = self.local[destination]
+        nodes = [j]
+        while nodes[-1] != i:
+            nodes.append(int(self.pred[i, nodes[-1]]))
+        nodes.reverse()
+
+        index = graph.index
+        codes = self.codes
+        edges = [
+            graph.find_edge(index[codes[u]], index[codes[v]])
+            for u, v in zip(nodes, nodes[1:])
+        ]
+        return graph.path_result(index[origin], edges, int(self.cost[i, j]), self.metric)
+
+
+def attach_all_pairs(graph, directory='data/processed', metrics=APSP_METRICS):
+    for metric in metrics:
+        matrix = AllPairsMatrix.load(graph, metric, directory)
+        if matrix is not None:
+            graph.derived[('apsp', metric)] = matrix
@@ -0,0 +1,141 @@
+import math
+import os
+
+import numpy as np
+
+from src.algorithms.astar import astar
+from src.algorithms.dijkstra import single_source
+
+
+ALT_METRICS = ('price_usd', 'duration_min', 'hops')
+
+
+def select_landmarks(graph, count=12, candidates=200):
+    # Hubs de mayor grado repartidos por el mundo: entre los candidatos se
+    # elige cada vez el mas lejano (gran circulo) a los ya elegidos.
+    degree = [graph.offsets[i + 1] - graph.offsets[i] for i in range(len(graph))]
+    hubs = sorted(range(len(graph)), key=lambda i: -degree[i])[:candidates]
+
+    def position(node):
+        airport = graph.airports[graph.codes[node]]
+        lat = math.radians(airport['latitud'])
+        lon = math.radians(airport['longitud'])
+        return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+    points = {node: position(node) for node in hubs}
+    landmarks = [hubs[0]]
+    nearest = {node: float('inf') for node in hubs}
+
+    while len(landmarks) < min(count, len(hubs)):
+        last = points[landmarks[-1]]
+        for node in hubs:
+            chord = sum((a - b) ** 2 for a, b in zip(points[node], last))
+            nearest[node] = min(nearest[node], chord)
+        landmarks.append(max(hubs, key=lambda node: (nearest[node], degree[node])))
+
+    return landmarks
+
+
+class LandmarkIndex:
+    def __init__(self, landmarks, signatures, forward, backward):
+        # forward[metric][l, v] = d(landmark_l, v); backward[metric][l, v] = d(v, landmark_l)
+        self.landmarks = landmarks
+        self.signatures = signatures
+        self.forward = forward
+        self.backward = backward
+
+    @classmethod
+    def build(cls, graph, metrics=ALT_METRICS, count=12):
+        landmarks = select_landmarks(graph, count)
+        forward = {}
+        backward = {}
+        for metric in metrics:
+            forward[metric] = np.array(
+                [single_source(graph, node, metric)[0] for node in landmarks], dtype=np.float32
+            )
+            backward[metric] = np.array(
+                [single_source(graph, node, metric, reverse=True)[0] for node in landmarks], dtype=np.float32
+            )
+        signatures = {metric: graph.signature(metric) for metric in metrics}
+        return cls(landmarks, signatures, forward, backward)
+
+    def save(self, filepath):
+        arrays = {'landmarks': np.array(self.landmarks, dtype=np.int32)}
+        for metric in self.forward:
+            arrays[f'forward_{metric}'] = self.forward[metric]
+            arrays[f'backward_{metric}'] = self.backward[metric]
+            arrays[f'signature_{metric}'] = np.array(self.signatures[metric])
+        np.savez(filepath, **arrays)
+
+    @classmethod
+    def load(cls, filepath):
+        forward = {}
+        backward = {}
+        signatures = {}
+        with np.load(filepath) as data:
+            landmarks = data['landmarks'].tolist()
+            for name in data.files:
+                if name.startswith('forward_'):
+                    metric = name[len('forward_'):]
+                    forward[metric] = data[name]
+                    backward[metric] = data[f'backward_{metric}']
+                    signatures[metric] = str(data[f'signature_{metric}'])
+        return cls(landmarks, signatures, forward, backward)
+
+    def covers(self, metric):
+        return metric in self.forward
+
+    def query(self, graph, origin, destination, metric):
+        if not graph.airport_exists(origin) or not graph.airport_exists(destination):
+            return None
+        target = graph.index[destination]
+        return astar(graph, graph.index[origin], target, metric, self.heuristic(target, metric))
+
+    def heuristic(self, target, metric):
+        # Desigualdad triangular: d(v, t) >= d(L, t) - d(L, v) y
+        # d(v, t) >= d(v, L) - d(t, L). Un termino +inf prueba que t no es
+        # alcanzable desde v; inf - inf no aporta informacion y se ignora.
+        forward = self.forward[metric]
+        backward = self.backward[metric]
+        with np.errstate(invalid='ignore'):
+            bounds = np.concatenate((
+                forward[:, target:target + 1] - forward,
+                backward - backward[:, target:target + 1]
+            ))
+        bounds[np.isnan(bounds)] = 0
+        return np.maximum(bounds.max(axis=0), 0).astype(np.float64).tolist()
+
+
+def landmarks_path(directory='data/processed'):
+    return os.path.join(directory, 'alt_landmarks.npz')
+
+
+def load_landmarks(graph, directory='data/processed'):
+    filepath = landmarks_path(directory)
+    if not os.path.exists(filepath):
+        return None
+    index = LandmarkIndex.load(filepath)
+    if any(index.signatures[metric] != graph.signature(metric) for metric in index.signatures):
+        return None
+    return index
+
+
+def attach_landmarks(graph, directory='data/processed'):
+    index = load_landmarks(graph, directory)
+    if index is not None:
+        graph.derived['alt'] = index
+    return index
+
+
+def build_landmarks(graph, directory='data/processed', count=12):
+    index = LandmarkIndex.build(graph, count=count)
+    index.save(landmarks_path(directory))
+    print(f"Landmarks: {', '.join(graph.codes[node] for node in index.landmarks)}")
+    return index
+
+
+def find_shortest_path_alt(graph, origin, destination, metric='price_usd'):
+    index = graph.derived.get('alt')
+    if index is None or not index.covers(metric):
+        return None
+    return index.query(graph, origin, destination, metric)
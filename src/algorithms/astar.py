@@ -0,0 +1,132 @@
+import heapq
+
+import numpy as np
+
+from src.calculators.distancia import haversine_batch
+from src.calculators.duracion import CRUISE_SPEED_KMH, EXTRA_TIME_MIN
+from src.calculators.precio import MIN_PRICE, PRICE_PER_KM, VARIATION_RANGE
+from src.instrumentacion import is_enabled, record_search
+
+
+def _duration_bound(distance_km):
+    # Cada tramo dura round(d / v * 60 + 30) >= d / v * 60 + 29.5, asi la
+    # cota es admisible y consistente (desigualdad triangular de la esfera).
+    return distance_km * (60 / CRUISE_SPEED_KMH) + (EXTRA_TIME_MIN - 1)
+
+
+def _price_bound(distance_km):
+    # Cada tramo cuesta al menos max(d * 0.12 * 0.6, 50) redondeado; el
+    # factor 0.989 absorbe el redondeo y mantiene la consistencia.
+    return 0.989 * np.maximum(distance_km * PRICE_PER_KM * VARIATION_RANGE[0], MIN_PRICE)
+
+
+LOWER_BOUNDS = {
+    'price_usd': _price_bound,
+    'duration_min': _duration_bound
+}
+
+
+def airport_coordinates(graph):
+    coordinates = graph.derived.get('coordinates')
+    if coordinates is None:
+        lats = np.array([graph.airports[code]['latitud'] for code in graph.codes], dtype=np.float64)
+        lons = np.array([graph.airports[code]['longitud'] for code in graph.codes], dtype=np.float64)
+        coordinates = graph.derived['coordinates'] = (lats, lons)
+    return coordinates
+
+
+def heuristic_is_valid(graph, metric):
+    # La cota solo vale si los pesos salen de los calculadores; se verifica
+    # una vez por grafo contra todas las aristas.
+    key = ('astar_valid', metric)
+    if key not in graph.derived:
+        bound = LOWER_BOUNDS.get(metric)
+        if bound is None:
+            graph.derived[key] = False
+        else:
+            lats, lons = airport_coordinates(graph)
+            sources = np.asarray(graph.sources)
+            targets = np.asarray(graph.targets)
+            distances = haversine_batch(lats[sources], lons[sources], lats[targets], lons[targets])
+            weights = np.asarray(graph.weights[metric])
+            graph.derived[key] = bool(np.all(weights >= bound(distances) - 1e-6))
+    return graph.derived[key]
+
+
+def heuristic(graph, target, metric):
+    lats, lons = airport_coordinates(graph)
+    distances = haversine_batch(lats, lons, lats[target], lons[target])
+    estimates = LOWER_BOUNDS[metric](distances)
+    estimates[target] = 0.0
+    return estimates.tolist()
+
+
+def astar(graph, source, target, metric, h):
+    # A* sobre el CSR con una cota inferior h (lista por aeropuerto); una
+    # cota infinita indica que el destino es inalcanzable desde ese nodo.
+    inf = float('inf')
+    if h[source] == inf:
+        return None
+
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights[metric]
+
+    distances = {source: 0}
+    previous_edge = {}
+    visited = set()
+
+    priority_queue = [(h[source], 0, source)]
+    pushes = 0
+
+    while priority_queue:
+        _, current_distance, current = heapq.heappop(priority_queue)
+
+        if current in visited:
+            continue
+
+        visited.add(current)
+
+        if current == target:
+            if is_enabled():
+                _record(graph, visited, target, pushes, priority_queue)
+            edges = []
+            node = target
+            while node in previous_edge:
+                edge = previous_edge[node]
+                edges.append(edge)
+                node = graph.sources[edge]
+            edges.reverse()
+            return graph.path_result(source, edges, current_distance, metric)
+
+        for edge in range(offsets[current], offsets[current + 1]):
+            next_node = targets[edge]
+
+            if next_node in visited or h[next_node] == inf:
+                continue
+
+            new_distance = current_distance + weights[edge]
+
+            if new_distance < distances.get(next_node, inf):
+                distances[next_node] = new_distance
+                previous_edge[next_node] = edge
+                heapq.heappush(priority_queue, (new_distance + h[next_node], new_distance, next_node))
+                pushes += 1
+
+    if is_enabled():
+        _record(graph, visited, target, pushes, priority_queue)
+    return None
+
+
+def _record(graph, visited, target, pushes, priority_queue):
+    offsets = graph.offsets
+    relaxed = sum(offsets[node + 1] - offsets[node] for node in visited if node != target)
+    record_search('astar', len(visited), relaxed, pushes, pushes + 1 - len(priority_queue))
+
+
+def find_shortest_path_astar(graph, origin, destination, metric='duration_min'):
+    if not graph.airport_exists(origin) or not graph.airport_exists(destination):
+        return None
+
+    target = graph.index[destination]
+    return astar(graph, graph.index[origin], target, metric, heuristic(graph, target, metric))
@@ -0,0 +1,117 @@
+def adjacency_bits(graph):
+    # Vecinos de cada aeropuerto como bitset (entero de Python); se calcula
+    # una vez por grafo y se guarda con las demas estructuras derivadas
+    bits = graph.derived.get('adjacency_bits')
+    if bits is None:
+        targets = graph.targets
+        bits = []
+        for node in range(len(graph)):
+            mask = 0
+            for edge in graph.neighbors(node):
+                mask |= 1 << targets[edge]
+            bits.append(mask)
+        graph.derived['adjacency_bits'] = bits
+    return bits
+
+
+def _members(bitset):
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+
+def _expand(bits, frontier):
+    reached = 0
+    for node in _members(frontier):
+        reached |= bits[node]
+    return reached
+
+
+def find_fewest_stops(graph, origin, destination, max_stops=999, tie_break='price_usd'):
+    # BFS bidireccional por capas con fronteras como bitsets. El grafo es
+    # simetrico, asi la expansion hacia atras usa la misma adyacencia.
+    # Entre los caminos con menos tramos se elige el de menor tie_break.
+    if not graph.airport_exists(origin) or not graph.airport_exists(destination):
+        return None
+    if max_stops < 0:
+        return None
+
+    source = graph.index[origin]
+    target = graph.index[destination]
+    if source == target:
+        return graph.path_result(source, [], 0, tie_break)
+
+    bits = adjacency_bits(graph)
+    max_legs = max_stops + 1
+
+    forward_layers = [1 << source]
+    backward_layers = [1 << target]
+    forward_seen = forward_layers[0]
+    backward_seen = backward_layers[0]
+    meeting = 0
+
+    while not meeting:
+        if len(forward_layers) + len(backward_layers) - 1 > max_legs:
+            return None
+
+        # Se expande la frontera mas pequeña
+        if forward_layers[-1].bit_count() <= backward_layers[-1].bit_count():
+            new = _expand(bits, forward_layers[-1]) & ~forward_seen
+            if not new:
+                return None
+            forward_layers.append(new)
+            forward_seen |= new
+            meeting = new & backward_layers[-1]
+        else:
+            new = _expand(bits, backward_layers[-1]) & ~backward_seen
+            if not new:
+                return None
+            backward_layers.append(new)
+            backward_seen |= new
+            meeting = new & forward_layers[-1]
+
+    # Capas restringidas a nodos que estan en algun camino minimo en tramos
+    forward_path = [meeting]
+    for layer in reversed(forward_layers[:-1]):
+        forward_path.append(layer & _expand(bits, forward_path[-1]))
+    forward_path.reverse()
+
+    backward_path = [meeting]
+    for layer in reversed(backward_layers[:-1]):
+        backward_path.append(layer & _expand(bits, backward_path[-1]))
+
+    layers = forward_path + backward_path[1:]
+    return _cheapest_in_layers(graph, source, layers, tie_break)
+
+
+def _cheapest_in_layers(graph, source, layers, tie_break):
+    # Programacion dinamica capa a capa sobre el DAG de caminos minimos
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights[tie_break]
+
+    best = {source: (0, -1)}
+    for layer, next_layer in zip(layers, layers[1:]):
+        reached = {}
+        for node in _members(layer):
+            cost = best[node][0]
+            for edge in range(offsets[node], offsets[node + 1]):
+                next_node = targets[edge]
+                if not next_layer >> next_node & 1:
+                    continue
+                new_cost = cost + weights[edge]
+                if next_node not in reached or new_cost < reached[next_node][0]:
+                    reached[next_node] = (new_cost, edge)
+        best.update(reached)
+
+    target = layers[-1].bit_length() - 1
+    edges = []
+    node = target
+    while node != source:
+        edge = best[node][1]
+        edges.append(edge)
+        node = graph.sources[edge]
+    edges.reverse()
+
+    return graph.path_result(source, edges, len(edges), tie_break)
@@ -0,0 +1,230 @@
+import heapq
+
+from src.algorithms.astar import heuristic, heuristic_is_valid
+from src.instrumentacion import is_enabled, record_search
+
+
+OBJECTIVES = {'price_usd': 0, 'duration_min': 1, 'hops': 2}
+
+
+def lower_bounds(graph, targets, metric):
+    # Cota inferior del costo que falta hasta el destino mas cercano del
+    # conjunto: landmarks si estan cargados, gran circulo si es valido y
+    # ceros si no hay nada mejor
+    if metric == 'hops':
+        return None
+    landmarks = graph.derived.get('alt')
+    bounds = None
+    for target in targets:
+        if landmarks is not None and landmarks.covers(metric):
+            estimates = landmarks.heuristic(target, metric)
+        elif heuristic_is_valid(graph, metric):
+            estimates = heuristic(graph, target, metric)
+        else:
+            return None
+        bounds = estimates if bounds is None else [min(a, b) for a, b in zip(bounds, estimates)]
+    return bounds
+
+
+def _dominated(labels, price, duration, legs):
+    for other_price, other_duration, other_legs in labels:
+        if other_price <= price and other_duration <= duration and other_legs <= legs:
+            return True
+    return False
+
+
+def find_shortest_path_constrained(graph, origin, destination, constraints, max_stops=999, metric='price_usd'):
+    if not graph.airport_exists(origin) or not graph.airport_exists(destination):
+        return None
+    return _search(graph, [graph.index[origin]], {graph.index[destination]}, constraints, max_stops, metric)
+
+
+def find_shortest_path_constrained_multi(graph, origins, destinations, constraints, max_stops=999,
+                                         metric='price_usd'):
+    sources = [graph.index[code] for code in origins if graph.airport_exists(code)]
+    target_set = {graph.index[code] for code in destinations if graph.airport_exists(code)}
+    if not sources or not target_set:
+        return None
+    return _search(graph, sources, target_set, constraints, max_stops, metric)
+
+
+def constrained_spur(graph, source, target, constraints, max_legs, metric, starts=((0, 0),),
+                     banned_nodes=(), banned_edges=()):
+    # Desvio de Yen con restricciones: parte de cada (precio, duracion) ya
+    # gastado en la raiz y evita sus nodos y las aristas ya usadas.
+    # Devuelve ((precio, duracion, tramos) al llegar, aristas, posiciones de
+    # ruta, indice del arranque usado) o None.
+    found = _label_search(
+        graph, [source], {target}, constraints, max_legs, metric, starts, banned_nodes, banned_edges
+    )
+    if found is None:
+        return None
+    labels, label_id = found
+    edges, positions = _label_path(labels, label_id)
+    return labels[label_id][:3], edges, positions, _root(labels, label_id)
+
+
+def root_labels(graph, edges, constraints):
+    # Combinaciones no dominadas (precio, duracion, posiciones de ruta) para
+    # recorrer edges en orden con rutas que cumplen las restricciones
+    leg_offsets, leg_prices, leg_durations, leg_positions = graph.pareto_legs()
+    labels = [(0, 0, [])]
+    for edge in edges:
+        extended = sorted(
+            (price + leg_prices[k], duration + leg_durations[k], positions + [leg_positions[k]])
+            for price, duration, positions in labels
+            for k in range(leg_offsets[edge], leg_offsets[edge + 1])
+            if constraints.leg_allowed(leg_prices[k], leg_durations[k])
+            and constraints.within_budget(price + leg_prices[k], duration + leg_durations[k])
+        )
+        labels = []
+        for label in extended:
+            if not labels or label[1] < labels[-1][1]:
+                labels.append(label)
+    return labels
+
+
+def _search(graph, sources, target_set, constraints, max_stops, metric):
+    found = _label_search(graph, sources, target_set, constraints, max_stops + 1, metric)
+    if found is None:
+        return None
+    labels, label_id = found
+    edges, positions = _label_path(labels, label_id)
+    final = labels[label_id]
+    total = (final[0], final[1], final[2])[OBJECTIVES[metric]]
+    return itinerary_result(graph, labels[_root(labels, label_id)][6], edges, positions, total)
+
+
+def _label_search(graph, sources, target_set, constraints, max_legs, metric, starts=((0, 0),),
+                  banned_nodes=(), banned_edges=()):
+    # Busqueda por etiquetas (precio, duracion, tramos) ordenada por el
+    # objetivo mas su cota inferior. Las restricciones se revisan al relajar
+    # cada ruta: tramos fuera de limite, aeropuertos prohibidos y ramas cuyo
+    # precio o duracion acumulados mas la cota ya superan el tope se
+    # descartan sin encolarse. Una etiqueta solo se conserva si ninguna ya
+    # asentada en el mismo aeropuerto la domina, asi el resultado es exacto.
+    banned = constraints.banned_nodes(graph) | set(banned_nodes)
+    sources = [source for source in sources if source not in banned]
+    target_set = target_set - banned
+    if not sources or not target_set or max_legs < 1:
+        return None
+
+    offsets = graph.offsets
+    targets = graph.targets
+    leg_offsets, leg_prices, leg_durations, leg_positions = graph.pareto_legs()
+    max_legs = min(max_legs, len(graph))
+
+    # Sin cota valida (pesos bajo la de gran circulo) los topes podan solo
+    # con lo acumulado
+    no_bound = [0] * len(graph)
+    price_bound = None
+    duration_bound = None
+    if constraints.max_price is not None:
+        price_bound = lower_bounds(graph, target_set, 'price_usd') or no_bound
+    if constraints.max_duration is not None:
+        duration_bound = lower_bounds(graph, target_set, 'duration_min') or no_bound
+    objective_bound = lower_bounds(graph, target_set, metric)
+    objective = OBJECTIVES[metric]
+    max_price = constraints.max_price
+    max_duration = constraints.max_duration
+    leg_allowed = constraints.leg_allowed
+    inf = float('inf')
+
+    # Cada etiqueta: (precio, duracion, tramos, padre, arista, posicion de la ruta, nodo)
+    labels = [(price, duration, 0, -1, -1, -1, source) for source in sources for price, duration in starts]
+    priority_queue = [(label[objective], label[objective], 0, label_id) for label_id, label in enumerate(labels)]
+    heapq.heapify(priority_queue)
+    initial = len(labels)
+    settled = {}
+
+    while priority_queue:
+        _, _, _, label_id = heapq.heappop(priority_queue)
+        price, duration, legs, _, _, _, node = labels[label_id]
+
+        node_labels = settled.setdefault(node, [])
+        if _dominated(node_labels, price, duration, legs):
+            continue
+        node_labels.append((price, duration, legs))
+
+        if node in target_set:
+            if is_enabled():
+                _record(graph, labels, initial, settled, target_set, max_legs, priority_queue)
+            return labels, label_id
+        if legs >= max_legs:
+            continue
+
+        next_legs = legs + 1
+        for edge in range(offsets[node], offsets[node + 1]):
+            next_node = targets[edge]
+            if next_node in banned or edge in banned_edges:
+                continue
+            for k in range(leg_offsets[edge], leg_offsets[edge + 1]):
+                leg_price = leg_prices[k]
+                leg_duration = leg_durations[k]
+                if not leg_allowed(leg_price, leg_duration):
+                    continue
+
+                new_price = price + leg_price
+                new_duration = duration + leg_duration
+                if max_price is not None and new_price + price_bound[next_node] > max_price:
+                    continue
+                if max_duration is not None and new_duration + duration_bound[next_node] > max_duration:
+                    continue
+                if _dominated(settled.get(next_node, ()), new_price, new_duration, next_legs):
+                    continue
+
+                cost = (new_price, new_duration, next_legs)[objective]
+                estimate = objective_bound[next_node] if objective_bound is not None else 0
+                if estimate == inf:
+                    continue
+                labels.append((new_price, new_duration, next_legs, label_id, edge, leg_positions[k], next_node))
+                heapq.heappush(priority_queue, (cost + estimate, cost, next_legs, len(labels) - 1))
+
+    if is_enabled():
+        _record(graph, labels, initial, settled, target_set, max_legs, priority_queue)
+    return None
+
+
+def _record(graph, labels, initial, settled, target_set, max_legs, priority_queue):
+    # Asentados son aeropuertos con alguna etiqueta conservada; solo las
+    # que no estaban en el destino ni en el tope de tramos recorrieron aristas
+    offsets = graph.offsets
+    relaxed = sum(
+        offsets[node + 1] - offsets[node]
+        for node, node_labels in settled.items() if node not in target_set
+        for _, _, legs in node_labels if legs < max_legs
+    )
+    pushes = len(labels) - initial
+    record_search('restricciones', len(settled), relaxed, pushes, len(labels) - len(priority_queue))
+
+
+def _root(labels, label_id):
+    while labels[label_id][3] != -1:
+        label_id = labels[label_id][3]
+    return label_id
+
+
+def _label_path(labels, label_id):
+    edges = []
+    positions = []
+    label = labels[label_id]
+    while label[4] != -1:
+        edges.append(label[4])
+        positions.append(label[5])
+        label = labels[label[3]]
+    edges.reverse()
+    positions.reverse()
+    return edges, positions
+
+
+def itinerary_result(graph, source, edges, positions, total_cost):
+    # Misma forma que path_result, pero con la ruta elegida en cada tramo
+    # (la mas barata de la arista puede no cumplir las restricciones)
+    routes = [graph.position_route(position) for position in positions]
+    return {
+        'path': [graph.codes[source]] + [graph.codes[graph.targets[edge]] for edge in edges],
+        'routes': routes,
+        'alternatives': [graph.edge_routes(edge) for edge in edges],
+        'total_cost': total_cost,
+        'total_stops': max(len(routes) - 1, 0)
+    }
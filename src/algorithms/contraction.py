@@ -0,0 +1,278 @@
+import heapq
+import os
+
+import numpy as np
+
+from src.instrumentacion import is_enabled, record_search
+
+
+CH_METRICS = ('price_usd', 'duration_min')
+
+
+def _witness_search(adjacency, source, excluded, max_cost, pending, settle_limit):
+    # Dijkstra local que ignora el nodo a contraer; se corta al superar
+    # max_cost, al asentar todos los vecinos pendientes o tras asentar
+    # settle_limit nodos.
+    distances = {source: 0}
+    priority_queue = [(0, source)]
+    pending = set(pending)
+    settled = 0
+
+    while priority_queue and pending and settled < settle_limit:
+        cost, node = heapq.heappop(priority_queue)
+        if cost > distances.get(node, float('inf')):
+            continue
+        if cost > max_cost:
+            break
+        settled += 1
+        pending.discard(node)
+
+        for next_node, (weight, _) in adjacency[node].items():
+            if next_node == excluded:
+                continue
+            new_cost = cost + weight
+            if new_cost < distances.get(next_node, float('inf')):
+                distances[next_node] = new_cost
+                heapq.heappush(priority_queue, (new_cost, next_node))
+
+    return distances
+
+
+def _shortcuts(adjacency, node, settle_limit):
+    neighbors = list(adjacency[node].items())
+    shortcuts = []
+
+    for i, (u, (weight_u, _)) in enumerate(neighbors):
+        rest = neighbors[i + 1:]
+        if not rest:
+            continue
+        max_cost = weight_u + max(weight for _, (weight, _) in rest)
+        distances = _witness_search(adjacency, u, node, max_cost, (w for w, _ in rest), settle_limit)
+
+        for w, (weight_w, _) in rest:
+            via = weight_u + weight_w
+            if distances.get(w, float('inf')) > via:
+                shortcuts.append((u, w, via))
+
+    return shortcuts
+
+
+def _priority(adjacency, node, shortcuts, contracted_neighbors):
+    # Diferencia de aristas mas vecinos ya contraidos (reparte la contraccion)
+    return len(shortcuts) - len(adjacency[node]) + contracted_neighbors.get(node, 0)
+
+
+def build_hierarchy(graph, metric, settle_limit=60):
+    # El grafo compilado es simetrico (cada par tiene el mismo conjunto de
+    # rutas en ambos sentidos), asi la jerarquia se construye no dirigida.
+    n = len(graph)
+    weights = graph.weights[metric]
+    adjacency = [dict() for _ in range(n)]
+    for edge in range(graph.edge_count):
+        u = graph.sources[edge]
+        v = graph.targets[edge]
+        if u == v:
+            continue
+        current = adjacency[u].get(v)
+        if current is None or weights[edge] < current[0]:
+            adjacency[u][v] = (weights[edge], -1)
+
+    contracted_neighbors = {}
+    # Prioridad inicial barata (grado); la actualizacion perezosa la corrige
+    # con la diferencia de aristas real al sacar cada nodo de la cola.
+    queue = [(len(adjacency[node]), node) for node in range(n)]
+    heapq.heapify(queue)
+
+    rank = [0] * n
+    upward = [[] for _ in range(n)]
+    order = 0
+
+    while queue:
+        priority, node = heapq.heappop(queue)
+        # Actualizacion perezosa: si la prioridad empeoro, se reinserta
+        shortcuts = _shortcuts(adjacency, node, settle_limit)
+        current = _priority(adjacency, node, shortcuts, contracted_neighbors)
+        if queue and current > queue[0][0]:
+            heapq.heappush(queue, (current, node))
+            continue
+
+        for u, w, via in shortcuts:
+            existing = adjacency[u].get(w)
+            if existing is None or via < existing[0]:
+                adjacency[u][w] = (via, node)
+                adjacency[w][u] = (via, node)
+
+        rank[node] = order
+        order += 1
+        for neighbor, (weight, middle) in adjacency[node].items():
+            upward[node].append((neighbor, weight, middle))
+            del adjacency[neighbor][node]
+            contracted_neighbors[neighbor] = contracted_neighbors.get(neighbor, 0) + 1
+        adjacency[node] = {}
+
+    return ContractionHierarchy.from_upward(graph, metric, rank, upward)
+
+
+class ContractionHierarchy:
+    def __init__(self, metric, signature, rank, offsets, targets, weights, middles):
+        self.metric = metric
+        self.signature = signature
+        self.rank = rank
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.middles = middles
+        self._middle_of = {}
+        for u in range(len(offsets) - 1):
+            for k in range(offsets[u], offsets[u + 1]):
+                self._middle_of[(u, targets[k])] = middles[k]
+
+    @classmethod
+    def from_upward(cls, graph, metric, rank, upward):
+        offsets = [0]
+        targets = []
+        weights = []
+        middles = []
+        for node in range(len(graph)):
+            for neighbor, weight, middle in upward[node]:
+                targets.append(neighbor)
+                weights.append(weight)
+                middles.append(middle)
+            offsets.append(len(targets))
+        return cls(metric, graph.signature(metric), rank, offsets, targets, weights, middles)
+
+    @property
+    def shortcut_count(self):
+        return sum(1 for middle in self.middles if middle != -1)
+
+    def save(self, filepath):
+        np.savez(
+            filepath,
+            metric=np.array(self.metric),
+            signature=np.array(self.signature),
+            rank=np.array(self.rank, dtype=np.int32),
+            offsets=np.array(self.offsets, dtype=np.int64),
+            targets=np.array(self.targets, dtype=np.int32),
+            weights=np.array(self.weights, dtype=np.float64),
+            middles=np.array(self.middles, dtype=np.int32)
+        )
+
+    @classmethod
+    def load(cls, filepath):
+        with np.load(filepath) as data:
+            return cls(
+                str(data['metric']), str(data['signature']),
+                data['rank'].tolist(), data['offsets'].tolist(), data['targets'].tolist(),
+                data['weights'].tolist(), data['middles'].tolist()
+            )
+
+    def _unpack(self, u, v, edges, graph):
+        # Una arista ascendente esta guardada en el nodo de menor rango
+        low, high = (u, v) if self.rank[u] < self.rank[v] else (v, u)
+        middle = self._middle_of[(low, high)]
+        if middle == -1:
+            edges.append(graph.find_edge(u, v))
+            return
+        self._unpack(u, middle, edges, graph)
+        self._unpack(middle, v, edges, graph)
+
+    def query(self, graph, origin, destination):
+        if not graph.airport_exists(origin) or not graph.airport_exists(destination):
+            return None
+
+        source = graph.index[origin]
+        target = graph.index[destination]
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+        inf = float('inf')
+
+        # Busqueda ascendente en ambos sentidos sobre el mismo grafo
+        searches = []
+        for start in (source, target):
+            distances = {start: 0}
+            parents = {}
+            priority_queue = [(0, start)]
+            searches.append((distances, parents, priority_queue))
+
+        best = inf
+        meeting = -1
+        pops = settled = relaxed = pushes = 0
+        while any(queue for _, _, queue in searches):
+            for distances, parents, priority_queue in searches:
+                if not priority_queue:
+                    continue
+                cost, node = heapq.heappop(priority_queue)
+                pops += 1
+                if cost > distances[node]:
+                    continue
+                if cost >= best:
+                    priority_queue.clear()
+                    continue
+                settled += 1
+                relaxed += offsets[node + 1] - offsets[node]
+
+                other = searches[1][0] if distances is searches[0][0] else searches[0][0]
+                if node in other and cost + other[node] < best:
+                    best = cost + other[node]
+                    meeting = node
+
+                for k in range(offsets[node], offsets[node + 1]):
+                    next_node = targets[k]
+                    new_cost = cost + weights[k]
+                    if new_cost < distances.get(next_node, inf):
+                        distances[next_node] = new_cost
+                        parents[next_node] = node
+                        heapq.heappush(priority_queue, (new_cost, next_node))
+                        pushes += 1
+
+        if is_enabled():
+            record_search('ch', settled, relaxed, pushes, pops)
+        if meeting == -1:
+            return None
+
+        forward_parents = searches[0][1]
+        backward_parents = searches[1][1]
+
+        up_path = [meeting]
+        while up_path[-1] in forward_parents:
+            up_path.append(forward_parents[up_path[-1]])
+        up_path.reverse()
+        node = meeting
+        while node in backward_parents:
+            node = backward_parents[node]
+            up_path.append(node)
+
+        edges = []
+        for u, v in zip(up_path, up_path[1:]):
+            self._unpack(u, v, edges, graph)
+
+        return graph.path_result(source, edges, best, self.metric)
+
+
+def hierarchy_path(metric, directory='data/processed'):
+    return os.path.join(directory, f'ch_{metric}.npz')
+
+
+def load_hierarchy(graph, metric, directory='data/processed'):
+    filepath = hierarchy_path(metric, directory)
+    if not os.path.exists(filepath):
+        return None
+    hierarchy = ContractionHierarchy.load(filepath)
+    if hierarchy.signature != graph.signature(metric):
+        return None
+    return hierarchy
+
+
+def build_hierarchies(graph, directory='data/processed', metrics=CH_METRICS):
+    for metric in metrics:
+        hierarchy = build_hierarchy(graph, metric)
+        hierarchy.save(hierarchy_path(metric, directory))
+        print(f"Jerarquia {metric}: {hierarchy.shortcut_count} atajos")
+
+
+def attach_hierarchies(graph, directory='data/processed', metrics=CH_METRICS):
+    for metric in metrics:
+        hierarchy = load_hierarchy(graph, metric, directory)
+        if hierarchy is not None:
+            graph.derived[('ch', metric)] = hierarchy
@@ -0,0 +1,417 @@
+import bisect
+import csv
+import zlib
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.calculators.precio import route_key
+from src.graph.indices import RouteIndex, route_column
+from src.validators.tiempo_conexion import minimum_connection_times
+
+
+# Salidas sinteticas: entre 1 y MAX_DAILY_DEPARTURES por ruta y dia, la
+# primera entre FIRST_DEPARTURE_MIN y FIRST_DEPARTURE_MIN + DEPARTURE_WINDOW_MIN
+MAX_DAILY_DEPARTURES = 3
+FIRST_DEPARTURE_MIN = 5 * 60
+DEPARTURE_WINDOW_MIN = 15 * 60
+DAILY_SPAN_MIN = 18 * 60
+
+# Un viaje no puede durar mas que esto; acota el barrido del perfil
+MAX_JOURNEY_MIN = 2 * 24 * 60
+
+
+class Timetable:
+    # Conexiones (salidas fechadas de un tramo) ordenadas por hora de salida
+    # en arreglos paralelos; los tiempos son minutos desde start (00:00).
+    # Se guardan como listas porque los barridos leen escalares uno a uno.
+    def __init__(self, airports, routes, start, dep_stop, arr_stop, dep_time, arr_time,
+                 route_ids, route_index=None, overrides=None):
+        order = np.lexsort((arr_time, dep_time))
+        self.start = start
+        self.airports = airports
+        self.routes = routes
+        self.codes = sorted(airports.keys())
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.dep_stop = np.asarray(dep_stop)[order].tolist()
+        self.arr_stop = np.asarray(arr_stop)[order].tolist()
+        self.dep_time = np.asarray(dep_time)[order].tolist()
+        self.arr_time = np.asarray(arr_time)[order].tolist()
+        self.route_ids = np.asarray(route_ids)[order].tolist()
+        if route_index is None:
+            route_index = RouteIndex(routes)
+        self.minimum_connection = minimum_connection_times(self.codes, route_index, overrides)
+        self._pairs = None
+
+    def __len__(self):
+        return len(self.dep_time)
+
+    @classmethod
+    def generate(cls, airports, routes, start, days=3, route_index=None, overrides=None):
+        # Horario sintetico estable: la frecuencia y la primera salida de
+        # cada ruta salen del crc32 de su clave, igual que la variacion de
+        # precio, y se repiten cada dia del horizonte. Como el grafo usa
+        # cada ruta en ambos sentidos, cada una tiene tambien salidas de
+        # vuelta con su propia semilla.
+        codes = sorted(airports.keys())
+        index = {code: i for i, code in enumerate(codes)}
+        origins = route_column(routes, 'origen')
+        destinations = route_column(routes, 'destino')
+        airlines = route_column(routes, 'aerolinea')
+        durations = np.asarray(route_column(routes, 'duration_min'), dtype=np.int64)
+
+        route_ids = []
+        returns = []
+        seeds = []
+        for i, (origin, destination, airline) in enumerate(zip(origins, destinations, airlines)):
+            if origin == destination or origin not in index or destination not in index:
+                continue
+            key = route_key(origin, destination, airline)
+            for is_return, suffix in ((False, 'horario'), (True, 'horario:vuelta')):
+                route_ids.append(i)
+                returns.append(is_return)
+                seeds.append(zlib.crc32(f"{key}:{suffix}".encode('utf-8')))
+
+        route_ids = np.array(route_ids, dtype=np.int64)
+        returns = np.array(returns, dtype=bool)
+        seeds = np.array(seeds, dtype=np.int64)
+        frequency = 1 + seeds % MAX_DAILY_DEPARTURES
+        first = FIRST_DEPARTURE_MIN + (seeds >> 4) % DEPARTURE_WINDOW_MIN
+
+        per_route = np.repeat(np.arange(len(route_ids)), frequency)
+        slot = np.arange(len(per_route)) - np.repeat(np.cumsum(frequency) - frequency, frequency)
+        daily = first[per_route] + slot * (DAILY_SPAN_MIN // frequency[per_route])
+
+        dep_time = (daily[None, :] + 1440 * np.arange(days)[:, None]).ravel()
+        connection_routes = np.tile(route_ids[per_route], days)
+        connection_returns = np.tile(returns[per_route], days)
+        arr_time = dep_time + durations[connection_routes]
+
+        origin_stop = np.array([index.get(code, -1) for code in origins], dtype=np.int64)[connection_routes]
+        destination_stop = np.array([index.get(code, -1) for code in destinations], dtype=np.int64)[connection_routes]
+        dep_stop = np.where(connection_returns, destination_stop, origin_stop)
+        arr_stop = np.where(connection_returns, origin_stop, destination_stop)
+        return cls(
+            airports, routes, start, dep_stop, arr_stop,
+            dep_time, arr_time, connection_routes, route_index, overrides
+        )
+
+    @classmethod
+    def from_departures(cls, airports, routes, departures, start, route_index=None, overrides=None):
+        # Importa salidas reales: dicts con origen, destino, aerolinea y
+        # salida/llegada como datetime. Se enlazan con su ruta si existe.
+        if route_index is None:
+            route_index = RouteIndex(routes)
+        index = {code: i for i, code in enumerate(sorted(airports.keys()))}
+
+        columns = ([], [], [], [], [])
+        for departure in departures:
+            origin = departure['origen']
+            destination = departure['destino']
+            if origin not in index or destination not in index or origin == destination:
+                continue
+            route_id = -1
+            for position in route_index.route_positions(origin, destination):
+                if routes[position]['aerolinea'] == departure.get('aerolinea'):
+                    route_id = position
+                    break
+            values = (
+                index[origin], index[destination],
+                int((departure['salida'] - start).total_seconds() // 60),
+                int((departure['llegada'] - start).total_seconds() // 60),
+                route_id
+            )
+            for column, value in zip(columns, values):
+                column.append(value)
+
+        return cls(airports, routes, start, *columns, route_index=route_index, overrides=overrides)
+
+    def to_datetime(self, minutes):
+        return self.start + timedelta(minutes=minutes)
+
+    def to_minutes(self, moment):
+        return int((moment - self.start).total_seconds() // 60)
+
+    def allowed_connections(self, constraints):
+        # Mascara por conexion para los barridos: fuera las que tocan
+        # aeropuertos prohibidos o exceden los limites por tramo. Las
+        # salidas importadas sin ruta conocida no tienen precio que revisar.
+        dep_stop = np.asarray(self.dep_stop)
+        arr_stop = np.asarray(self.arr_stop)
+        allowed = np.ones(len(dep_stop), dtype=bool)
+
+        banned = constraints.banned_nodes(self)
+        if banned:
+            banned_mask = np.zeros(len(self.codes), dtype=bool)
+            banned_mask[list(banned)] = True
+            allowed &= ~banned_mask[dep_stop] & ~banned_mask[arr_stop]
+        if constraints.max_leg_duration is not None:
+            allowed &= np.asarray(self.arr_time) - np.asarray(self.dep_time) <= constraints.max_leg_duration
+        if constraints.max_leg_price is not None:
+            route_ids = np.asarray(self.route_ids)
+            prices = np.asarray(route_column(self.routes, 'price_usd'))
+            known = route_ids >= 0
+            allowed &= ~known | (prices[np.where(known, route_ids, 0)] <= constraints.max_leg_price)
+        return allowed.tolist()
+
+    def next_departure(self, origin, destination, ready, allowed=None):
+        # Primera conexion origen -> destino que sale a partir de ready
+        if self._pairs is None:
+            pairs = {}
+            for c in range(len(self.dep_time)):
+                pairs.setdefault((self.dep_stop[c], self.arr_stop[c]), []).append(c)
+            self._pairs = {pair: ([self.dep_time[c] for c in ids], ids) for pair, ids in pairs.items()}
+
+        found = self._pairs.get((self.index.get(origin), self.index.get(destination)))
+        if found is None:
+            return None
+        times, ids = found
+        for k in range(bisect.bisect_left(times, ready), len(ids)):
+            if allowed is None or allowed[ids[k]]:
+                return ids[k]
+        return None
+
+    def connection_leg(self, c):
+        route_id = self.route_ids[c]
+        leg = dict(self.routes[route_id]) if route_id >= 0 else {}
+        leg.update({
+            'origen': self.codes[self.dep_stop[c]],
+            'destino': self.codes[self.arr_stop[c]],
+            'salida': self.dep_time[c],
+            'llegada': self.arr_time[c]
+        })
+        leg.setdefault('duration_min', self.arr_time[c] - self.dep_time[c])
+        return leg
+
+
+def load_departures_csv(filepath):
+    # Columnas: origen, destino, aerolinea, salida, llegada (ISO 8601)
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        return [
+            {
+                'origen': row['origen'],
+                'destino': row['destino'],
+                'aerolinea': row.get('aerolinea'),
+                'salida': datetime.fromisoformat(row['salida']),
+                'llegada': datetime.fromisoformat(row['llegada'])
+            }
+            for row in csv.DictReader(f)
+        ]
+
+
+def _journey(timetable, connections):
+    legs = [timetable.connection_leg(c) for c in connections]
+    return {
+        'path': [legs[0]['origen']] + [leg['destino'] for leg in legs],
+        'legs': legs,
+        'salida': legs[0]['salida'],
+        'llegada': legs[-1]['llegada'],
+        'total_stops': len(legs) - 1
+    }
+
+
+def earliest_arrival(timetable, origin, destination, departure, max_stops=None, constraints=None):
+    # Connection Scan: un unico barrido lineal por hora de salida desde
+    # departure. Una conexion sirve si se llega a su aeropuerto con el
+    # tiempo minimo de conexion (en el origen no hace falta). Con
+    # max_stops se guarda la mejor llegada por numero de tramos. Las
+    # restricciones por tramo y aeropuerto filtran conexiones en el
+    # barrido; el presupuesto total se revisa sobre el viaje encontrado.
+    source = timetable.index.get(origin)
+    target = timetable.index.get(destination)
+    if source is None or target is None or source == target:
+        return None
+
+    allowed = None
+    if constraints is not None and not constraints.is_empty():
+        allowed = timetable.allowed_connections(constraints)
+
+    if max_stops is None:
+        connections = _scan_unbounded(timetable, source, target, departure, allowed)
+    else:
+        connections = _scan_bounded(timetable, source, target, departure, max_stops + 1, allowed)
+    if connections is None:
+        return None
+    journey = _journey(timetable, connections)
+    if allowed is not None and not constraints.allows(journey['legs'], timetable.airports):
+        return None
+    return journey
+
+
+def _scan_unbounded(timetable, source, target, departure, allowed=None):
+    dep_stop = timetable.dep_stop
+    arr_stop = timetable.arr_stop
+    dep_time = timetable.dep_time
+    arr_time = timetable.arr_time
+    mct = timetable.minimum_connection
+    inf = float('inf')
+
+    earliest = [inf] * len(timetable.codes)
+    incoming = [-1] * len(timetable.codes)
+    earliest[source] = departure
+
+    for c in range(bisect.bisect_left(dep_time, departure), len(dep_time)):
+        time = dep_time[c]
+        if time >= earliest[target]:
+            break
+        stop = dep_stop[c]
+        ready = earliest[stop]
+        if ready == inf:
+            continue
+        if stop != source:
+            ready += mct[stop]
+        if time < ready:
+            continue
+        if allowed is not None and not allowed[c]:
+            continue
+        next_stop = arr_stop[c]
+        if arr_time[c] < earliest[next_stop]:
+            earliest[next_stop] = arr_time[c]
+            incoming[next_stop] = c
+
+    if incoming[target] == -1:
+        return None
+
+    # Las llegadas solo mejoran con conexiones que salen despues, asi la
+    # conexion de entrada de cada aeropuerto del camino sigue siendo valida
+    connections = []
+    stop = target
+    while stop != source:
+        c = incoming[stop]
+        connections.append(c)
+        stop = dep_stop[c]
+    connections.reverse()
+    return connections
+
+
+def _scan_bounded(timetable, source, target, departure, max_legs, allowed=None):
+    dep_stop = timetable.dep_stop
+    arr_stop = timetable.arr_stop
+    dep_time = timetable.dep_time
+    arr_time = timetable.arr_time
+    mct = timetable.minimum_connection
+    inf = float('inf')
+    n = len(timetable.codes)
+
+    # earliest[k][v]: mejor llegada a v usando exactamente k tramos
+    earliest = [[inf] * n for _ in range(max_legs + 1)]
+    incoming = [[-1] * n for _ in range(max_legs + 1)]
+    earliest[0][source] = departure
+    # Llegada mas temprana con cualquier numero de tramos: descarta rapido
+    # las conexiones que salen de aeropuertos aun no alcanzados
+    reached = [inf] * n
+    reached[source] = departure
+    best = inf
+
+    for c in range(bisect.bisect_left(dep_time, departure), len(dep_time)):
+        time = dep_time[c]
+        if time >= best:
+            break
+        stop = dep_stop[c]
+        if time < reached[stop]:
+            continue
+        if allowed is not None and not allowed[c]:
+            continue
+        next_stop = arr_stop[c]
+        arrival = arr_time[c]
+        for legs in range(max_legs):
+            ready = earliest[legs][stop]
+            if ready == inf:
+                continue
+            if legs:
+                ready += mct[stop]
+            if time < ready or arrival >= earliest[legs + 1][next_stop]:
+                continue
+            earliest[legs + 1][next_stop] = arrival
+            incoming[legs + 1][next_stop] = c
+            if arrival < reached[next_stop]:
+                reached[next_stop] = arrival
+            if next_stop == target and arrival < best:
+                best = arrival
+
+    if best == inf:
+        return None
+
+    legs = min(range(1, max_legs + 1), key=lambda k: (earliest[k][target], k))
+    connections = []
+    stop = target
+    while legs:
+        c = incoming[legs][stop]
+        connections.append(c)
+        stop = dep_stop[c]
+        legs -= 1
+    connections.reverse()
+    return connections
+
+
+def profile(timetable, origin, destination, window_start, window_end):
+    # Perfil CSA: barrido hacia atras que arma, para cada aeropuerto, la
+    # funcion salida -> llegada mas temprana al destino como lista de pares
+    # no dominados. Devuelve todos los viajes optimos que salen del origen
+    # dentro de la ventana (ninguno sale despues y llega antes que otro).
+    source = timetable.index.get(origin)
+    target = timetable.index.get(destination)
+    if source is None or target is None or source == target:
+        return []
+
+    dep_stop = timetable.dep_stop
+    arr_stop = timetable.arr_stop
+    dep_time = timetable.dep_time
+    arr_time = timetable.arr_time
+    mct = timetable.minimum_connection
+    inf = float('inf')
+    n = len(timetable.codes)
+
+    # Por aeropuerto, en orden de salida decreciente: -salida, llegada, conexion
+    negated_departures = [[] for _ in range(n)]
+    arrivals = [[] for _ in range(n)]
+    boarded = [[] for _ in range(n)]
+
+    def evaluate(stop, time):
+        k = bisect.bisect_right(negated_departures[stop], -time)
+        if k == 0:
+            return inf, -1
+        return arrivals[stop][k - 1], boarded[stop][k - 1]
+
+    # Ningun viaje optimo de la ventana llega despues que el mas temprano
+    # saliendo al final de ella; eso acota el barrido hacia atras
+    horizon = window_end + MAX_JOURNEY_MIN
+    latest = _scan_unbounded(timetable, source, target, window_end)
+    if latest is not None:
+        horizon = arr_time[latest[-1]]
+    first = bisect.bisect_left(dep_time, window_start)
+    last = bisect.bisect_right(dep_time, horizon)
+    for c in range(last - 1, first - 1, -1):
+        stop = dep_stop[c]
+        if stop == target:
+            continue
+        next_stop = arr_stop[c]
+        if next_stop == target:
+            arrival = arr_time[c]
+        else:
+            arrival = evaluate(next_stop, arr_time[c] + mct[next_stop])[0]
+        if arrival == inf:
+            continue
+
+        if arrivals[stop] and arrival >= arrivals[stop][-1]:
+            continue
+        if negated_departures[stop] and negated_departures[stop][-1] == -dep_time[c]:
+            arrivals[stop][-1] = arrival
+            boarded[stop][-1] = c
+        else:
+            negated_departures[stop].append(-dep_time[c])
+            arrivals[stop].append(arrival)
+            boarded[stop].append(c)
+
+    journeys = []
+    for negated, c in zip(negated_departures[source], boarded[source]):
+        if -negated > window_end:
+            continue
+        connections = [c]
+        while arr_stop[connections[-1]] != target:
+            stop = arr_stop[connections[-1]]
+            connections.append(evaluate(stop, arr_time[connections[-1]] + mct[stop])[1])
+        journeys.append(_journey(timetable, connections))
+
+    journeys.reverse()
+    return journeys
@@ -0,0 +1,123 @@
+from array import array
+
+
+def strongly_connected_components(graph):
+    # Tarjan iterativo sobre el CSR: una pila explicita de (nodo, siguiente
+    # arista) reemplaza la recursion, que desbordaria en componentes grandes.
+    # Devuelve el id de componente de cada nodo y el numero de componentes;
+    # los ids salen en orden topologico inverso de la condensacion.
+    n = len(graph)
+    offsets = graph.offsets
+    targets = graph.targets
+
+    index = [-1] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    component = array('l', [-1]) * n
+    stack = []
+    count = 0
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+
+        work = [(root, offsets[root])]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+
+        while work:
+            node, edge = work[-1]
+            if edge < offsets[node + 1]:
+                work[-1] = (node, edge + 1)
+                next_node = targets[edge]
+                if index[next_node] == -1:
+                    index[next_node] = lowlink[next_node] = counter
+                    counter += 1
+                    stack.append(next_node)
+                    on_stack[next_node] = True
+                    work.append((next_node, offsets[next_node]))
+                elif on_stack[next_node] and index[next_node] < lowlink[node]:
+                    lowlink[node] = index[next_node]
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if lowlink[node] < lowlink[parent]:
+                    lowlink[parent] = lowlink[node]
+
+            if lowlink[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component[member] = count
+                    if member == node:
+                        break
+                count += 1
+
+    return component, count
+
+
+def condensation(graph, component, count):
+    # DAG de componentes: successors[c] son las componentes alcanzables
+    # con un solo vuelo desde c
+    successors = [set() for _ in range(count)]
+    for edge in range(graph.edge_count):
+        u = component[graph.sources[edge]]
+        v = component[graph.targets[edge]]
+        if u != v:
+            successors[u].add(v)
+    return successors
+
+
+class ReachabilityIndex:
+    def __init__(self, graph):
+        self.component, self.count = strongly_connected_components(graph)
+        self.successors = condensation(graph, self.component, self.count)
+        self.index = graph.index
+        self.codes = graph.codes
+
+        # Clausura transitiva como bitsets; Tarjan numera las componentes en
+        # orden topologico inverso, asi los sucesores ya estan resueltos.
+        self.closure = []
+        for c in range(self.count):
+            reach = 1 << c
+            for successor in self.successors[c]:
+                reach |= self.closure[successor]
+            self.closure.append(reach)
+
+        self._members = [[] for _ in range(self.count)]
+        for node, c in enumerate(self.component):
+            self._members[c].append(node)
+
+    def reachable(self, origin, destination):
+        source = self.index.get(origin)
+        target = self.index.get(destination)
+        if source is None or target is None:
+            return False
+        return bool(self.closure[self.component[source]] >> self.component[target] & 1)
+
+    def component_size(self, code):
+        return len(self._members[self.component[self.index[code]]])
+
+    def reachable_from(self, origin):
+        source = self.index.get(origin)
+        if source is None:
+            return set()
+        codes = set()
+        closure = self.closure[self.component[source]]
+        for c in range(self.count):
+            if closure >> c & 1:
+                codes.update(self.codes[node] for node in self._members[c])
+        return codes
+
+
+def reachability_index(graph):
+    index = graph.derived.get('reachability')
+    if index is None:
+        index = ReachabilityIndex(graph)
+        graph.derived['reachability'] = index
+    return index
@@ -1,7 +1,30 @@
 import heapq
 
+from src.algorithms.astar import find_shortest_path_astar, heuristic_is_valid
+from src.algorithms.bfs import find_fewest_stops
+from src.algorithms.constrained import find_shortest_path_constrained, find_shortest_path_constrained_multi
+from src.algorithms.dfs import reachability_index
+from src.algorithms.hop_bounded import find_shortest_path_hop_bounded, find_shortest_path_multi
+from src.graph.grafo import CompiledGraph
+from src.instrumentacion import is_enabled, record_search, timed
+from src.spatial_index import airport_index
+from src.validators.restricciones import active_constraints
 
-def find_shortest_path(graph, origin, destination, max_stops=999):
+
+@timed('dijkstra.find_shortest_path')
+def find_shortest_path(graph, origin, destination, max_stops=999, metric='price_usd', constraints=None):
+    # Un Graph de diccionarios se resuelve con su version compilada: el
+    # resultado es exacto con max_stops y total_stops cuenta escalas igual
+    # que con CompiledGraph
+    if not isinstance(graph, CompiledGraph):
+        graph = graph.compiled()
+    return find_shortest_path_compiled(graph, origin, destination, max_stops, metric, constraints)
+
+
+def find_shortest_path_legacy(graph, origin, destination, max_stops=999):
+    # Dijkstra original sobre el Graph de diccionarios, solo como linea base
+    # del benchmark: una etiqueta por aeropuerto (con max_stops puede perder
+    # el optimo) y max_stops y total_stops cuentan tramos, no escalas
     if not graph.airport_exists(origin) or not graph.airport_exists(destination):
         return None
 
@@ -14,6 +37,7 @@ def find_shortest_path(graph, origin, destination, max_stops=999):
 
     priority_queue = [(0, origin)]
     visited = set()
+    pushes = 0
 
     while priority_queue:
         current_distance, current_airport = heapq.heappop(priority_queue)
@@ -49,6 +73,14 @@ def find_shortest_path(graph, origin, destination, max_stops=999):
                 route_info[next_airport] = route_data
                 stops_count[next_airport] = new_stops
                 heapq.heappush(priority_queue, (new_distance, next_airport))
+                pushes += 1
+
+    if is_enabled():
+        relaxed = sum(
+            len(graph.get_neighbors(airport)) for airport in visited
+            if airport != destination and stops_count[airport] < max_stops
+        )
+        record_search('legacy', len(visited), relaxed, pushes, pushes + 1 - len(priority_queue))
 
     if distances[destination] == float('inf'):
         return None
@@ -75,3 +107,297 @@ def find_shortest_path(graph, origin, destination, max_stops=999):
         'total_cost': total_cost,
         'total_stops': total_stops
     }
+
+
+HOP_BOUNDED_LIMIT = 8
+
+
+def find_shortest_path_compiled(graph, origin, destination, max_stops=999, metric='price_usd', constraints=None):
+    if not graph.airport_exists(origin) or not graph.airport_exists(destination):
+        return None
+    # Pares sin conexion posible se descartan en O(1) con las componentes
+    if not reachability_index(graph).reachable(origin, destination):
+        return None
+
+    # Con restricciones los indices precalculados no sirven (su optimo puede
+    # no cumplirlas); el motor por etiquetas las aplica al relajar. Los topes
+    # que cumple todo el grafo no cuentan como restriccion.
+    constraints = active_constraints(constraints, graph, max_stops)
+    if constraints is not None:
+        return find_shortest_path_constrained(graph, origin, destination, constraints, max_stops, metric)
+
+    # Menos escalas: BFS exacto, desempata por precio
+    if metric == 'hops':
+        return find_fewest_stops(graph, origin, destination, max_stops)
+
+    # Con la matriz de todos los pares la respuesta es O(1) (mas la
+    # reconstruccion del camino), y vale tambien con limite de escalas si
+    # el optimo global ya lo cumple.
+    matrix = graph.derived.get(('apsp', metric))
+    if matrix is not None:
+        found = matrix.lookup(origin, destination)
+        if found is None:
+            return None
+        if found[1] - 1 <= max_stops:
+            return matrix.query(graph, origin, destination)
+
+    if max_stops <= HOP_BOUNDED_LIMIT:
+        return find_shortest_path_hop_bounded(graph, origin, destination, max_stops, metric)
+
+    # Jerarquia de contraccion si se preproceso para esta metrica; si no,
+    # A* con landmarks (ALT), A* con la cota de gran circulo cuando es
+    # valida y, como ultimo recurso, Dijkstra bidireccional.
+    hierarchy = graph.derived.get(('ch', metric))
+    landmarks = graph.derived.get('alt')
+    if hierarchy is not None:
+        result = hierarchy.query(graph, origin, destination)
+    elif landmarks is not None and landmarks.covers(metric):
+        result = landmarks.query(graph, origin, destination, metric)
+    elif heuristic_is_valid(graph, metric):
+        result = find_shortest_path_astar(graph, origin, destination, metric)
+    else:
+        result = find_shortest_path_bidirectional(graph, origin, destination, metric)
+    if result is None:
+        return None
+
+    # Si el camino optimo usa mas escalas de las permitidas, se resuelve
+    # con el motor acotado por tramos.
+    if result['total_stops'] > max_stops:
+        return find_shortest_path_hop_bounded(graph, origin, destination, max_stops, metric)
+    return result
+
+
+def _reconstruct_edges(graph, previous_edge, node):
+    edges = []
+    while node in previous_edge:
+        edge = previous_edge[node]
+        edges.append(edge)
+        node = graph.sources[edge]
+    edges.reverse()
+    return edges
+
+
+def find_shortest_path_forward(graph, origin, destination, metric='price_usd'):
+    if not graph.airport_exists(origin) or not graph.airport_exists(destination):
+        return None
+
+    source = graph.index[origin]
+    target = graph.index[destination]
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights[metric]
+
+    # Estado perezoso: solo se guardan los aeropuertos alcanzados
+    distances = {source: 0}
+    previous_edge = {}
+    visited = set()
+
+    priority_queue = [(0, source)]
+    pushes = 0
+
+    while priority_queue:
+        current_distance, current = heapq.heappop(priority_queue)
+
+        if current in visited:
+            continue
+
+        visited.add(current)
+
+        if current == target:
+            if is_enabled():
+                _record_forward(graph, visited, target, pushes, priority_queue)
+            edges = _reconstruct_edges(graph, previous_edge, target)
+            return graph.path_result(source, edges, current_distance, metric)
+
+        for edge in range(offsets[current], offsets[current + 1]):
+            next_node = targets[edge]
+
+            if next_node in visited:
+                continue
+
+            new_distance = current_distance + weights[edge]
+
+            if new_distance < distances.get(next_node, float('inf')):
+                distances[next_node] = new_distance
+                previous_edge[next_node] = edge
+                heapq.heappush(priority_queue, (new_distance, next_node))
+                pushes += 1
+
+    if is_enabled():
+        _record_forward(graph, visited, target, pushes, priority_queue)
+    return None
+
+
+def _record_forward(graph, visited, target, pushes, priority_queue):
+    # Se derivan al final: cada asentado (salvo el destino) recorrio todas
+    # sus aristas y cada extraccion es una insercion que ya no esta en la cola
+    offsets = graph.offsets
+    relaxed = sum(offsets[node + 1] - offsets[node] for node in visited if node != target)
+    record_search('dijkstra', len(visited), relaxed, pushes, pushes + 1 - len(priority_queue))
+
+
+def find_shortest_path_bidirectional(graph, origin, destination, metric='price_usd'):
+    if not graph.airport_exists(origin) or not graph.airport_exists(destination):
+        return None
+
+    source = graph.index[origin]
+    target = graph.index[destination]
+    if source == target:
+        return graph.path_result(source, [], 0, metric)
+
+    offsets = graph.offsets
+    targets = graph.targets
+    sources = graph.sources
+    weights = graph.weights[metric]
+    in_offsets, in_edges = graph.incoming()
+
+    inf = float('inf')
+    forward_distances = {source: 0}
+    backward_distances = {target: 0}
+    forward_edge = {}
+    backward_edge = {}
+    forward_settled = set()
+    backward_settled = set()
+    forward_queue = [(0, source)]
+    backward_queue = [(0, target)]
+
+    best = inf
+    meeting = -1
+    pushes = 0
+
+    while forward_queue and backward_queue:
+        # Criterio de parada estandar: ningun camino por explorar puede
+        # mejorar el mejor encuentro conocido.
+        if forward_queue[0][0] + backward_queue[0][0] >= best:
+            break
+
+        if forward_queue[0][0] <= backward_queue[0][0]:
+            current_distance, current = heapq.heappop(forward_queue)
+            if current in forward_settled:
+                continue
+            forward_settled.add(current)
+
+            for edge in range(offsets[current], offsets[current + 1]):
+                next_node = targets[edge]
+                new_distance = current_distance + weights[edge]
+
+                if new_distance < forward_distances.get(next_node, inf):
+                    forward_distances[next_node] = new_distance
+                    forward_edge[next_node] = edge
+                    heapq.heappush(forward_queue, (new_distance, next_node))
+                    pushes += 1
+
+                other = backward_distances.get(next_node)
+                if other is not None and new_distance + other < best:
+                    best = new_distance + other
+                    meeting = next_node
+        else:
+            current_distance, current = heapq.heappop(backward_queue)
+            if current in backward_settled:
+                continue
+            backward_settled.add(current)
+
+            for k in range(in_offsets[current], in_offsets[current + 1]):
+                edge = in_edges[k]
+                previous_node = sources[edge]
+                new_distance = current_distance + weights[edge]
+
+                if new_distance < backward_distances.get(previous_node, inf):
+                    backward_distances[previous_node] = new_distance
+                    backward_edge[previous_node] = edge
+                    heapq.heappush(backward_queue, (new_distance, previous_node))
+                    pushes += 1
+
+                other = forward_distances.get(previous_node)
+                if other is not None and new_distance + other < best:
+                    best = new_distance + other
+                    meeting = previous_node
+
+    if is_enabled():
+        relaxed = sum(offsets[node + 1] - offsets[node] for node in forward_settled)
+        relaxed += sum(in_offsets[node + 1] - in_offsets[node] for node in backward_settled)
+        pops = pushes + 2 - len(forward_queue) - len(backward_queue)
+        record_search('bidireccional', len(forward_settled) + len(backward_settled), relaxed, pushes, pops)
+
+    if meeting == -1:
+        return None
+
+    edges = _reconstruct_edges(graph, forward_edge, meeting)
+    node = meeting
+    while node in backward_edge:
+        edge = backward_edge[node]
+        edges.append(edge)
+        node = targets[edge]
+
+    return graph.path_result(source, edges, best, metric)
+
+
+def single_source(graph, source, metric='price_usd', reverse=False):
+    # Dijkstra completo desde un aeropuerto (indice denso). Con reverse=True
+    # recorre las aristas entrantes: distancias hacia source.
+    n = len(graph)
+    weights = graph.weights[metric]
+    if reverse:
+        offsets, edge_ids = graph.incoming()
+        ends = graph.sources
+    else:
+        offsets = graph.offsets
+        edge_ids = None
+        ends = graph.targets
+
+    inf = float('inf')
+    distances = [inf] * n
+    distances[source] = 0
+    previous_edge = [-1] * n
+    visited = bytearray(n)
+    priority_queue = [(0, source)]
+
+    while priority_queue:
+        current_distance, current = heapq.heappop(priority_queue)
+
+        if visited[current]:
+            continue
+
+        visited[current] = 1
+
+        for k in range(offsets[current], offsets[current + 1]):
+            edge = edge_ids[k] if reverse else k
+            next_node = ends[edge]
+            new_distance = current_distance + weights[edge]
+
+            if new_distance < distances[next_node]:
+                distances[next_node] = new_distance
+                previous_edge[next_node] = edge
+                heapq.heappush(priority_queue, (new_distance, next_node))
+
+    return distances, previous_edge
+
+
+def find_shortest_path_nearby(graph, origin, destination, origin_radius=0, destination_radius=0,
+                              max_stops=999, metric='price_usd', constraints=None):
+    # Salir de cualquier aeropuerto a menos de origin_radius km del origen y
+    # llegar a cualquiera a menos de destination_radius km del destino, con
+    # una unica busqueda multi-origen / multi-destino.
+    if not origin_radius and not destination_radius:
+        return find_shortest_path(graph, origin, destination, max_stops, metric, constraints)
+    if not graph.airport_exists(origin) or not graph.airport_exists(destination):
+        return None
+
+    spatial = airport_index(graph)
+    origins = [code for code, _ in spatial.near_airport(origin, origin_radius)] or [origin]
+    destinations = [code for code, _ in spatial.near_airport(destination, destination_radius)] or [destination]
+
+    # Sin origenes repetidos como destino (seria un viaje vacio) y solo
+    # pares conectados segun las componentes
+    excluded = set(origins)
+    destinations = [code for code in destinations if code not in excluded]
+    reachability = reachability_index(graph)
+    origins = [code for code in origins if any(reachability.reachable(code, other) for other in destinations)]
+    if not origins or not destinations:
+        return None
+
+    max_stops = min(max_stops, len(graph))
+    constraints = active_constraints(constraints, graph, max_stops)
+    if constraints is not None:
+        return find_shortest_path_constrained_multi(graph, origins, destinations, constraints, max_stops, metric)
+    return find_shortest_path_multi(graph, origins, destinations, max_stops, metric)
@@ -0,0 +1,104 @@
+import heapq
+
+from src.instrumentacion import is_enabled, record_search
+
+
+def find_shortest_path_hop_bounded(graph, origin, destination, max_stops=2, metric='price_usd'):
+    # Dijkstra sobre estados (aeropuerto, tramos) con a lo sumo max_stops
+    # escalas intermedias, es decir max_stops + 1 tramos.
+    # Una etiqueta en v solo sirve si usa menos tramos que todas las ya
+    # asentadas en v (que cuestan menos o igual), asi cada aeropuerto se
+    # asienta como mucho max_stops + 2 veces y el resultado es exacto.
+    if not graph.airport_exists(origin) or not graph.airport_exists(destination):
+        return None
+    return _search(graph, [graph.index[origin]], {graph.index[destination]}, max_stops, metric)
+
+
+def find_shortest_path_multi(graph, origins, destinations, max_stops=2, metric='price_usd'):
+    # Igual que el anterior pero desde cualquiera de los origenes hacia
+    # cualquiera de los destinos, en una sola busqueda (todos los origenes
+    # entran a la cola con costo cero).
+    sources = [graph.index[code] for code in origins if graph.airport_exists(code)]
+    target_set = {graph.index[code] for code in destinations if graph.airport_exists(code)}
+    if not sources or not target_set:
+        return None
+    return _search(graph, sources, target_set, max_stops, metric)
+
+
+def _search(graph, sources, target_set, max_stops, metric):
+    if max_stops < 0:
+        return None
+
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights[metric]
+    max_legs = max_stops + 1
+
+    # Con un tramo restante solo sirve la arista a un destino; con dos, solo
+    # las que llegan a un vecino de un destino (el grafo es simetrico).
+    target_neighbors = set(target_set)
+    for target in target_set:
+        target_neighbors.update(targets[edge] for edge in graph.neighbors(target))
+
+    min_legs = {}
+    # Cada etiqueta: (costo, tramos, nodo, padre, arista)
+    labels = [(0, 0, source, -1, -1) for source in sources]
+    priority_queue = [(0, 0, label_id) for label_id in range(len(labels))]
+
+    settled = 0
+    expanded = []
+
+    while priority_queue:
+        cost, legs, label_id = heapq.heappop(priority_queue)
+        node = labels[label_id][2]
+
+        if legs >= min_legs.get(node, max_legs + 1):
+            continue
+        min_legs[node] = legs
+        settled += 1
+
+        if node in target_set:
+            if is_enabled():
+                _record(graph, labels, len(sources), settled, expanded, priority_queue)
+            return _build_result(graph, labels, label_id, cost, metric)
+
+        remaining = max_legs - legs
+        if remaining == 0:
+            continue
+        expanded.append(node)
+
+        next_legs = legs + 1
+        for edge in range(offsets[node], offsets[node + 1]):
+            next_node = targets[edge]
+
+            if remaining == 1 and next_node not in target_set:
+                continue
+            if remaining == 2 and next_node not in target_neighbors:
+                continue
+            if next_legs >= min_legs.get(next_node, max_legs + 1):
+                continue
+
+            labels.append((cost + weights[edge], next_legs, next_node, label_id, edge))
+            heapq.heappush(priority_queue, (cost + weights[edge], next_legs, len(labels) - 1))
+
+    if is_enabled():
+        _record(graph, labels, len(sources), settled, expanded, priority_queue)
+    return None
+
+
+def _record(graph, labels, initial, settled, expanded, priority_queue):
+    # Una etiqueta por insercion; solo las expandidas recorrieron aristas
+    offsets = graph.offsets
+    pushes = len(labels) - initial
+    relaxed = sum(offsets[node + 1] - offsets[node] for node in expanded)
+    record_search('acotado', settled, relaxed, pushes, len(labels) - len(priority_queue))
+
+
+def _build_result(graph, labels, label_id, total_cost, metric):
+    edges = []
+    while labels[label_id][4] != -1:
+        edges.append(labels[label_id][4])
+        label_id = labels[label_id][3]
+
+    edges.reverse()
+    return graph.path_result(labels[label_id][2], edges, total_cost, metric)
@@ -0,0 +1,126 @@
+import heapq
+
+from src.instrumentacion import is_enabled, record_search
+from src.validators.restricciones import Constraints, active_constraints
+
+
+def _dominated(labels, price, duration, stops):
+    for other_price, other_duration, other_stops, _ in labels:
+        if other_price <= price and other_duration <= duration and other_stops <= stops:
+            return True
+    return False
+
+
+def find_pareto_front(graph, origin, destination, max_stops=3, max_labels=8, max_front=12, constraints=None):
+    # Busqueda multiobjetivo por etiquetas (precio, duracion, escalas).
+    # Las etiquetas salen de la cola en orden lexicografico, asi una etiqueta
+    # asentada nunca es dominada por otra posterior. max_labels acota las
+    # etiquetas por aeropuerto y max_front el tamaño del frente final; si
+    # alguno de los dos descarta etiquetas el frente puede estar incompleto
+    # y se devuelve truncated=True junto a los itinerarios.
+    if not graph.airport_exists(origin) or not graph.airport_exists(destination):
+        return [], False
+
+    # Las restricciones podan al relajar: solo sobreviven itinerarios validos
+    constraints = active_constraints(constraints, graph, max_stops) or Constraints()
+    banned = constraints.banned_nodes(graph)
+    source = graph.index[origin]
+    target = graph.index[destination]
+    if source in banned or target in banned:
+        return [], False
+    offsets = graph.offsets
+    targets = graph.targets
+    leg_offsets, leg_prices, leg_durations, leg_positions = graph.pareto_legs()
+    max_legs = max_stops + 1
+
+    # Cada etiqueta: (precio, duracion, tramos, padre, posicion de la ruta, nodo)
+    labels = [(0.0, 0.0, 0, -1, -1, source)]
+    settled = {}
+    front = []
+    truncated = False
+
+    priority_queue = [(0.0, 0.0, 0, 0)]
+
+    while priority_queue:
+        price, duration, legs, label_id = heapq.heappop(priority_queue)
+        node = labels[label_id][5]
+
+        if _dominated(front, price, duration, legs):
+            continue
+
+        node_labels = settled.setdefault(node, [])
+        if _dominated(node_labels, price, duration, legs):
+            continue
+        if len(node_labels) >= max_labels:
+            truncated = True
+            continue
+        node_labels.append((price, duration, legs, label_id))
+
+        if node == target:
+            front.append((price, duration, legs, label_id))
+            if len(front) >= max_front:
+                # Quedan etiquetas vivas: podrian llegar a puntos no vistos
+                truncated = any(not _dominated(front, *entry[:3]) for entry in priority_queue)
+                break
+            continue
+
+        if legs >= max_legs:
+            continue
+
+        for edge in range(offsets[node], offsets[node + 1]):
+            next_node = targets[edge]
+            if next_node in banned:
+                continue
+            for k in range(leg_offsets[edge], leg_offsets[edge + 1]):
+                if not constraints.leg_allowed(leg_prices[k], leg_durations[k]):
+                    continue
+                new_price = price + leg_prices[k]
+                new_duration = duration + leg_durations[k]
+                if not constraints.within_budget(new_price, new_duration):
+                    continue
+
+                if _dominated(front, new_price, new_duration, legs + 1):
+                    continue
+                if _dominated(settled.get(next_node, ()), new_price, new_duration, legs + 1):
+                    continue
+
+                labels.append((new_price, new_duration, legs + 1, label_id, leg_positions[k], next_node))
+                heapq.heappush(priority_queue, (new_price, new_duration, legs + 1, len(labels) - 1))
+
+    if is_enabled():
+        _record(graph, labels, settled, target, max_legs, priority_queue)
+    return [_build_itinerary(graph, labels, label_id) for _, _, _, label_id in front], truncated
+
+
+def _record(graph, labels, settled, target, max_legs, priority_queue):
+    # Asentados son aeropuertos con alguna etiqueta conservada; solo las
+    # que no llegaron al destino ni al tope de tramos recorrieron aristas
+    offsets = graph.offsets
+    relaxed = sum(
+        offsets[node + 1] - offsets[node]
+        for node, node_labels in settled.items() if node != target
+        for _, _, legs, _ in node_labels if legs < max_legs
+    )
+    record_search('pareto', len(settled), relaxed, len(labels) - 1, len(labels) - len(priority_queue))
+
+
+def _build_itinerary(graph, labels, label_id):
+    path = []
+    routes = []
+    while label_id != -1:
+        price, duration, legs, parent, position, node = labels[label_id]
+        path.append(graph.codes[node])
+        if position != -1:
+            routes.append(graph.position_route(position))
+        label_id = parent
+
+    path.reverse()
+    routes.reverse()
+
+    return {
+        'path': path,
+        'routes': routes,
+        'total_price': sum(route['price_usd'] for route in routes),
+        'total_duration': sum(route['duration_min'] for route in routes),
+        'total_stops': len(routes) - 1
+    }
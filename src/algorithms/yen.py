@@ -0,0 +1,172 @@
+import heapq
+
+from src.algorithms.constrained import OBJECTIVES, constrained_spur, itinerary_result, root_labels
+from src.algorithms.dijkstra import single_source
+from src.instrumentacion import is_enabled, record_search
+from src.validators.restricciones import active_constraints
+
+
+def _spur_search(graph, source, target, metric, h, banned_nodes, banned_edges, max_legs):
+    # A* sobre estados (aeropuerto, tramos) evitando nodos y aristas
+    # prohibidos. h son las distancias exactas al destino en el grafo
+    # completo: quitar aristas solo puede alargar caminos, asi sigue siendo
+    # una cota admisible y consistente.
+    inf = float('inf')
+    if h[source] == inf:
+        return None
+
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights[metric]
+
+    min_legs = {}
+    labels = [(0, source, -1, -1)]
+    priority_queue = [(h[source], 0, 0, 0)]
+    expanded = []
+
+    while priority_queue:
+        _, cost, legs, label_id = heapq.heappop(priority_queue)
+        node = labels[label_id][1]
+
+        if legs >= min_legs.get(node, max_legs + 1):
+            continue
+        min_legs[node] = legs
+
+        if node == target:
+            if is_enabled():
+                _record(graph, labels, min_legs, expanded, priority_queue)
+            edges = []
+            while labels[label_id][3] != -1:
+                edges.append(labels[label_id][3])
+                label_id = labels[label_id][2]
+            edges.reverse()
+            return cost, edges
+
+        if legs == max_legs:
+            continue
+        expanded.append(node)
+
+        for edge in range(offsets[node], offsets[node + 1]):
+            next_node = targets[edge]
+            if next_node in banned_nodes or edge in banned_edges or h[next_node] == inf:
+                continue
+            if legs + 1 >= min_legs.get(next_node, max_legs + 1):
+                continue
+
+            new_cost = cost + weights[edge]
+            labels.append((new_cost, next_node, label_id, edge))
+            heapq.heappush(priority_queue, (new_cost + h[next_node], new_cost, legs + 1, len(labels) - 1))
+
+    if is_enabled():
+        _record(graph, labels, min_legs, expanded, priority_queue)
+    return None
+
+
+def _record(graph, labels, min_legs, expanded, priority_queue):
+    # Una busqueda de desvio: asentados son los aeropuertos alcanzados con
+    # alguna etiqueta util, aunque luego mejoren en tramos
+    offsets = graph.offsets
+    relaxed = sum(offsets[node + 1] - offsets[node] for node in expanded)
+    record_search('yen', len(min_legs), relaxed, len(labels) - 1, len(labels) - len(priority_queue))
+
+
+def find_k_shortest_paths(graph, origin, destination, k=5, max_stops=999, metric='price_usd', constraints=None):
+    # Algoritmo de Yen sobre el grafo colapsado: cada itinerario es una
+    # secuencia distinta de aeropuertos, asi las variantes que solo cambian
+    # de aerolinea ya quedan deduplicadas. Con restricciones cada desvio
+    # usa la busqueda por etiquetas, que elige la ruta de cada tramo y
+    # arranca con lo gastado por cada combinacion no dominada de la raiz.
+    if not graph.airport_exists(origin) or not graph.airport_exists(destination):
+        return []
+
+    source = graph.index[origin]
+    target = graph.index[destination]
+    if source == target:
+        return []
+
+    weights = graph.weights[metric]
+    max_legs = min(max_stops + 1, len(graph))
+    constraints = active_constraints(constraints, graph, max_stops)
+    limited = constraints is not None
+
+    # Cada desvio devuelve (costo total, aristas del desvio, posiciones de
+    # ruta del itinerario completo o None sin restricciones)
+    if limited:
+        def spur_search(node, banned_nodes, banned_edges, legs, root_edges, root_cost):
+            # La raiz puede ir por cualquier combinacion no dominada de rutas:
+            # la del aceptado anterior puede dejar al desvio sin presupuesto
+            roots = root_labels(graph, root_edges, constraints)
+            found = constrained_spur(
+                graph, node, target, constraints, legs, metric,
+                [(price, duration) for price, duration, _ in roots], banned_nodes, banned_edges
+            ) if roots else None
+            if found is None:
+                return None
+            (price, duration, spur_legs), edges, positions, start = found
+            cost = (price, duration, len(root_edges) + spur_legs)[OBJECTIVES[metric]]
+            return cost, edges, roots[start][2] + positions
+    else:
+        # Arbol de caminos minimos hacia el destino, reutilizado en cada desvio
+        h = single_source(graph, target, metric, reverse=True)[0]
+
+        def spur_search(node, banned_nodes, banned_edges, legs, root_edges, root_cost):
+            found = _spur_search(graph, node, target, metric, h, banned_nodes, banned_edges, legs)
+            return None if found is None else (root_cost + found[0], found[1], None)
+
+    first = spur_search(source, set(), set(), max_legs, [], 0)
+    if first is None:
+        return []
+
+    # Cada aceptado: (costo, aristas, posiciones de ruta o None sin restricciones)
+    accepted = [first]
+    accepted_nodes = [_path_nodes(graph, source, first[1])]
+    # Con restricciones la misma secuencia de aeropuertos puede salir de
+    # desvios distintos: se guarda el mejor costo por secuencia y las
+    # entradas superadas se descartan al sacarlas de la cola
+    done = {tuple(accepted_nodes[0])}
+    best = {}
+    candidates = []
+
+    while len(accepted) < k:
+        previous_edges = accepted[-1][1]
+        previous_nodes = accepted_nodes[-1]
+        root_cost = 0
+
+        for i in range(len(previous_edges)):
+            spur_node = previous_nodes[i]
+            root_nodes = previous_nodes[:i + 1]
+
+            banned_edges = {
+                edges[i] for (_, edges, _), nodes in zip(accepted, accepted_nodes)
+                if len(edges) > i and nodes[:i + 1] == root_nodes
+            }
+            banned_nodes = set(root_nodes[:-1])
+
+            spur = spur_search(spur_node, banned_nodes, banned_edges, max_legs - i, previous_edges[:i], root_cost)
+            if spur is not None:
+                cost, spur_edges, positions = spur
+                edges = previous_edges[:i] + spur_edges
+                nodes = tuple(_path_nodes(graph, source, edges))
+                if nodes not in done and cost < best.get(nodes, float('inf')):
+                    best[nodes] = cost
+                    heapq.heappush(candidates, (cost, len(edges), nodes, edges, positions))
+
+            root_cost += weights[previous_edges[i]]
+
+        while candidates and (candidates[0][2] in done or candidates[0][0] > best[candidates[0][2]]):
+            heapq.heappop(candidates)
+        if not candidates:
+            break
+
+        cost, _, nodes, edges, positions = heapq.heappop(candidates)
+        done.add(nodes)
+        accepted.append((cost, edges, positions))
+        accepted_nodes.append(list(nodes))
+
+    if limited:
+        return [itinerary_result(graph, source, edges, positions, cost) for cost, edges, positions in accepted]
+    return [graph.path_result(source, edges, cost, metric) for cost, edges, _ in accepted]
+
+
+def _path_nodes(graph, source, edges):
+    return [source] + [graph.targets[edge] for edge in edges]
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 
 def haversine(lat1, lon1, lat2, lon2):
     R = 6371.0
@@ -28,4 +30,31 @@ def calculate_airport_distance(origin_airport, destination_airport):
         destination_airport['longitud']
     )
 
-    return round(distance, 2)
\ No newline at end of file
+    return round(distance, 2)
+
+def haversine_batch(lat1, lon1, lat2, lon2):
+    R = 6371.0
+
+    lat1_rad = np.radians(lat1)
+    lon1_rad = np.radians(lon1)
+    lat2_rad = np.radians(lat2)
+    lon2_rad = np.radians(lon2)
+
+    dlat = lat2_rad - lat1_rad
+    dlon = lon2_rad - lon1_rad
+
+    a = np.sin(dlat / 2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return R * c
+
+
+def calculate_airport_distances(origin_lats, origin_lons, dest_lats, dest_lons):
+    distances = haversine_batch(
+        np.asarray(origin_lats, dtype=np.float64),
+        np.asarray(origin_lons, dtype=np.float64),
+        np.asarray(dest_lats, dtype=np.float64),
+        np.asarray(dest_lons, dtype=np.float64)
+    )
+
+    return np.round(distances, 2)
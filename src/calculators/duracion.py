@@ -1,13 +1,27 @@
+import numpy as np
+
+
+CRUISE_SPEED_KMH = 800.0
+EXTRA_TIME_MIN = 30
+
+
 def calculate_flight_duration(distance_km):
-    cruise_speed = 800.0
+    cruise_speed = CRUISE_SPEED_KMH
     cruise_time_hours = distance_km / cruise_speed
     cruise_time_min = cruise_time_hours * 60
-    extra_time_min = 30
+    extra_time_min = EXTRA_TIME_MIN
     total_duration = cruise_time_min + extra_time_min
 
     return int(round(total_duration))
 
 
+def calculate_flight_durations(distances_km):
+    distances_km = np.asarray(distances_km, dtype=np.float64)
+    total_duration = distances_km / CRUISE_SPEED_KMH * 60 + EXTRA_TIME_MIN
+
+    return np.rint(total_duration).astype(np.int64)
+
+
 def minutes_to_hours_format(minutes):
     hours = minutes // 60
     mins = minutes % 60
@@ -17,4 +31,4 @@ def minutes_to_hours_format(minutes):
     elif hours > 0:
         return f"{hours}h"
     else:
-        return f"{mins}min"
\ No newline at end of file
+        return f"{mins}min"
@@ -1,26 +1,62 @@
 import random
+import zlib
+
+import numpy as np
+
+
+PRICE_PER_KM = 0.12
+MIN_PRICE = 50
+VARIATION_RANGE = (0.6, 1.4)
 
 
 def calculate_flight_price(distance_km, airline=None, seed=None):
-    price_per_km = 0.12
+    price_per_km = PRICE_PER_KM
     base_price = distance_km * price_per_km
-    min_price = 50
+    min_price = MIN_PRICE
 
     if seed is not None:
         random.seed(seed)
 
-    variation_factor = random.uniform(0.6, 1.4)
+    variation_factor = random.uniform(*VARIATION_RANGE)
     price_with_variation = base_price * variation_factor
     final_price = max(price_with_variation, min_price)
 
     return int(round(final_price))
 
 
-def calculate_route_price(distance_km, origin_code, destination_code, airline=None):
+def route_key(origin_code, destination_code, airline=None):
     route_str = f"{origin_code}-{destination_code}"
     if airline:
         route_str += f"-{airline}"
+    return route_str
+
+
+def route_variation_factor(route_str):
+    # crc32 es estable entre procesos (hash() no lo es con PYTHONHASHSEED),
+    # asi el mismo tramo recibe siempre el mismo precio.
+    low, high = VARIATION_RANGE
+    return low + (high - low) * (zlib.crc32(route_str.encode('utf-8')) / 2**32)
+
+
+def calculate_route_price(distance_km, origin_code, destination_code, airline=None):
+    variation_factor = route_variation_factor(route_key(origin_code, destination_code, airline))
+    final_price = max(distance_km * PRICE_PER_KM * variation_factor, MIN_PRICE)
+
+    return int(round(final_price))
+
+
+def calculate_route_prices(distances_km, origin_codes, destination_codes, airlines=None):
+    if airlines is None:
+        airlines = [None] * len(origin_codes)
+
+    variation_factors = np.fromiter(
+        (route_variation_factor(route_key(o, d, a))
+         for o, d, a in zip(origin_codes, destination_codes, airlines)),
+        dtype=np.float64,
+        count=len(origin_codes)
+    )
 
-    seed = hash(route_str) % (2**31)
+    distances_km = np.asarray(distances_km, dtype=np.float64)
+    final_prices = np.maximum(distances_km * PRICE_PER_KM * variation_factors, MIN_PRICE)
 
-    return calculate_flight_price(distance_km, airline, seed)
+    return np.rint(final_prices).astype(np.int64)
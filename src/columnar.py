@@ -0,0 +1,226 @@
+import json
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Mapping
+
+
+# Formato: MAGIC, longitud del encabezado (uint64), encabezado JSON y luego
+# los bloques de cada columna alineados a 8 bytes.
+MAGIC = b'FLCOL\x00\x01\x00'
+
+NUMERIC_TYPES = {
+    'f8': 'd',
+    'i8': 'q',
+    'bool': 'b'
+}
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def _encode_strings(values):
+    table = {}
+    codes = array('i')
+    for value in values:
+        if value is None:
+            codes.append(-1)
+            continue
+        code = table.get(value)
+        if code is None:
+            code = table[value] = len(table)
+        codes.append(code)
+
+    offsets = array('q', [0])
+    blob = bytearray()
+    for value in table:
+        blob += value.encode('utf-8')
+        offsets.append(len(blob))
+
+    return [codes.tobytes(), offsets.tobytes(), bytes(blob)]
+
+
+def write_columnar(filepath, rows, schema, key=None):
+    blocks = []
+    columns = []
+
+    for name, kind in schema:
+        if kind in NUMERIC_TYPES:
+            typecode = NUMERIC_TYPES[kind]
+            values = array(typecode, (row[name] for row in rows))
+            parts = [values.tobytes()]
+        elif kind == 'str':
+            parts = _encode_strings([row[name] for row in rows])
+        elif kind == 'words':
+            parts = _encode_strings([' '.join(row[name]) for row in rows])
+        else:
+            raise ValueError(f"Tipo de columna desconocido: {kind}")
+
+        columns.append({'name': name, 'kind': kind, 'parts': []})
+        for part in parts:
+            columns[-1]['parts'].append(len(part))
+            blocks.append(part)
+
+    header = json.dumps({
+        'rows': len(rows),
+        'key': key,
+        'columns': columns
+    }).encode('utf-8')
+
+    # Se escribe a un temporal y se reemplaza, para no truncar un archivo
+    # que otro proceso pueda tener mapeado en memoria.
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        f.write(b'\x00' * (_align(f.tell()) - f.tell()))
+        for block in blocks:
+            f.write(block)
+            f.write(b'\x00' * (_align(len(block)) - len(block)))
+    os.replace(tmp_path, filepath)
+
+
+class StringColumn:
+    def __init__(self, codes, offsets, blob, words=False):
+        self.codes = codes
+        self.offsets = offsets
+        self.blob = blob
+        self.words = words
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def value(self, code):
+        if code < 0:
+            return None
+        value = self._cache.get(code)
+        if value is None:
+            value = str(self.blob[self.offsets[code]:self.offsets[code + 1]], 'utf-8')
+            self._cache[code] = value
+        if self.words:
+            return value.split()
+        return value
+
+    def strings(self):
+        return [self.value(code) for code in range(len(self.offsets) - 1)]
+
+    def __getitem__(self, i):
+        return self.value(self.codes[i])
+
+    def __iter__(self):
+        value = self.value
+        for code in self.codes:
+            yield value(code)
+
+
+class ColumnarTable:
+    def __init__(self, filepath):
+        self.filepath = filepath
+        with open(filepath, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(self._mmap)
+        if bytes(buffer[:8]) != MAGIC:
+            raise ValueError(f"{filepath} no es un archivo columnar valido")
+
+        (header_len,) = struct.unpack('<Q', buffer[8:16])
+        header = json.loads(bytes(buffer[16:16 + header_len]))
+        position = _align(16 + header_len)
+
+        self.rows = header['rows']
+        self.key = header['key']
+        self.columns = {}
+
+        for column in header['columns']:
+            views = []
+            for length in column['parts']:
+                views.append(buffer[position:position + length])
+                position += _align(length)
+
+            kind = column['kind']
+            if kind in NUMERIC_TYPES:
+                self.columns[column['name']] = views[0].cast(NUMERIC_TYPES[kind])
+            else:
+                codes, offsets, blob = views
+                self.columns[column['name']] = StringColumn(
+                    codes.cast('i'), offsets.cast('q'), blob, words=(kind == 'words')
+                )
+
+        self._rows_cache = None
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        return self.columns[name]
+
+    def row(self, i):
+        return RowView(self, i)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [RowView(self, j) for j in range(*i.indices(self.rows))]
+        if i < 0:
+            i += self.rows
+        if not 0 <= i < self.rows:
+            raise IndexError(i)
+        return RowView(self, i)
+
+    def __iter__(self):
+        for i in range(self.rows):
+            yield RowView(self, i)
+
+    def as_mapping(self):
+        return ColumnarMapping(self)
+
+
+class RowView(Mapping):
+    __slots__ = ('_table', '_i')
+
+    def __init__(self, table, i):
+        self._table = table
+        self._i = i
+
+    def __getitem__(self, name):
+        column = self._table.columns[name]
+        value = column[self._i]
+        if isinstance(column, memoryview) and column.format == 'b':
+            return bool(value)
+        return value
+
+    def __iter__(self):
+        return iter(self._table.columns)
+
+    def __len__(self):
+        return len(self._table.columns)
+
+    def copy(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return repr(self.copy())
+
+
+class ColumnarMapping(Mapping):
+    def __init__(self, table):
+        self.table = table
+        self._index = {code: i for i, code in enumerate(table.column(table.key))}
+
+    def __getitem__(self, code):
+        return RowView(self.table, self._index[code])
+
+    def __contains__(self, code):
+        return code in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def keys(self):
+        return self._index.keys()
@@ -1,17 +1,151 @@
+import hashlib
 import json
 import os
 
+from src.columnar import ColumnarTable, write_columnar
+from src.instrumentacion import timed
 
+
+PROCESSED_FILES = (
+    'data/processed/aeropuertos.json',
+    'data/processed/rutas.json',
+    'data/processed/aerolineas.json',
+    'data/processed/aeropuertos.bin',
+    'data/processed/rutas.bin',
+    'data/processed/aerolineas.bin'
+)
+
+PROCESSED_TABLES = ('aeropuertos', 'rutas', 'aerolineas')
+
+AIRPORT_SCHEMA = [
+    ('id', 'str'), ('nombre', 'str'), ('ciudad', 'str'), ('pais', 'str'),
+    ('iata', 'str'), ('icao', 'str'), ('latitud', 'f8'), ('longitud', 'f8'),
+    ('altitud', 'i8'), ('timezone', 'str')
+]
+
+ROUTE_SCHEMA = [
+    ('aerolinea', 'str'), ('aerolinea_id', 'str'), ('origen', 'str'),
+    ('destino', 'str'), ('codeshare', 'str'), ('escalas', 'i8'),
+    ('equipo', 'words'), ('distance_km', 'f8'), ('duration_min', 'i8'),
+    ('price_usd', 'i8')
+]
+
+AIRLINE_SCHEMA = [
+    ('id', 'str'), ('nombre', 'str'), ('alias', 'str'), ('iata', 'str'),
+    ('icao', 'str'), ('callsign', 'str'), ('pais', 'str'), ('activa', 'bool')
+]
+
+
+@timed('data_loader.load_airports')
 def load_airports(filepath='data/processed/aeropuertos.json'):
     with open(filepath, 'r', encoding='utf-8') as f:
         return json.load(f)
 
 
+@timed('data_loader.load_routes')
 def load_routes(filepath='data/processed/rutas.json'):
     with open(filepath, 'r', encoding='utf-8') as f:
         return json.load(f)
 
 
+@timed('data_loader.load_airlines')
 def load_airlines(filepath='data/processed/aerolineas.json'):
     with open(filepath, 'r', encoding='utf-8') as f:
         return json.load(f)
+
+
+@timed('data_loader.load_airports_columns')
+def load_airports_columns(filepath='data/processed/aeropuertos.bin'):
+    return ColumnarTable(filepath)
+
+
+@timed('data_loader.load_routes_columns')
+def load_routes_columns(filepath='data/processed/rutas.bin'):
+    return ColumnarTable(filepath)
+
+
+@timed('data_loader.load_airlines_columns')
+def load_airlines_columns(filepath='data/processed/aerolineas.bin'):
+    return ColumnarTable(filepath)
+
+
+def save_airports_columns(airports, filepath='data/processed/aeropuertos.bin'):
+    write_columnar(filepath, list(airports.values()), AIRPORT_SCHEMA, key='iata')
+
+
+def save_routes_columns(routes, filepath='data/processed/rutas.bin'):
+    if not routes:
+        return
+    schema = [(name, kind) for name, kind in ROUTE_SCHEMA if name in routes[0]]
+    write_columnar(filepath, routes, schema)
+
+
+def save_airlines_columns(airlines, filepath='data/processed/aerolineas.bin'):
+    write_columnar(filepath, list(airlines.values()), AIRLINE_SCHEMA, key='iata')
+
+
+def _fresh_columns(directory, name):
+    # El .bin solo vale si no es mas viejo que su JSON: los scripts escriben
+    # el JSON y despues el .bin, asi uno anterior quedo de otra corrida
+    json_path = os.path.join(directory, f'{name}.json')
+    bin_path = os.path.join(directory, f'{name}.bin')
+    if not os.path.exists(bin_path):
+        return False
+    return not os.path.exists(json_path) or os.path.getmtime(bin_path) >= os.path.getmtime(json_path)
+
+
+def loaded_files(directory='data/processed'):
+    # Archivo del que load_processed_data lee cada tabla
+    return [
+        os.path.join(directory, f'{name}.bin' if _fresh_columns(directory, name) else f'{name}.json')
+        for name in PROCESSED_TABLES
+    ]
+
+
+@timed('data_loader.load_processed_data')
+def load_processed_data(directory='data/processed'):
+    # Usa el formato columnar de cada tabla cuando esta al dia; si no,
+    # recurre a su JSON.
+    airports_path, routes_path, airlines_path = loaded_files(directory)
+    if airports_path.endswith('.bin'):
+        airports = load_airports_columns(airports_path).as_mapping()
+    else:
+        airports = load_airports(airports_path)
+    if routes_path.endswith('.bin'):
+        routes = load_routes_columns(routes_path)
+    else:
+        routes = load_routes(routes_path)
+    if airlines_path.endswith('.bin'):
+        airlines = load_airlines_columns(airlines_path).as_mapping()
+    else:
+        airlines = load_airlines(airlines_path)
+    return airports, routes, airlines
+
+
+def dataset_version(filepaths=PROCESSED_FILES):
+    digest = hashlib.sha1()
+    for filepath in filepaths:
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
+            continue
+        digest.update(f"{filepath}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+
+@timed('data_loader.dataset_hash')
+def dataset_hash(filepaths=None):
+    # Huella del contenido (no de fechas): igual tras reconstruir los mismos
+    # datos, distinta si cambia cualquier ruta o aeropuerto. Por defecto,
+    # de los archivos que load_processed_data usa de verdad.
+    if filepaths is None:
+        filepaths = loaded_files()
+    digest = hashlib.sha1()
+    for filepath in filepaths:
+        if not os.path.exists(filepath):
+            continue
+        digest.update(os.path.basename(filepath).encode())
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
@@ -1,10 +1,29 @@
+import hashlib
+from array import array
 from collections import defaultdict
 
+from src.columnar import ColumnarTable
+from src.instrumentacion import timed
+
+
+METRICS = ('price_usd', 'duration_min', 'hops')
+
+OPTIMIZATION_METRICS = {
+    'precio': 'price_usd',
+    'duracion': 'duration_min',
+    'escalas': 'hops'
+}
+
+
+def metric_for(optimization):
+    return OPTIMIZATION_METRICS.get(optimization, 'duration_min')
+
 
 class Graph:
     def __init__(self):
         self.adjacency_list = defaultdict(list)
         self.airports = {}
+        self._compiled = None
 
     def add_airport(self, code, airport_data):
         self.airports[code] = airport_data
@@ -22,20 +41,294 @@ class Graph:
     def airport_exists(self, code):
         return code in self.airports
 
+    def compiled(self):
+        # Mismas aristas en formato CSR para los motores exactos. Las rutas
+        # de vuelta son copias con origen y destino invertidos: se toma una
+        # por par de aeropuertos y aerolinea.
+        if self._compiled is None:
+            routes = {}
+            for neighbors in self.adjacency_list.values():
+                for neighbor in neighbors:
+                    route = neighbor['route_data']
+                    pair = tuple(sorted((route['origen'], route['destino'])))
+                    routes.setdefault(pair + (route.get('aerolinea'),), route)
+            self._compiled = CompiledGraph(self.airports, list(routes.values()))
+        return self._compiled
+
+    @timed('grafo.Graph.build_from_data')
     def build_from_data(self, airports, routes, optimization='precio'):
         for code, airport_data in airports.items():
             self.add_airport(code, airport_data)
 
         weight_key = 'price_usd' if optimization == 'precio' else 'duration_min'
 
+        # Una sola arista por par y sentido: la ruta de menor peso
+        best = {}
         for route in routes:
             origin = route['origen']
             destination = route['destino']
             weight = route[weight_key]
 
-            self.add_route(origin, destination, weight, route)
+            for key, reverse in (((origin, destination), False), ((destination, origin), True)):
+                current = best.get(key)
+                if current is None or weight < current[0]:
+                    best[key] = (weight, route, reverse)
+
+        for (origin, destination), (weight, route, reverse) in best.items():
+            route_data = route
+            if reverse:
+                route_data = route.copy()
+                route_data['origen'] = origin
+                route_data['destino'] = destination
+            self.add_route(origin, destination, weight, route_data)
+
+
+def _route_columns(routes, index):
+    if isinstance(routes, ColumnarTable):
+        # Traduce la tabla de cadenas una sola vez y reutiliza las vistas
+        # numericas del archivo mapeado en memoria sin copiarlas.
+        def node_ids(column):
+            lookup = [index.get(code) for code in column.strings()]
+            return [lookup[code] for code in column.codes]
+
+        return (
+            node_ids(routes.column('origen')),
+            node_ids(routes.column('destino')),
+            routes.column('price_usd'),
+            routes.column('duration_min')
+        )
+
+    return (
+        [index.get(route['origen']) for route in routes],
+        [index.get(route['destino']) for route in routes],
+        [route['price_usd'] for route in routes],
+        [route['duration_min'] for route in routes]
+    )
+
+
+class CompiledGraph:
+    # Grafo en formato CSR: las aristas salientes del aeropuerto i ocupan
+    # targets[offsets[i]:offsets[i + 1]], con un arreglo de pesos por metrica.
+    # Todas las rutas (aerolineas) entre un mismo par se colapsan en una sola
+    # arista por sentido con el peso minimo de cada metrica; el detalle por
+    # aerolinea queda en edge_route_ids y solo se lee al mostrar resultados.
+    @timed('grafo.CompiledGraph')
+    def __init__(self, airports, routes):
+        self.airports = airports
+        self.routes = routes
+        self.codes = sorted(airports)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+
+        n = len(self.codes)
+        origins, destinations, prices, durations = _route_columns(routes, self.index)
+        pairs = defaultdict(list)
+
+        for route_id, (u, v) in enumerate(zip(origins, destinations)):
+            if u is None or v is None:
+                continue
+            pairs[(u, v)].append((route_id, 0))
+            pairs[(v, u)].append((route_id, 1))
+
+        degree = [0] * (n + 1)
+        for u, _ in pairs:
+            degree[u + 1] += 1
+        for i in range(n):
+            degree[i + 1] += degree[i]
+
+        m = degree[n]
+        position = degree[:n]
+        sources = [0] * m
+        targets = [0] * m
+        edge_pairs = [None] * m
+
+        for (u, v), entries in pairs.items():
+            e = position[u]
+            position[u] = e + 1
+            sources[e] = u
+            targets[e] = v
+            edge_pairs[e] = entries
+
+        route_offsets = [0] * (m + 1)
+        route_ids = []
+        reversed_flags = []
+        edge_prices = [0.0] * m
+        edge_durations = [0.0] * m
+        best_price = [0] * m
+        best_duration = [0] * m
+
+        for e, entries in enumerate(edge_pairs):
+            base = len(route_ids)
+            cheapest = fastest = 0
+            for k, (route_id, flag) in enumerate(entries):
+                if prices[route_id] < prices[entries[cheapest][0]]:
+                    cheapest = k
+                if durations[route_id] < durations[entries[fastest][0]]:
+                    fastest = k
+                route_ids.append(route_id)
+                reversed_flags.append(flag)
+            edge_prices[e] = prices[entries[cheapest][0]]
+            edge_durations[e] = durations[entries[fastest][0]]
+            best_price[e] = base + cheapest
+            best_duration[e] = base + fastest
+            route_offsets[e + 1] = len(route_ids)
+
+        self.offsets = array('l', degree)
+        self.sources = array('l', sources)
+        self.targets = array('l', targets)
+        self.edge_route_offsets = array('l', route_offsets)
+        self.edge_route_ids = array('l', route_ids)
+        self.edge_route_reversed = array('b', reversed_flags)
+        self.best_route = {
+            'price_usd': array('l', best_price),
+            'duration_min': array('l', best_duration),
+            'hops': array('l', best_price)
+        }
+        self.weights = {
+            'price_usd': array('d', edge_prices),
+            'duration_min': array('d', edge_durations),
+            'hops': array('d', [1.0]) * m
+        }
+        self._route_prices = prices
+        self._route_durations = durations
+        self._pareto_legs = None
+        self._leg_bounds = None
+        self._incoming = None
+        # Estructuras derivadas que calculan los motores de busqueda una sola
+        # vez por grafo (heuristicas, indices, etc.)
+        self.derived = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    def airport_exists(self, code):
+        return code in self.index
+
+    def neighbors(self, node):
+        return range(self.offsets[node], self.offsets[node + 1])
+
+    def signature(self, metric):
+        # Huella de la topologia y los pesos; los indices persistidos la
+        # guardan para descartarse solos cuando cambian los datos.
+        digest = hashlib.sha1()
+        digest.update('\n'.join(self.codes).encode('utf-8'))
+        digest.update(self.offsets.tobytes())
+        digest.update(self.targets.tobytes())
+        digest.update(self.weights[metric].tobytes())
+        return digest.hexdigest()
+
+    def incoming(self):
+        # CSR inverso: in_edges[in_offsets[v]:in_offsets[v + 1]] son los ids
+        # de las aristas que llegan a v, para busquedas hacia atras.
+        if self._incoming is not None:
+            return self._incoming
+
+        n = len(self.codes)
+        in_offsets = [0] * (n + 1)
+        for v in self.targets:
+            in_offsets[v + 1] += 1
+        for i in range(n):
+            in_offsets[i + 1] += in_offsets[i]
+
+        position = in_offsets[:n]
+        in_edges = [0] * self.edge_count
+        for edge, v in enumerate(self.targets):
+            in_edges[position[v]] = edge
+            position[v] += 1
+
+        self._incoming = (array('l', in_offsets), array('l', in_edges))
+        return self._incoming
+
+    def find_edge(self, u, v):
+        for edge in range(self.offsets[u], self.offsets[u + 1]):
+            if self.targets[edge] == v:
+                return edge
+        return -1
+
+    def _route(self, position):
+        route = self.routes[self.edge_route_ids[position]]
+        if not self.edge_route_reversed[position]:
+            return route
+
+        reverse_route = route.copy()
+        reverse_route['origen'] = route['destino']
+        reverse_route['destino'] = route['origen']
+        return reverse_route
+
+    def edge_route(self, edge, metric='price_usd'):
+        return self._route(self.best_route[metric][edge])
+
+    def pareto_legs(self):
+        # Por arista, las rutas no dominadas en (precio, duracion); se calcula
+        # una sola vez y la busqueda multiobjetivo la recorre sin diccionarios.
+        if self._pareto_legs is not None:
+            return self._pareto_legs
+
+        route_prices = self._route_prices
+        route_durations = self._route_durations
+        offsets = [0]
+        prices = []
+        durations = []
+        positions = []
+        route_ids = self.edge_route_ids
+        route_offsets = self.edge_route_offsets
+
+        for edge in range(self.edge_count):
+            candidates = sorted(
+                (route_prices[route_ids[k]], route_durations[route_ids[k]], k)
+                for k in range(route_offsets[edge], route_offsets[edge + 1])
+            )
+            best_duration = float('inf')
+            for price, duration, position in candidates:
+                if duration < best_duration:
+                    best_duration = duration
+                    prices.append(price)
+                    durations.append(duration)
+                    positions.append(position)
+            offsets.append(len(positions))
+
+        self._pareto_legs = (
+            array('l', offsets), array('d', prices), array('d', durations), array('l', positions)
+        )
+        return self._pareto_legs
+
+    def leg_bounds(self):
+        # Precio y duracion del tramo mas caro y del mas largo del grafo;
+        # los topes por encima no descartan ninguna ruta
+        if self._leg_bounds is None:
+            route_ids = self.edge_route_ids
+            self._leg_bounds = (
+                max((self._route_prices[route_id] for route_id in route_ids), default=0),
+                max((self._route_durations[route_id] for route_id in route_ids), default=0)
+            )
+        return self._leg_bounds
+
+    def position_route(self, position):
+        return self._route(position)
+
+    def edge_routes(self, edge):
+        return [
+            self._route(position)
+            for position in range(self.edge_route_offsets[edge], self.edge_route_offsets[edge + 1])
+        ]
+
+    def path_result(self, source, edges, total_cost, metric='price_usd'):
+        path = [self.codes[source]]
+        routes = []
+        alternatives = []
+        for edge in edges:
+            path.append(self.codes[self.targets[edge]])
+            routes.append(self.edge_route(edge, metric))
+            alternatives.append(self.edge_routes(edge))
 
-            reverse_route = route.copy()
-            reverse_route['origen'] = destination
-            reverse_route['destino'] = origin
-            self.add_route(destination, origin, weight, reverse_route)
+        # total_stops cuenta escalas intermedias, igual que el filtro max_stops
+        return {
+            'path': path,
+            'routes': routes,
+            'alternatives': alternatives,
+            'total_cost': total_cost,
+            'total_stops': max(len(routes) - 1, 0)
+        }
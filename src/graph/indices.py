@@ -0,0 +1,43 @@
+from src.columnar import ColumnarTable, StringColumn
+
+
+def route_column(routes, name):
+    if isinstance(routes, ColumnarTable):
+        column = routes.column(name)
+        if isinstance(column, StringColumn):
+            # Codigos de la columna de cadenas traducidos una vez por valor distinto
+            strings = column.strings()
+            return [strings[code] if code >= 0 else None for code in column.codes]
+        return column
+
+    return [route[name] for route in routes]
+
+
+def route_endpoints(routes):
+    return route_column(routes, 'origen'), route_column(routes, 'destino')
+
+
+class RouteIndex:
+    # Grado de cada aeropuerto (rutas que salen o llegan) y rutas directas
+    # por par (origen, destino), calculados en una sola pasada por version
+    # de los datos.
+    def __init__(self, routes):
+        self.routes = routes
+        self.degree = {}
+        self._pairs = {}
+
+        origins, destinations = route_endpoints(routes)
+        for i, (origin, destination) in enumerate(zip(origins, destinations)):
+            self.degree[origin] = self.degree.get(origin, 0) + 1
+            if destination != origin:
+                self.degree[destination] = self.degree.get(destination, 0) + 1
+            self._pairs.setdefault((origin, destination), []).append(i)
+
+    def connections(self, code):
+        return self.degree.get(code, 0)
+
+    def route_positions(self, origin, destination):
+        return self._pairs.get((origin, destination), ())
+
+    def direct_routes(self, origin, destination):
+        return [self.routes[i] for i in self._pairs.get((origin, destination), ())]
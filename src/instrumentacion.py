@@ -0,0 +1,100 @@
+import functools
+import threading
+import time
+from contextlib import nullcontext
+
+
+SEARCH_COUNTERS = ('queries', 'settled', 'relaxed', 'heap_pushes', 'heap_pops', 'stale_pops')
+
+
+class _State(threading.local):
+    # Un estado por hilo: Streamlit atiende cada sesion en su propio hilo
+    enabled = False
+
+    def __init__(self):
+        self.stages = []
+        self.counters = {}
+        self.depth = 0
+
+
+_state = _State()
+_disabled_stage = nullcontext()
+
+
+def enable():
+    _state.enabled = True
+
+
+def disable():
+    _state.enabled = False
+
+
+def is_enabled():
+    return _state.enabled
+
+
+def start_run(enabled=None):
+    # Descarta lo medido en la ejecucion anterior del mismo hilo
+    if enabled is not None:
+        _state.enabled = enabled
+    _state.stages = []
+    _state.counters = {}
+    _state.depth = 0
+
+
+def snapshot():
+    return {
+        'stages': [tuple(stage) for stage in _state.stages],
+        'counters': {name: dict(values) for name, values in _state.counters.items()}
+    }
+
+
+class _Stage:
+    __slots__ = ('name', 'entry', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        # La etapa se anota al entrar para que quede antes que sus hijas
+        self.entry = [self.name, _state.depth, None]
+        _state.stages.append(self.entry)
+        _state.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.entry[2] = (time.perf_counter() - self.start) * 1000
+        _state.depth -= 1
+        return False
+
+
+def stage(name):
+    # Desactivado devuelve un contexto vacio compartido: sin reloj ni registro
+    if not _state.enabled:
+        return _disabled_stage
+    return _Stage(name)
+
+
+def timed(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return func(*args, **kwargs)
+            with _Stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_search(engine, settled, relaxed, pushes, pops):
+    # Los motores cuentan lo minimo en el ciclo (inserciones) y derivan el
+    # resto al terminar; solo se llama con la instrumentacion activa
+    counters = _state.counters.setdefault(engine, dict.fromkeys(SEARCH_COUNTERS, 0))
+    counters['queries'] += 1
+    counters['settled'] += settled
+    counters['relaxed'] += relaxed
+    counters['heap_pushes'] += pushes
+    counters['heap_pops'] += pops
+    counters['stale_pops'] += pops - settled
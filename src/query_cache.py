@@ -0,0 +1,163 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+_MISSING = object()
+
+# Instancia que se guarda al salir, por archivo
+_exit_saves = {}
+_exit_lock = threading.Lock()
+
+
+def _as_key(value):
+    # JSON devuelve las tuplas (tambien las anidadas) como listas
+    if isinstance(value, list):
+        return tuple(_as_key(item) for item in value)
+    return value
+
+
+class QueryCache:
+    # Cache LRU con caducidad para resultados de busqueda. La clave debe
+    # incluir la huella del dataset, asi una reconstruccion de los datos
+    # deja las entradas viejas sin aciertos y se descartan al cargar.
+    def __init__(self, max_entries=512, ttl=3600, filepath=None, save_every=25):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.filepath = filepath
+        self.save_every = save_every
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._pending = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            stored_at, value = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._pending += 1
+            should_save = self.filepath and self._pending >= self.save_every
+
+        if should_save:
+            self.save()
+
+    def get_or_compute(self, key, compute):
+        # Tambien se guardan los None: "no hay ruta" es igual de caro de repetir
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        # Foto consistente: los contadores y el tamaño se leen bajo el mismo
+        # candado que usan get y put
+        with self._lock:
+            hits = self.hits
+            misses = self.misses
+            stats = {
+                'size': len(self._entries),
+                'hits': hits,
+                'misses': misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+        lookups = hits + misses
+        stats['hit_rate'] = hits / lookups if lookups else 0.0
+        return stats
+
+    def save_at_exit(self):
+        # Si otra instancia (p. ej. de antes de cambiar el dataset) ya iba a
+        # guardar en el mismo archivo, se retira su gancho: al salir solo
+        # escribe la instancia vigente
+        if not self.filepath:
+            return
+        with _exit_lock:
+            previous = _exit_saves.get(self.filepath)
+            if previous is not None:
+                atexit.unregister(previous.save)
+            _exit_saves[self.filepath] = self
+            atexit.register(self.save)
+
+    def save(self):
+        if not self.filepath:
+            return
+        # Un guardado a la vez por instancia (asi no publica una foto mas
+        # vieja despues de una nueva) y archivo temporal unico, por si otro
+        # proceso escribe la misma ruta
+        with self._save_lock:
+            with self._lock:
+                entries = [[list(key), stored_at, value] for key, (stored_at, value) in self._entries.items()]
+                self._pending = 0
+
+            directory = os.path.dirname(self.filepath) or '.'
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.query_cache.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    # Las rutas pueden ser vistas columnares (Mapping); se guardan como dict
+                    json.dump(entries, f, ensure_ascii=False, default=dict)
+                os.replace(temp_path, self.filepath)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+    def load(self, valid=None):
+        # Carga el archivo en disco conservando solo claves aceptadas por
+        # valid (p. ej. las de la huella actual) y aun no caducadas
+        if not self.filepath or not os.path.exists(self.filepath):
+            return 0
+
+        try:
+            with open(self.filepath, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        now = time.time()
+        loaded = 0
+        with self._lock:
+            for key, stored_at, value in entries:
+                key = _as_key(key)
+                if valid is not None and not valid(key):
+                    continue
+                if self.ttl is not None and now - stored_at > self.ttl:
+                    continue
+                self._entries[key] = (stored_at, value)
+                loaded += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return loaded
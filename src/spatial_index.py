@@ -0,0 +1,138 @@
+import heapq
+import math
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0
+LEAF_SIZE = 16
+
+
+def _unit_vectors(lats, lons):
+    lat = np.radians(lats)
+    lon = np.radians(lons)
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+def _chord(radius_km):
+    # Distancia en linea recta (cuerda) equivalente a un arco de radius_km
+    return 2 * math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def _arc_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0))
+
+
+class AirportIndex:
+    # Arbol k-d implicito sobre los aeropuertos como vectores unitarios en
+    # 3D: la distancia euclidea (cuerda) crece con la de gran circulo, asi
+    # no hay problemas con el antimeridiano ni cerca de los polos.
+    def __init__(self, airports, codes=None):
+        if codes is None:
+            codes = list(airports.keys())
+        self.codes = [
+            code for code in codes
+            if airports[code]['latitud'] is not None and airports[code]['longitud'] is not None
+        ]
+        lats = np.array([airports[code]['latitud'] for code in self.codes], dtype=np.float64)
+        lons = np.array([airports[code]['longitud'] for code in self.codes], dtype=np.float64)
+        self.points = _unit_vectors(lats, lons)
+        self.coordinates = {code: (lat, lon) for code, lat, lon in zip(self.codes, lats, lons)}
+
+        # Se ordena una permutacion por la mediana de cada rango; el nodo
+        # de un rango [lo, hi) es su punto medio y el eje alterna x, y, z.
+        self.order = np.arange(len(self.codes))
+        stack = [(0, len(self.codes), 0)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if hi - lo <= LEAF_SIZE:
+                continue
+            mid = (lo + hi) // 2
+            segment = self.order[lo:hi]
+            values = self.points[segment, axis]
+            self.order[lo:hi] = segment[np.argpartition(values, mid - lo)]
+            stack.append((lo, mid, (axis + 1) % 3))
+            stack.append((mid + 1, hi, (axis + 1) % 3))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def within(self, lat, lon, radius_km):
+        # Aeropuertos a menos de radius_km, ordenados por distancia
+        query = _unit_vectors(np.array([lat]), np.array([lon]))[0]
+        limit = _chord(radius_km)
+        found = []
+        stack = [(0, len(self.codes), 0)]
+
+        while stack:
+            lo, hi, axis = stack.pop()
+            if hi - lo <= LEAF_SIZE:
+                members = self.order[lo:hi]
+                chords = np.linalg.norm(self.points[members] - query, axis=1)
+                found.extend(zip(members[chords <= limit].tolist(), chords[chords <= limit].tolist()))
+                continue
+
+            mid = (lo + hi) // 2
+            node = self.order[mid]
+            chord = float(np.linalg.norm(self.points[node] - query))
+            if chord <= limit:
+                found.append((int(node), chord))
+
+            diff = query[axis] - self.points[node, axis]
+            next_axis = (axis + 1) % 3
+            if diff <= limit:
+                stack.append((lo, mid, next_axis))
+            if diff >= -limit:
+                stack.append((mid + 1, hi, next_axis))
+
+        found.sort(key=lambda item: item[1])
+        return [(self.codes[i], float(_arc_km(chord))) for i, chord in found]
+
+    def nearest(self, lat, lon, k=5):
+        # k vecinos mas cercanos con una cola de maximos de tamaño k
+        query = _unit_vectors(np.array([lat]), np.array([lon]))[0]
+        best = []
+        stack = [(0, len(self.codes), 0)]
+
+        def consider(i, chord):
+            if len(best) < k:
+                heapq.heappush(best, (-chord, i))
+            elif chord < -best[0][0]:
+                heapq.heapreplace(best, (-chord, i))
+
+        while stack:
+            lo, hi, axis = stack.pop()
+            if hi - lo <= LEAF_SIZE:
+                members = self.order[lo:hi]
+                chords = np.linalg.norm(self.points[members] - query, axis=1)
+                for i, chord in zip(members.tolist(), chords.tolist()):
+                    consider(i, chord)
+                continue
+
+            mid = (lo + hi) // 2
+            node = self.order[mid]
+            consider(int(node), float(np.linalg.norm(self.points[node] - query)))
+
+            diff = query[axis] - self.points[node, axis]
+            next_axis = (axis + 1) % 3
+            near, far = ((lo, mid), (mid + 1, hi)) if diff <= 0 else ((mid + 1, hi), (lo, mid))
+            # La rama lejana se apila primero para visitar antes la cercana
+            if len(best) < k or abs(diff) < -best[0][0]:
+                stack.append((far[0], far[1], next_axis))
+            stack.append((near[0], near[1], next_axis))
+
+        best.sort(key=lambda item: -item[0])
+        return [(self.codes[i], float(_arc_km(-chord))) for chord, i in best]
+
+    def near_airport(self, code, radius_km):
+        lat, lon = self.coordinates[code]
+        return self.within(lat, lon, radius_km)
+
+
+def airport_index(graph):
+    # Solo aeropuertos con rutas: son los unicos utiles como origen o destino
+    index = graph.derived.get('spatial')
+    if index is None:
+        codes = [code for node, code in enumerate(graph.codes) if graph.offsets[node + 1] > graph.offsets[node]]
+        index = graph.derived['spatial'] = AirportIndex(graph.airports, codes)
+    return index
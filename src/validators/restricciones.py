@@ -0,0 +1,112 @@
+NO_LIMIT = 999999
+
+
+def _limit(value):
+    # Los filtros usan valores enormes como "sin limite"
+    if value is None or value >= NO_LIMIT:
+        return None
+    return value
+
+
+class Constraints:
+    # Restricciones que los motores revisan al relajar cada arista: tope de
+    # precio y duracion del viaje, topes por tramo y aeropuertos o paises
+    # que no se pueden pisar (ni como escala ni como extremo).
+    def __init__(self, max_price=None, max_duration=None, max_leg_price=None, max_leg_duration=None,
+                 banned_airports=(), banned_countries=()):
+        self.max_price = _limit(max_price)
+        self.max_duration = _limit(max_duration)
+        self.max_leg_price = _limit(max_leg_price)
+        self.max_leg_duration = _limit(max_leg_duration)
+        self.banned_airports = frozenset(banned_airports or ())
+        self.banned_countries = frozenset(banned_countries or ())
+
+    @classmethod
+    def from_filters(cls, filters):
+        if not filters.get('filters_enabled', False):
+            return cls()
+        return cls(
+            max_price=filters.get('max_price'),
+            max_duration=filters.get('max_duration'),
+            max_leg_price=filters.get('max_leg_price'),
+            max_leg_duration=filters.get('max_leg_duration'),
+            banned_airports=filters.get('banned_airports'),
+            banned_countries=filters.get('banned_countries')
+        )
+
+    def key(self):
+        return (
+            self.max_price, self.max_duration, self.max_leg_price, self.max_leg_duration,
+            tuple(sorted(self.banned_airports)), tuple(sorted(self.banned_countries))
+        )
+
+    def is_empty(self):
+        return self.key() == (None, None, None, None, (), ())
+
+    def relevant_to(self, graph, max_stops=None):
+        # Sin los topes que cumple cualquier tramo del grafo (o cualquier
+        # viaje de hasta max_stops + 1 tramos): los valores por defecto de
+        # los filtros no deben sacar la consulta de los motores rapidos
+        leg_price, leg_duration = graph.leg_bounds()
+        max_legs = max(len(graph) - 1, 1)
+        if max_stops is not None:
+            max_legs = min(max_stops + 1, max_legs)
+
+        def needed(limit, bound):
+            return limit if limit is not None and limit < bound else None
+
+        return Constraints(
+            max_price=needed(self.max_price, leg_price * max_legs),
+            max_duration=needed(self.max_duration, leg_duration * max_legs),
+            max_leg_price=needed(self.max_leg_price, leg_price),
+            max_leg_duration=needed(self.max_leg_duration, leg_duration),
+            banned_airports=[code for code in self.banned_airports if code in graph.index],
+            banned_countries=self.banned_countries
+        )
+
+    def banned_nodes(self, graph):
+        banned = {graph.index[code] for code in self.banned_airports if code in graph.index}
+        if self.banned_countries:
+            for node, code in enumerate(graph.codes):
+                if graph.airports[code]['pais'] in self.banned_countries:
+                    banned.add(node)
+        return banned
+
+    def leg_allowed(self, price, duration):
+        if self.max_leg_price is not None and price > self.max_leg_price:
+            return False
+        if self.max_leg_duration is not None and duration > self.max_leg_duration:
+            return False
+        return True
+
+    def within_budget(self, price, duration):
+        if self.max_price is not None and price > self.max_price:
+            return False
+        if self.max_duration is not None and duration > self.max_duration:
+            return False
+        return True
+
+    def allows(self, routes, airports):
+        # Verificacion de un itinerario ya armado (rutas con origen/destino)
+        if not routes:
+            return True
+        codes = [routes[0]['origen']] + [route['destino'] for route in routes]
+        if any(code in self.banned_airports for code in codes):
+            return False
+        if self.banned_countries and any(airports[code]['pais'] in self.banned_countries for code in codes):
+            return False
+        # Un tramo sin precio conocido (salidas importadas) no suma al presupuesto
+        if not all(self.leg_allowed(route.get('price_usd', 0), route['duration_min']) for route in routes):
+            return False
+        return self.within_budget(
+            sum(route.get('price_usd', 0) for route in routes),
+            sum(route['duration_min'] for route in routes)
+        )
+
+
+def active_constraints(constraints, graph, max_stops=None):
+    # None cuando ninguna restriccion puede descartar un itinerario del grafo
+    if constraints is None:
+        return None
+    relevant = constraints.relevant_to(graph, max_stops)
+    return None if relevant.is_empty() else relevant
@@ -0,0 +1,47 @@
+from src.validators.tiempo_conexion import connection_is_valid
+
+
+def connection_problems(legs, minimum_by_airport):
+    # Conexiones de un itinerario con horarios que no respetan el tiempo
+    # minimo del aeropuerto; cada tramo tiene origen, destino, salida y
+    # llegada (minutos)
+    problems = []
+    for previous, current in zip(legs, legs[1:]):
+        airport = current['origen']
+        minimum = minimum_by_airport[airport]
+        if previous['destino'] != airport:
+            problems.append((airport, None, minimum))
+        elif not connection_is_valid(previous['llegada'], current['salida'], minimum):
+            problems.append((airport, current['salida'] - previous['llegada'], minimum))
+    return problems
+
+
+def is_feasible(legs, minimum_by_airport):
+    return not connection_problems(legs, minimum_by_airport)
+
+
+def schedule_path(timetable, path, departure, constraints=None):
+    # Asigna a una secuencia de aeropuertos (p. ej. la de Dijkstra, que no
+    # mira horarios) las primeras salidas que conectan respetando el tiempo
+    # minimo de conexion. None si no conecta dentro del horizonte o si las
+    # salidas elegidas no cumplen las restricciones.
+    allowed = None
+    if constraints is not None and not constraints.is_empty():
+        allowed = timetable.allowed_connections(constraints)
+
+    legs = []
+    ready = departure
+    for leg_origin, leg_destination in zip(path, path[1:]):
+        connection = timetable.next_departure(leg_origin, leg_destination, ready, allowed)
+        if connection is None:
+            return None
+        leg = timetable.connection_leg(connection)
+        legs.append(leg)
+        ready = leg['llegada'] + timetable.minimum_connection[timetable.index[leg_destination]]
+
+    minimum_by_airport = {code: timetable.minimum_connection[timetable.index[code]] for code in path}
+    if not is_feasible(legs, minimum_by_airport):
+        return None
+    if allowed is not None and not constraints.allows(legs, timetable.airports):
+        return None
+    return legs
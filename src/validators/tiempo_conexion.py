@@ -0,0 +1,26 @@
+MIN_CONNECTION_MIN = 45
+
+# (conexiones minimas del aeropuerto, minutos de conexion minima): los
+# aeropuertos grandes necesitan mas tiempo para cambiar de vuelo
+CONNECTION_TIERS = ((300, 90), (100, 60), (0, MIN_CONNECTION_MIN))
+
+
+def minimum_connection_time(connections, overrides=None, code=None):
+    if overrides and code in overrides:
+        return overrides[code]
+    for minimum, minutes in CONNECTION_TIERS:
+        if connections >= minimum:
+            return minutes
+    return MIN_CONNECTION_MIN
+
+
+def minimum_connection_times(codes, route_index, overrides=None):
+    # Tiempo minimo de conexion por aeropuerto, en el orden de codes
+    return [
+        minimum_connection_time(route_index.connections(code), overrides, code)
+        for code in codes
+    ]
+
+
+def connection_is_valid(arrival, departure, minimum):
+    return departure - arrival >= minimum
@@ -0,0 +1,169 @@
+import json
+import math
+import os
+
+import folium
+import numpy as np
+from branca.element import MacroElement
+from folium.plugins import FastMarkerCluster
+from jinja2 import Template
+
+from src.graph.indices import RouteIndex, route_endpoints
+
+
+# (zoom minimo, tamaño de celda en grados); 0 dibuja cada par de aeropuertos
+LOD_LEVELS = ((0, 10.0), (4, 5.0), (6, 0.0))
+
+# (conexiones minimas, radio, color) para los marcadores de aeropuertos
+DEGREE_STYLES = ((101, 6, 'red'), (51, 4, 'orange'), (0, 2, 'blue'))
+
+
+def aggregate_routes(airports, routes, cell_size):
+    # Agrupa las rutas por par de celdas de una malla lat/lon y emite una
+    # sola capa GeoJSON: una linea por par con el numero de rutas que junta.
+    # Cada celda se dibuja en el centroide de sus aeropuertos.
+    codes = list(airports.keys())
+    index = {code: i for i, code in enumerate(codes)}
+    lats = np.array([airports[code]['latitud'] for code in codes], dtype=np.float64)
+    lons = np.array([airports[code]['longitud'] for code in codes], dtype=np.float64)
+
+    origins, destinations = route_endpoints(routes)
+    o = np.array([index.get(code, -1) for code in origins], dtype=np.int64)
+    d = np.array([index.get(code, -1) for code in destinations], dtype=np.int64)
+    valid = (o >= 0) & (d >= 0)
+    o, d = o[valid], d[valid]
+
+    if cell_size:
+        rows = np.floor((lats + 90) / cell_size).astype(np.int64)
+        columns = np.floor((lons + 180) / cell_size).astype(np.int64)
+        cells, cell_of = np.unique(rows * (int(360 / cell_size) + 1) + columns, return_inverse=True)
+        counts = np.bincount(cell_of, minlength=len(cells))
+        cell_lats = np.bincount(cell_of, weights=lats, minlength=len(cells)) / counts
+        cell_lons = np.bincount(cell_of, weights=lons, minlength=len(cells)) / counts
+    else:
+        cell_of = np.arange(len(codes))
+        cell_lats, cell_lons = lats, lons
+
+    a, b = cell_of[o], cell_of[d]
+    keep = a != b
+    low = np.minimum(a[keep], b[keep])
+    high = np.maximum(a[keep], b[keep])
+    pairs, totals = np.unique(low * len(cell_lats) + high, return_counts=True)
+
+    features = []
+    for pair, total in zip(pairs.tolist(), totals.tolist()):
+        u, v = divmod(pair, len(cell_lats))
+        features.append({
+            'type': 'Feature',
+            'geometry': {
+                'type': 'LineString',
+                'coordinates': [
+                    [round(float(cell_lons[u]), 4), round(float(cell_lats[u]), 4)],
+                    [round(float(cell_lons[v]), 4), round(float(cell_lats[v]), 4)]
+                ]
+            },
+            'properties': {'rutas': total}
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def airport_points(airports, routes, degree_styles=DEGREE_STYLES):
+    # [lat, lon, popup, radio, color] por aeropuerto, para el cluster
+    route_index = RouteIndex(routes)
+    points = []
+    for code, airport in airports.items():
+        connections = route_index.connections(code)
+        radius, color = next((r, c) for minimum, r, c in degree_styles if connections >= minimum)
+        points.append([
+            airport['latitud'], airport['longitud'],
+            f"<b>{code}</b><br>{airport['ciudad']}<br>{airport['pais']}<br>{connections} conexiones",
+            radius, color
+        ])
+    return points
+
+
+def network_layers(airports, routes, levels=LOD_LEVELS, cache_path=None, version=None,
+                   degree_styles=DEGREE_STYLES):
+    # Capas ya agregadas de toda la red; con cache_path se guardan en disco
+    # y se reutilizan mientras no cambien los datos, los niveles ni los
+    # estilos de los marcadores
+    key = {
+        'version': version,
+        'levels': [list(level) for level in levels],
+        'degree_styles': [list(style) for style in degree_styles]
+    }
+    if cache_path and version and os.path.exists(cache_path):
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if all(cached.get(name) == value for name, value in key.items()):
+            return cached
+
+    layers = {
+        **key,
+        'routes': [aggregate_routes(airports, routes, cell_size) for _, cell_size in levels],
+        'airports': airport_points(airports, routes, degree_styles)
+    }
+
+    if cache_path and version:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(layers, f, ensure_ascii=False, separators=(',', ':'))
+    return layers
+
+
+class ZoomLevels(MacroElement):
+    # Muestra solo la capa de rutas que corresponde al zoom actual
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var map = {{ this._parent.get_name() }};
+            var levels = [
+                {% for zoom, layer in this.levels %}[{{ zoom }}, {{ layer.get_name() }}],{% endfor %}
+            ];
+            function update() {
+                var active = null;
+                levels.forEach(function(level) { if (map.getZoom() >= level[0]) { active = level[1]; } });
+                levels.forEach(function(level) {
+                    if (level[1] === active) { if (!map.hasLayer(level[1])) { map.addLayer(level[1]); } }
+                    else if (map.hasLayer(level[1])) { map.removeLayer(level[1]); }
+                });
+            }
+            map.on('zoomend', update);
+            update();
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, levels):
+        super().__init__()
+        self._name = 'ZoomLevels'
+        self.levels = levels
+
+
+AIRPORT_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: row[3], color: row[4], fillColor: row[4], fill: true, fillOpacity: 0.7
+    });
+    marker.bindPopup(row[2]);
+    return marker;
+}
+"""
+
+
+def add_network_layers(map_obj, layers, color='red', opacity=0.35):
+    route_layers = []
+    for (min_zoom, _), collection in zip(layers['levels'], layers['routes']):
+        layer = folium.GeoJson(
+            collection,
+            style_function=lambda feature: {
+                'color': color,
+                'weight': round(min(1 + math.log2(feature['properties']['rutas']), 6), 1),
+                'opacity': opacity
+            }
+        )
+        layer.add_to(map_obj)
+        route_layers.append((min_zoom, layer))
+    map_obj.add_child(ZoomLevels(route_layers))
+
+    FastMarkerCluster(layers['airports'], callback=AIRPORT_CALLBACK).add_to(map_obj)
+    return map_obj
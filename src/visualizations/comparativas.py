@@ -0,0 +1,144 @@
+import json
+import os
+
+import numpy as np
+from matplotlib.figure import Figure
+
+
+CATEGORIES = ('local', 'continental', 'intercontinental', 'inalcanzable')
+CATEGORY_COLORS = {
+    'local': '#2ca02c',
+    'continental': '#1f77b4',
+    'intercontinental': '#ff7f0e',
+    'inalcanzable': '#7f7f7f'
+}
+FIELD_LABELS = {
+    'p50_ms': 'Latencia p50 (ms)',
+    'p90_ms': 'Latencia p90 (ms)',
+    'p99_ms': 'Latencia p99 (ms)',
+    'settled': 'Nodos asentados',
+    'heap_pushes': 'Inserciones en la cola',
+    'heap_pops': 'Extracciones de la cola',
+    'stale_pops': 'Extracciones obsoletas',
+    'peak_kb': 'Memoria pico (KB)'
+}
+
+
+def load_results(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def metrics_of(results):
+    return sorted({entry['metric'] for entry in results['summary']})
+
+
+def _table(results, metric):
+    # {motor: {categoria: fila del resumen}} en el orden de la corrida
+    table = {}
+    for entry in results['summary']:
+        if entry['metric'] == metric:
+            table.setdefault(entry['engine'], {})[entry['category']] = entry
+    return table
+
+
+def _grouped_bars(ax, engines, values, errors=None):
+    positions = np.arange(len(engines))
+    width = 0.8 / len(CATEGORIES)
+    for i, category in enumerate(CATEGORIES):
+        offset = positions + (i - (len(CATEGORIES) - 1) / 2) * width
+        ax.bar(
+            offset, values[category], width,
+            yerr=errors[category] if errors else None,
+            color=CATEGORY_COLORS[category], label=category, capsize=2
+        )
+    ax.set_xticks(positions)
+    ax.set_xticklabels(engines, rotation=30, ha='right')
+
+
+def plot_field(results, metric, field, ax, log_scale=True):
+    table = _table(results, metric)
+    engines = list(table)
+    values = {
+        category: [table[engine].get(category, {}).get(field) or 0 for engine in engines]
+        for category in CATEGORIES
+    }
+    _grouped_bars(ax, engines, values)
+    ax.set_ylabel(FIELD_LABELS.get(field, field))
+    if log_scale and any(v > 0 for vs in values.values() for v in vs):
+        ax.set_yscale('log')
+    return ax
+
+
+def plot_latency(results, metric, ax):
+    # Barra en p50 y bigote hasta p90 por motor y categoria de par
+    table = _table(results, metric)
+    engines = list(table)
+    values = {}
+    errors = {}
+    for category in CATEGORIES:
+        p50 = [table[engine].get(category, {}).get('p50_ms') or 0 for engine in engines]
+        p90 = [table[engine].get(category, {}).get('p90_ms') or 0 for engine in engines]
+        values[category] = p50
+        errors[category] = [[0] * len(p50), [max(b - a, 0) for a, b in zip(p50, p90)]]
+    _grouped_bars(ax, engines, values, errors)
+    ax.set_ylabel('Latencia p50-p90 (ms)')
+    ax.set_yscale('log')
+    return ax
+
+
+def plot_speedup(baseline, current, metric, ax, field='p50_ms'):
+    # Cociente base / actual: por encima de 1 es aceleracion, por debajo
+    # regresion. Solo motores presentes en ambas corridas.
+    before = _table(baseline, metric)
+    after = _table(current, metric)
+    engines = [engine for engine in after if engine in before]
+    values = {}
+    for category in CATEGORIES:
+        ratios = []
+        for engine in engines:
+            old = before[engine].get(category, {}).get(field)
+            new = after[engine].get(category, {}).get(field)
+            ratios.append(old / new if old and new else 0)
+        values[category] = ratios
+    _grouped_bars(ax, engines, values)
+    ax.axhline(1.0, color='black', linewidth=0.8, linestyle='--')
+    ax.set_ylabel(f'Aceleracion ({FIELD_LABELS.get(field, field)})')
+    ax.set_yscale('log')
+    return ax
+
+
+def comparison_figure(results, metric):
+    figure = Figure(figsize=(14, 12))
+    axes = figure.subplots(3, 1)
+    plot_latency(results, metric, axes[0])
+    plot_field(results, metric, 'settled', axes[1])
+    plot_field(results, metric, 'peak_kb', axes[2])
+    figure.suptitle(f'Motores de busqueda - {metric}', x=0.01, ha='left')
+    figure.legend(*axes[0].get_legend_handles_labels(), loc='upper right', ncol=len(CATEGORIES))
+    figure.tight_layout(rect=(0, 0, 1, 0.97))
+    return figure
+
+
+def speedup_figure(baseline, current, metric):
+    figure = Figure(figsize=(14, 5))
+    ax = figure.subplots()
+    plot_speedup(baseline, current, metric, ax)
+    figure.suptitle(f'Corrida actual contra la base - {metric}', x=0.01, ha='left')
+    figure.legend(*ax.get_legend_handles_labels(), loc='upper right', ncol=len(CATEGORIES))
+    figure.tight_layout(rect=(0, 0, 1, 0.92))
+    return figure
+
+
+def save_report(results, directory, baseline=None):
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for metric in metrics_of(results):
+        filepath = os.path.join(directory, f'comparativa_{metric}.png')
+        comparison_figure(results, metric).savefig(filepath, dpi=100)
+        written.append(filepath)
+        if baseline is not None and metric in metrics_of(baseline):
+            filepath = os.path.join(directory, f'aceleracion_{metric}.png')
+            speedup_figure(baseline, results, metric).savefig(filepath, dpi=100)
+            written.append(filepath)
+    return written
@@ -1,5 +1,15 @@
 import folium
 
+from src.data_loader import PROCESSED_FILES, dataset_hash
+from src.graph.indices import RouteIndex
+from src.instrumentacion import timed
+from src.visualizations.capas import add_network_layers, network_layers
+
+
+# Mismo archivo y huella (aeropuertos y rutas) que MapView/generar_mapas.py
+GLOBAL_LAYERS_PATH = 'data/processed/red_global.json'
+GLOBAL_LAYERS_FILES = PROCESSED_FILES[:2]
+
 
 def get_price_color(price):
     if price < 200:
@@ -12,9 +22,12 @@ def get_price_color(price):
         return '#FF0000', 'Muy Caro'
 
 
-def create_route_map(airports, routes, origin, destination, path=None):
+@timed('mapa.create_route_map')
+def create_route_map(airports, routes, origin, destination, path=None, route_index=None):
     if origin not in airports or destination not in airports:
         return None
+    if route_index is None:
+        route_index = RouteIndex(routes)
 
     origin_airport = airports[origin]
     dest_airport = airports[destination]
@@ -28,8 +41,8 @@ def create_route_map(airports, routes, origin, destination, path=None):
         tiles='OpenStreetMap'
     )
 
-    origin_connections = len([r for r in routes if r['origen'] == origin or r['destino'] == origin])
-    dest_connections = len([r for r in routes if r['origen'] == destination or r['destino'] == destination])
+    origin_connections = route_index.connections(origin)
+    dest_connections = route_index.connections(destination)
 
     folium.CircleMarker(
         location=[origin_airport['latitud'], origin_airport['longitud']],
@@ -59,10 +72,7 @@ def create_route_map(airports, routes, origin, destination, path=None):
         fillOpacity=0.8
     ).add_to(map_obj)
 
-    direct_routes = [
-        r for r in routes
-        if r['origen'] == origin and r['destino'] == destination
-    ]
+    direct_routes = route_index.direct_routes(origin, destination)
 
     if direct_routes:
         avg_price = sum(r['price_usd'] for r in direct_routes) / len(direct_routes)
@@ -125,7 +135,7 @@ def create_route_map(airports, routes, origin, destination, path=None):
                 ).add_to(map_obj)
 
                 if i > 0 and i < len(path) - 1:
-                    connections = len([r for r in routes if r['origen'] == curr_code or r['destino'] == curr_code])
+                    connections = route_index.connections(curr_code)
                     folium.CircleMarker(
                         location=[curr_airport['latitud'], curr_airport['longitud']],
                         radius=9,
@@ -143,32 +153,19 @@ def create_route_map(airports, routes, origin, destination, path=None):
     return map_obj
 
 
-def create_global_map(airports, routes, sample_size=500):
+def create_global_map(airports, routes, layers=None, cache_path=GLOBAL_LAYERS_PATH, version=None):
+    # Toda la red, sin muestreo: rutas agregadas por nivel de zoom y
+    # aeropuertos agrupados en clusters
     map_obj = folium.Map(
         location=[20, 0],
         zoom_start=2,
         tiles='OpenStreetMap'
     )
 
-    import random
-    sampled_routes = random.sample(routes, min(sample_size, len(routes)))
-
-    for route in sampled_routes:
-        origin_code = route['origen']
-        dest_code = route['destino']
-
-        if origin_code in airports and dest_code in airports:
-            origin_airport = airports[origin_code]
-            dest_airport = airports[dest_code]
-
-            folium.PolyLine(
-                locations=[
-                    [origin_airport['latitud'], origin_airport['longitud']],
-                    [dest_airport['latitud'], dest_airport['longitud']]
-                ],
-                color='blue',
-                weight=1,
-                opacity=0.3
-            ).add_to(map_obj)
+    if layers is None:
+        if version is None:
+            version = dataset_hash(GLOBAL_LAYERS_FILES)
+        layers = network_layers(airports, routes, cache_path=cache_path, version=version)
+    add_network_layers(map_obj, layers, color='blue')
 
     return map_obj
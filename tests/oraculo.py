@@ -0,0 +1,158 @@
+import itertools
+import math
+import random
+
+import pytest
+
+from src.algorithms.all_pairs import attach_all_pairs, build_all_pairs
+from src.algorithms.alt import attach_landmarks, build_landmarks
+from src.algorithms.astar import LOWER_BOUNDS
+from src.algorithms.contraction import attach_hierarchies, build_hierarchies
+from src.calculators.distancia import haversine
+from src.graph.grafo import CompiledGraph
+
+
+METRICS = ('price_usd', 'duration_min')
+MAIN_CODES = ('A', 'B', 'C', 'D', 'E', 'F', 'G', 'H')
+ALL_CODES = MAIN_CODES + ('W', 'Y', 'Z')
+
+
+def airport(code, lat=0.0, lon=0.0, pais='Test'):
+    return {'nombre': code, 'ciudad': code, 'pais': pais, 'latitud': lat, 'longitud': lon}
+
+
+def _bound(metric, airports, origin, destination):
+    a = airports[origin]
+    b = airports[destination]
+    distance = haversine(a['latitud'], a['longitud'], b['latitud'], b['longitud'])
+    return math.ceil(float(LOWER_BOUNDS[metric](distance)))
+
+
+def route(airports, origin, destination, rng, admissible=True, airline='XX'):
+    # Con admissible los pesos no bajan de la cota de gran circulo de A*;
+    # sin ella son arbitrarios y la cota deja de valer
+    if admissible:
+        price = _bound('price_usd', airports, origin, destination) + rng.randint(0, 600)
+        duration = _bound('duration_min', airports, origin, destination) + rng.randint(0, 400)
+    else:
+        price = rng.randint(5, 900)
+        duration = rng.randint(5, 600)
+    return {
+        'origen': origin, 'destino': destination, 'aerolinea': airline,
+        'price_usd': price, 'duration_min': duration
+    }
+
+
+def network(seed=8, geo=False, admissible=True, density=0.35):
+    # Red pequeña con rutas paralelas, una componente aparte (Y-Z) y un
+    # aeropuerto sin rutas (W) para los casos inalcanzables
+    rng = random.Random(seed)
+    airports = {
+        code: airport(code, rng.uniform(-12, 12), rng.uniform(-12, 12)) if geo else airport(code)
+        for code in ALL_CODES
+    }
+    routes = []
+    for i, origin in enumerate(MAIN_CODES):
+        for destination in MAIN_CODES[i + 1:]:
+            if rng.random() < density:
+                for k in range(rng.randint(1, 2)):
+                    routes.append(route(airports, origin, destination, rng, admissible, f'X{k}'))
+    routes.append(route(airports, 'Y', 'Z', rng, admissible))
+    return airports, routes
+
+
+def compile_network(seed=8, geo=False, admissible=True, density=0.35):
+    airports, routes = network(seed, geo, admissible, density)
+    return CompiledGraph(airports, routes)
+
+
+def attach_index(graph, index, directory):
+    # Construye en directory el indice precalculado y lo carga como lo
+    # haria la app (firma incluida)
+    if index == 'ch':
+        build_hierarchies(graph, directory)
+        attach_hierarchies(graph, directory)
+    elif index == 'alt':
+        build_landmarks(graph, directory, count=3)
+        attach_landmarks(graph, directory)
+    elif index == 'apsp':
+        for metric in METRICS:
+            build_all_pairs(graph, metric, directory)
+        attach_all_pairs(graph, directory)
+    return graph
+
+
+def pairs(graph):
+    return [(origin, destination) for origin in graph.codes for destination in graph.codes if origin != destination]
+
+
+def brute_force(graph, origin, destination, max_stops, metric):
+    # Recorre todos los caminos simples con a lo sumo max_stops + 1 tramos
+    # y devuelve el costo minimo con todos los caminos que lo alcanzan
+    source = graph.index[origin]
+    target = graph.index[destination]
+    weights = graph.weights[metric]
+    best = [float('inf'), []]
+
+    def visit(node, cost, path):
+        if node == target:
+            if cost < best[0] - 1e-9:
+                best[0], best[1] = cost, [list(path)]
+            elif abs(cost - best[0]) <= 1e-9:
+                best[1].append(list(path))
+            return
+        if len(path) - 1 == max_stops + 1:
+            return
+        for edge in graph.neighbors(node):
+            next_node = graph.targets[edge]
+            if next_node in path:
+                continue
+            path.append(next_node)
+            visit(next_node, cost + weights[edge], path)
+            path.pop()
+
+    visit(source, 0, [source])
+    if not best[1]:
+        return None, []
+    return best[0], [[graph.codes[node] for node in path] for path in best[1]]
+
+
+def brute_force_constrained(graph, origin, destination, max_stops, metric, constraints):
+    # Mejor costo de cada secuencia de aeropuertos, eligiendo la ruta de
+    # cada tramo entre las paralelas y quedandose con las que cumplen las
+    # restricciones
+    best = {}
+
+    def visit(node, path):
+        if node == destination:
+            options = [graph.edge_routes(graph.find_edge(graph.index[a], graph.index[b])) for a, b in zip(path, path[1:])]
+            for routes in itertools.product(*options):
+                if constraints.allows(list(routes), graph.airports):
+                    cost = len(routes) if metric == 'hops' else sum(route[metric] for route in routes)
+                    best[tuple(path)] = min(cost, best.get(tuple(path), float('inf')))
+            return
+        if len(path) - 1 == max_stops + 1:
+            return
+        for edge in graph.neighbors(graph.index[node]):
+            next_node = graph.codes[graph.targets[edge]]
+            if next_node not in path:
+                path.append(next_node)
+                visit(next_node, path)
+                path.pop()
+
+    visit(origin, [origin])
+    return best
+
+
+def check(graph, result, origin, destination, max_stops, metric):
+    cost, optimal_paths = brute_force(graph, origin, destination, max_stops, metric)
+    if cost is None:
+        assert result is None
+        return
+    assert result is not None
+    assert result['total_cost'] == pytest.approx(cost)
+    assert result['path'] in optimal_paths
+    assert result['total_stops'] == len(result['path']) - 2
+    assert result['total_stops'] <= max_stops
+    assert [route['origen'] for route in result['routes']] == result['path'][:-1]
+    assert [route['destino'] for route in result['routes']] == result['path'][1:]
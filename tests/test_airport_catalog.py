@@ -0,0 +1,11 @@
+from src.airport_catalog import AirportCatalog
+
+from oraculo import ALL_CODES, airport
+
+
+def test_limit_applies_to_every_query():
+    catalog = AirportCatalog({code: airport(code) for code in ALL_CODES}, ALL_CODES)
+    for query in ('', '   ', 'test'):
+        assert len(catalog.search(query, 3)) == 3
+    assert catalog.search('', 100) == sorted(ALL_CODES)
+    assert catalog.search('', 2) == sorted(ALL_CODES)[:2]
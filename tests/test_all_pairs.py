@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from src.algorithms.all_pairs import AllPairsMatrix, _paths, active_nodes, build_all_pairs
+from src.graph.grafo import CompiledGraph
+
+from oraculo import METRICS, brute_force, check, compile_network, network, pairs
+
+
+GRAPHS = [(8, 0.35), (13, 0.6), (29, 0.2)]
+
+
+@pytest.mark.parametrize('seed, density', GRAPHS)
+@pytest.mark.parametrize('metric', METRICS)
+def test_matrix_matches_brute_force(seed, density, metric, tmp_path):
+    graph = compile_network(seed, admissible=False, density=density)
+    build_all_pairs(graph, metric, str(tmp_path))
+    matrix = AllPairsMatrix.load(graph, metric, str(tmp_path))
+    assert 'W' not in matrix.codes
+    for origin, destination in pairs(graph):
+        cost, _ = brute_force(graph, origin, destination, len(graph), metric)
+        found = matrix.lookup(origin, destination)
+        result = matrix.query(graph, origin, destination)
+        check(graph, result, origin, destination, len(graph), metric)
+        if cost is None:
+            assert found is None
+        else:
+            assert found == (cost, len(result['path']) - 1)
+
+
+def test_parallel_build_writes_same_matrix(tmp_path):
+    graph = compile_network(13, admissible=False, density=0.6)
+    for workers in (1, 2):
+        (tmp_path / str(workers)).mkdir()
+        build_all_pairs(graph, 'price_usd', str(tmp_path / str(workers)), workers=workers, chunk_size=3)
+    single = _paths(str(tmp_path / '1'), 'price_usd')
+    parallel = _paths(str(tmp_path / '2'), 'price_usd')
+    for part in ('cost', 'hops', 'pred'):
+        assert np.array_equal(np.load(single[part]), np.load(parallel[part]))
+    assert len(np.load(single['cost'])) == len(active_nodes(graph))
+
+
+def test_reload_requires_matching_signature(tmp_path):
+    airports, routes = network(8, admissible=False)
+    build_all_pairs(CompiledGraph(airports, routes), 'price_usd', str(tmp_path))
+    assert AllPairsMatrix.load(CompiledGraph(airports, routes), 'price_usd', str(tmp_path)) is not None
+    routes[0] = dict(routes[0], price_usd=routes[0]['price_usd'] + 1)
+    assert AllPairsMatrix.load(CompiledGraph(airports, routes), 'price_usd', str(tmp_path)) is None
@@ -0,0 +1,56 @@
+import pytest
+
+from src.algorithms.alt import LandmarkIndex, attach_landmarks, build_landmarks, find_shortest_path_alt, load_landmarks
+from src.algorithms.dijkstra import find_shortest_path_compiled, single_source
+from src.graph.grafo import CompiledGraph
+
+from oraculo import check, compile_network, network, pairs
+
+
+ALT_METRICS = ('price_usd', 'duration_min', 'hops')
+GRAPHS = [(8, 0.35), (13, 0.6), (29, 0.2)]
+
+
+@pytest.mark.parametrize('seed, density', GRAPHS)
+@pytest.mark.parametrize('count', [1, 3])
+def test_heuristic_is_consistent_and_admissible(seed, density, count):
+    graph = compile_network(seed, geo=True, admissible=False, density=density)
+    index = LandmarkIndex.build(graph, count=count)
+    for metric in ALT_METRICS:
+        weights = graph.weights[metric]
+        for target in range(len(graph)):
+            h = index.heuristic(target, metric)
+            exact = single_source(graph, target, metric, reverse=True)[0]
+            assert h[target] == 0
+            for node in range(len(graph)):
+                assert h[node] <= exact[node] + 1e-6
+            for edge in range(graph.edge_count):
+                assert h[graph.sources[edge]] <= weights[edge] + h[graph.targets[edge]] + 1e-6
+
+
+@pytest.mark.parametrize('seed, density', GRAPHS)
+@pytest.mark.parametrize('metric', ALT_METRICS)
+def test_query_matches_brute_force(seed, density, metric, tmp_path):
+    graph = compile_network(seed, geo=True, admissible=False, density=density)
+    build_landmarks(graph, str(tmp_path), count=3)
+    assert attach_landmarks(graph, str(tmp_path)) is not None
+    for origin, destination in pairs(graph):
+        result = find_shortest_path_alt(graph, origin, destination, metric)
+        check(graph, result, origin, destination, len(graph), metric)
+
+
+def test_reload_requires_matching_signatures(tmp_path):
+    airports, routes = network(13, geo=True, admissible=False, density=0.6)
+    build_landmarks(CompiledGraph(airports, routes), str(tmp_path), count=3)
+    assert load_landmarks(CompiledGraph(airports, routes), str(tmp_path)) is not None
+
+    # Cambiar una sola metrica invalida el indice entero
+    routes[0] = dict(routes[0], duration_min=routes[0]['duration_min'] + 1)
+    changed = CompiledGraph(airports, routes)
+    assert load_landmarks(changed, str(tmp_path)) is None
+    assert attach_landmarks(changed, str(tmp_path)) is None
+    assert 'alt' not in changed.derived
+    assert find_shortest_path_alt(changed, 'A', 'B') is None
+    for origin, destination in pairs(changed):
+        result = find_shortest_path_compiled(changed, origin, destination, 999, 'duration_min')
+        check(changed, result, origin, destination, 999, 'duration_min')
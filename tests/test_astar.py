@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.algorithms.astar import LOWER_BOUNDS, find_shortest_path_astar, heuristic, heuristic_is_valid
+from src.algorithms.dijkstra import single_source
+from src.calculators.distancia import haversine
+from src.calculators.duracion import calculate_flight_durations
+from src.calculators.precio import calculate_route_prices
+from src.graph.grafo import CompiledGraph
+
+from oraculo import MAIN_CODES, METRICS, airport, check, compile_network, pairs
+
+
+def _calculator_network(seed):
+    # Pesos tal como los generan los calculadores, sobre distancias largas
+    # y cortas (el minimo de precio y el tiempo fijo pesan en los cortos)
+    rng = random.Random(seed)
+    airports = {code: airport(code, rng.uniform(-50, 50), rng.uniform(-90, 90)) for code in MAIN_CODES}
+    airports['H'] = airport('H', airports['G']['latitud'] + 0.3, airports['G']['longitud'] - 0.2)
+    legs = [(a, b) for i, a in enumerate(MAIN_CODES) for b in MAIN_CODES[i + 1:] if rng.random() < 0.5]
+    distances = [haversine(airports[a]['latitud'], airports[a]['longitud'],
+                           airports[b]['latitud'], airports[b]['longitud']) for a, b in legs]
+    prices = calculate_route_prices(distances, [a for a, _ in legs], [b for _, b in legs], ['XX'] * len(legs))
+    durations = calculate_flight_durations(distances)
+    routes = [
+        {'origen': a, 'destino': b, 'aerolinea': 'XX', 'price_usd': int(p), 'duration_min': int(d)}
+        for (a, b), p, d in zip(legs, prices, durations)
+    ]
+    return CompiledGraph(airports, routes)
+
+
+def _graphs():
+    return [compile_network(seed, geo=True) for seed in (8, 13)] + [_calculator_network(seed) for seed in (1, 2, 3)]
+
+
+@pytest.mark.parametrize('metric', METRICS)
+def test_bounds_never_exceed_calculator_weights(metric):
+    rng = np.random.default_rng(4)
+    distances = np.concatenate([rng.uniform(0, 600, 5000), rng.uniform(0, 20000, 5000)])
+    codes = [f'C{i}' for i in range(len(distances))]
+    if metric == 'price_usd':
+        weights = calculate_route_prices(distances, codes, codes[::-1])
+    else:
+        weights = calculate_flight_durations(distances)
+    assert np.all(np.asarray(weights) >= LOWER_BOUNDS[metric](distances))
+
+
+@pytest.mark.parametrize('metric', METRICS)
+def test_heuristic_is_consistent_and_admissible(metric):
+    for graph in _graphs():
+        assert heuristic_is_valid(graph, metric)
+        weights = graph.weights[metric]
+        for target in range(len(graph)):
+            h = heuristic(graph, target, metric)
+            exact = single_source(graph, target, metric, reverse=True)[0]
+            assert h[target] == 0
+            for edge in range(graph.edge_count):
+                assert h[graph.sources[edge]] <= weights[edge] + h[graph.targets[edge]] + 1e-9
+            for node in range(len(graph)):
+                assert h[node] <= exact[node] + 1e-9
+
+
+@pytest.mark.parametrize('metric', METRICS)
+def test_matches_brute_force(metric):
+    for graph in _graphs():
+        for origin, destination in pairs(graph):
+            result = find_shortest_path_astar(graph, origin, destination, metric)
+            check(graph, result, origin, destination, len(graph), metric)
+
+
+def test_weights_below_bound_disable_heuristic():
+    graph = compile_network(geo=True, admissible=False)
+    for metric in METRICS:
+        assert not heuristic_is_valid(graph, metric)
+    assert not heuristic_is_valid(graph, 'hops')
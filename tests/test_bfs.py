@@ -0,0 +1,39 @@
+import pytest
+
+from src.algorithms.bfs import find_fewest_stops
+
+from oraculo import METRICS, brute_force, check, compile_network, pairs
+
+
+GRAPHS = [(8, 0.35), (13, 0.6), (29, 0.2)]
+
+
+def _fewest_legs_cost(graph, origin, destination, legs, tie_break):
+    # Menor costo de desempate entre los caminos de exactamente legs tramos
+    cost, paths = brute_force(graph, origin, destination, legs - 1, tie_break)
+    shorter, _ = brute_force(graph, origin, destination, legs - 2, 'hops') if legs > 1 else (None, [])
+    assert shorter is None
+    return cost, paths
+
+
+@pytest.mark.parametrize('seed, density', GRAPHS)
+@pytest.mark.parametrize('max_stops', [0, 1, 2, 999])
+def test_fewest_stops_matches_brute_force(seed, density, max_stops):
+    graph = compile_network(seed, admissible=False, density=density)
+    for origin, destination in pairs(graph):
+        result = find_fewest_stops(graph, origin, destination, max_stops)
+        check(graph, result, origin, destination, max_stops, 'hops')
+
+
+@pytest.mark.parametrize('seed, density', GRAPHS)
+@pytest.mark.parametrize('tie_break', METRICS)
+def test_ties_go_to_cheapest_fewest_stop_path(seed, density, tie_break):
+    graph = compile_network(seed, admissible=False, density=density)
+    for origin, destination in pairs(graph):
+        result = find_fewest_stops(graph, origin, destination, tie_break=tie_break)
+        if result is None:
+            continue
+        legs = len(result['path']) - 1
+        cost, paths = _fewest_legs_cost(graph, origin, destination, legs, tie_break)
+        assert result['path'] in paths
+        assert sum(route[tie_break] for route in result['routes']) == pytest.approx(cost)
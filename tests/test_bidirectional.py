@@ -0,0 +1,26 @@
+import pytest
+
+from src.algorithms.dijkstra import find_shortest_path_bidirectional, find_shortest_path_forward
+
+from oraculo import METRICS, check, compile_network, pairs
+
+
+@pytest.mark.parametrize('seed, density', [(8, 0.35), (13, 0.6), (29, 0.2)])
+@pytest.mark.parametrize('metric', METRICS)
+def test_matches_brute_force_and_dijkstra(seed, density, metric):
+    graph = compile_network(seed, admissible=False, density=density)
+    for origin, destination in pairs(graph):
+        result = find_shortest_path_bidirectional(graph, origin, destination, metric)
+        check(graph, result, origin, destination, len(graph), metric)
+        forward = find_shortest_path_forward(graph, origin, destination, metric)
+        if result is None:
+            assert forward is None
+        else:
+            assert result['total_cost'] == pytest.approx(forward['total_cost'])
+
+
+def test_same_airport_is_empty_trip():
+    graph = compile_network()
+    result = find_shortest_path_bidirectional(graph, 'A', 'A')
+    assert result['path'] == ['A']
+    assert result['total_cost'] == 0
@@ -0,0 +1,106 @@
+import pytest
+
+from src.algorithms.astar import heuristic_is_valid
+from src.algorithms.constrained import (
+    find_shortest_path_constrained, find_shortest_path_constrained_multi, lower_bounds
+)
+from src.graph.grafo import CompiledGraph
+from src.validators.restricciones import Constraints
+
+from oraculo import METRICS, airport, attach_index, brute_force_constrained, network, pairs
+
+
+# Cota inferior con la que poda la busqueda: ninguna, gran circulo o landmarks
+BOUNDS = ('sin_cota', 'gran_circulo', 'alt')
+CONSTRAINTS = (
+    Constraints(max_price=900),
+    Constraints(max_duration=700, max_leg_price=500),
+    Constraints(max_price=1500, max_duration=1000, max_leg_duration=350),
+    Constraints(max_price=1200, banned_airports=['C']),
+    Constraints(max_duration=900, banned_countries=['Otro'])
+)
+
+
+@pytest.fixture(scope='module', params=BOUNDS)
+def bounded_graph(request, tmp_path_factory):
+    bound = request.param
+    airports, routes = network(13, geo=True, admissible=bound == 'gran_circulo', density=0.6)
+    airports['E'] = dict(airports['E'], pais='Otro')
+    if bound != 'gran_circulo':
+        # Un tramo bajo la cota de gran circulo la invalida
+        routes[0] = dict(routes[0], price_usd=1, duration_min=1)
+    graph = CompiledGraph(airports, routes)
+    if bound == 'alt':
+        attach_index(graph, 'alt', str(tmp_path_factory.mktemp('alt')))
+    for metric in METRICS:
+        assert heuristic_is_valid(graph, metric) == (bound == 'gran_circulo')
+        assert (lower_bounds(graph, {0}, metric) is None) == (bound == 'sin_cota')
+    return graph
+
+
+def _check(graph, result, best, constraints, max_stops, metric):
+    if not best:
+        assert result is None
+        return
+    assert result is not None
+    assert result['total_cost'] == pytest.approx(min(best.values()))
+    assert result['total_cost'] == pytest.approx(best[tuple(result['path'])])
+    assert constraints.allows(result['routes'], graph.airports)
+    assert result['total_stops'] == len(result['routes']) - 1 <= max_stops
+    if metric != 'hops':
+        assert sum(route[metric] for route in result['routes']) == pytest.approx(result['total_cost'])
+
+
+@pytest.mark.parametrize('constraints', CONSTRAINTS)
+@pytest.mark.parametrize('metric', METRICS + ('hops',))
+@pytest.mark.parametrize('max_stops', [0, 1, 2])
+def test_matches_brute_force(bounded_graph, constraints, metric, max_stops):
+    graph = bounded_graph
+    for origin, destination in pairs(graph):
+        best = brute_force_constrained(graph, origin, destination, max_stops, metric, constraints)
+        result = find_shortest_path_constrained(graph, origin, destination, constraints, max_stops, metric)
+        _check(graph, result, best, constraints, max_stops, metric)
+
+
+@pytest.mark.parametrize('constraints', CONSTRAINTS)
+@pytest.mark.parametrize('metric', METRICS)
+def test_multi_source_matches_best_pair(bounded_graph, constraints, metric):
+    graph = bounded_graph
+    origins, destinations = ['A', 'B', 'W'], ['F', 'G', 'H']
+    best = {}
+    for origin in origins:
+        for destination in destinations:
+            best.update(brute_force_constrained(graph, origin, destination, 2, metric, constraints))
+    result = find_shortest_path_constrained_multi(graph, origins, destinations, constraints, 2, metric)
+    _check(graph, result, best, constraints, 2, metric)
+
+
+def _leg(origin, destination, price, duration, airline='XX'):
+    return {'origen': origin, 'destino': destination, 'aerolinea': airline, 'price_usd': price, 'duration_min': duration}
+
+
+def test_faster_label_survives_cheaper_one():
+    # En B la etiqueta barata y lenta no domina a la cara y rapida: solo la
+    # segunda cabe en el tope de duracion
+    graph = CompiledGraph({code: airport(code) for code in 'ABC'}, [
+        _leg('A', 'B', 100, 500, 'LENTA'),
+        _leg('A', 'B', 400, 100, 'RAPIDA'),
+        _leg('B', 'C', 100, 100)
+    ])
+    result = find_shortest_path_constrained(graph, 'A', 'C', Constraints(max_duration=400), 1, 'price_usd')
+    assert result['total_cost'] == 500
+    assert result['routes'][0]['aerolinea'] == 'RAPIDA'
+
+
+def test_fewer_legs_label_survives_cheaper_one():
+    # En C la etiqueta barata de dos tramos no domina a la directa: con una
+    # escala solo la directa puede seguir hasta D
+    graph = CompiledGraph({code: airport(code) for code in 'ABCD'}, [
+        _leg('A', 'B', 10, 10),
+        _leg('B', 'C', 10, 10),
+        _leg('A', 'C', 100, 100),
+        _leg('C', 'D', 10, 10)
+    ])
+    result = find_shortest_path_constrained(graph, 'A', 'D', Constraints(max_price=500), 1, 'price_usd')
+    assert result['path'] == ['A', 'C', 'D']
+    assert result['total_cost'] == 110
@@ -0,0 +1,59 @@
+import pytest
+
+from src.algorithms.contraction import build_hierarchies, build_hierarchy, load_hierarchy
+from src.graph.grafo import CompiledGraph
+
+from oraculo import METRICS, check, compile_network, network, pairs
+
+
+GRAPHS = [(8, 0.35), (13, 0.6), (29, 0.8)]
+
+
+def _check_query(graph, hierarchy, metric):
+    for origin, destination in pairs(graph):
+        result = hierarchy.query(graph, origin, destination)
+        check(graph, result, origin, destination, len(graph), metric)
+        if result is not None:
+            # El costo sale de la jerarquia; las rutas, del desempaquetado
+            assert sum(route[metric] for route in result['routes']) == pytest.approx(result['total_cost'])
+
+
+@pytest.mark.parametrize('seed, density', GRAPHS)
+@pytest.mark.parametrize('metric', METRICS)
+@pytest.mark.parametrize('settle_limit', [60, 1])
+def test_query_matches_brute_force(seed, density, metric, settle_limit):
+    # Con settle_limit=1 la busqueda de testigos casi nunca encuentra uno y
+    # sobran atajos, pero la consulta debe seguir siendo exacta
+    graph = compile_network(seed, admissible=False, density=density)
+    _check_query(graph, build_hierarchy(graph, metric, settle_limit), metric)
+
+
+@pytest.mark.parametrize('seed, density', GRAPHS)
+@pytest.mark.parametrize('metric', METRICS)
+def test_shortcuts_unpack_to_original_edges(seed, density, metric):
+    graph = compile_network(seed, admissible=False, density=density)
+    hierarchy = build_hierarchy(graph, metric, settle_limit=1)
+    weights = graph.weights[metric]
+    assert hierarchy.shortcut_count > 0
+    for u in range(len(graph)):
+        for k in range(hierarchy.offsets[u], hierarchy.offsets[u + 1]):
+            v = hierarchy.targets[k]
+            assert hierarchy.rank[u] < hierarchy.rank[v]
+            edges = []
+            hierarchy._unpack(u, v, edges, graph)
+            assert graph.sources[edges[0]] == u and graph.targets[edges[-1]] == v
+            assert all(graph.targets[a] == graph.sources[b] for a, b in zip(edges, edges[1:]))
+            assert sum(weights[edge] for edge in edges) == pytest.approx(hierarchy.weights[k])
+
+
+def test_saved_hierarchy_reloads_only_for_same_graph(tmp_path):
+    airports, routes = network(13, admissible=False, density=0.6)
+    graph = CompiledGraph(airports, routes)
+    build_hierarchies(graph, str(tmp_path))
+    for metric in METRICS:
+        _check_query(graph, load_hierarchy(graph, metric, str(tmp_path)), metric)
+
+    routes[0] = dict(routes[0], price_usd=routes[0]['price_usd'] + 1)
+    changed = CompiledGraph(airports, routes)
+    assert load_hierarchy(changed, 'price_usd', str(tmp_path)) is None
+    assert load_hierarchy(changed, 'duration_min', str(tmp_path)) is not None
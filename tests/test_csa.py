@@ -0,0 +1,108 @@
+from datetime import datetime
+
+import pytest
+
+from src.algorithms.csa import Timetable, earliest_arrival, profile
+
+from oraculo import network
+
+
+START = datetime(2026, 3, 2)
+# Tiempos de conexion distintos por aeropuerto, incluido uno sin espera
+OVERRIDES = {'B': 0, 'C': 120, 'E': 240}
+
+
+def _timetable(seed, density):
+    airports, routes = network(seed, admissible=False, density=density)
+    return Timetable.generate(airports, routes, START, days=2, overrides=OVERRIDES)
+
+
+def _brute_force(timetable, origin, destination, departure, max_legs):
+    # Recorre todas las secuencias de conexiones sin repetir aeropuerto que
+    # respetan el tiempo minimo de conexion; poda las que ya salen despues
+    # de la mejor llegada conocida
+    source = timetable.index[origin]
+    target = timetable.index[destination]
+    by_stop = {}
+    for c in range(len(timetable)):
+        by_stop.setdefault(timetable.dep_stop[c], []).append(c)
+    best = [float('inf')]
+
+    def visit(stop, ready, legs, seen):
+        for c in by_stop.get(stop, ()):
+            if timetable.dep_time[c] < ready or timetable.dep_time[c] >= best[0]:
+                continue
+            next_stop = timetable.arr_stop[c]
+            if next_stop in seen:
+                continue
+            arrival = timetable.arr_time[c]
+            if next_stop == target:
+                best[0] = min(best[0], arrival)
+            elif legs + 1 < max_legs:
+                visit(next_stop, arrival + timetable.minimum_connection[next_stop], legs + 1, seen | {next_stop})
+
+    visit(source, departure, 0, {source})
+    return None if best[0] == float('inf') else best[0]
+
+
+def _check_journey(timetable, journey, origin, destination, departure, max_stops):
+    legs = journey['legs']
+    assert journey['path'][0] == origin and journey['path'][-1] == destination
+    assert legs[0]['salida'] >= departure
+    for leg, next_leg in zip(legs, legs[1:]):
+        assert leg['destino'] == next_leg['origen']
+        minimum = timetable.minimum_connection[timetable.index[leg['destino']]]
+        assert next_leg['salida'] >= leg['llegada'] + minimum
+    if max_stops is not None:
+        assert journey['total_stops'] <= max_stops
+
+
+@pytest.mark.parametrize('seed, density', [(8, 0.35), (13, 0.6)])
+@pytest.mark.parametrize('max_stops', [0, 1, 2, None])
+def test_earliest_arrival_matches_brute_force(seed, density, max_stops):
+    timetable = _timetable(seed, density)
+    max_legs = len(timetable.codes) if max_stops is None else max_stops + 1
+    for departure in (0, 9 * 60, 20 * 60):
+        for origin in timetable.codes:
+            for destination in timetable.codes:
+                if origin == destination:
+                    continue
+                expected = _brute_force(timetable, origin, destination, departure, max_legs)
+                journey = earliest_arrival(timetable, origin, destination, departure, max_stops)
+                if expected is None:
+                    assert journey is None
+                    continue
+                assert journey['llegada'] == expected
+                _check_journey(timetable, journey, origin, destination, departure, max_stops)
+
+
+@pytest.mark.parametrize('seed, density', [(8, 0.35), (13, 0.6)])
+def test_profile_matches_earliest_arrival(seed, density):
+    # Cada viaje del perfil es la llegada mas temprana desde su salida, y
+    # para cada hora de la ventana el mejor viaje del perfil que sale
+    # despues llega igual que un barrido de llegada mas temprana, salvo que
+    # a esa llegada tambien se llegue saliendo despues de la ventana (ese
+    # viaje lo domina y el perfil no lo devuelve)
+    timetable = _timetable(seed, density)
+    window_start, window_end = 6 * 60, 22 * 60
+    for origin in ('A', 'B', 'D'):
+        for destination in timetable.codes:
+            if origin == destination:
+                continue
+            journeys = profile(timetable, origin, destination, window_start, window_end)
+            for journey in journeys:
+                _check_journey(timetable, journey, origin, destination, window_start, None)
+                assert window_start <= journey['salida'] <= window_end
+                found = earliest_arrival(timetable, origin, destination, journey['salida'])
+                assert found['llegada'] == journey['llegada']
+            after = earliest_arrival(timetable, origin, destination, window_end)
+            after = float('inf') if after is None else after['llegada']
+            for departure in range(window_start, window_end + 1, 30):
+                found = earliest_arrival(timetable, origin, destination, departure)
+                best = min((j['llegada'] for j in journeys if j['salida'] >= departure), default=float('inf'))
+                if found is None:
+                    assert best == float('inf')
+                    continue
+                assert best >= found['llegada']
+                if found['llegada'] < after:
+                    assert best == found['llegada']
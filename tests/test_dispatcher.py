@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from src.algorithms.astar import heuristic_is_valid
+from src.algorithms.dijkstra import HOP_BOUNDED_LIMIT, find_shortest_path_compiled
+from src.graph.grafo import CompiledGraph
+
+from oraculo import METRICS, airport, attach_index, check, compile_network, pairs, route
+
+
+# Rama del despacho que resuelve las consultas sin limite efectivo de escalas
+BRANCHES = ('bidireccional', 'astar', 'ch', 'alt', 'apsp')
+STOP_LIMITS = (0, 1, 2, 3, HOP_BOUNDED_LIMIT, HOP_BOUNDED_LIMIT + 1, 999)
+
+
+def _prepare(graph, branch, directory):
+    if branch in ('ch', 'alt', 'apsp'):
+        attach_index(graph, branch, directory)
+    return graph
+
+
+@pytest.fixture(scope='module', params=BRANCHES)
+def branch_graph(request, tmp_path_factory):
+    # Pesos bajo la cota de gran circulo dejan a A* fuera y el despacho
+    # termina en Dijkstra bidireccional
+    branch = request.param
+    graph = compile_network(geo=True, admissible=branch != 'bidireccional')
+    return branch, _prepare(graph, branch, str(tmp_path_factory.mktemp(branch)))
+
+
+def test_branch_is_selected(branch_graph):
+    branch, graph = branch_graph
+    for metric in METRICS:
+        assert heuristic_is_valid(graph, metric) == (branch != 'bidireccional')
+        assert (('ch', metric) in graph.derived) == (branch == 'ch')
+        assert (('apsp', metric) in graph.derived) == (branch == 'apsp')
+    assert ('alt' in graph.derived) == (branch == 'alt')
+
+
+@pytest.mark.parametrize('metric', METRICS)
+@pytest.mark.parametrize('max_stops', STOP_LIMITS)
+def test_dispatcher_matches_brute_force(branch_graph, max_stops, metric):
+    _, graph = branch_graph
+    for origin, destination in pairs(graph):
+        result = find_shortest_path_compiled(graph, origin, destination, max_stops, metric)
+        check(graph, result, origin, destination, max_stops, metric)
+
+
+def _chain_graph(admissible):
+    # Cadena de HOP_BOUNDED_LIMIT + 4 aeropuertos (HOP_BOUNDED_LIMIT + 2
+    # escalas) mas barata que el vuelo directo entre sus extremos
+    rng = random.Random(3)
+    codes = [f'C{i:02d}' for i in range(HOP_BOUNDED_LIMIT + 4)]
+    airports = {code: airport(code, 0.0, 2.0 * i) for i, code in enumerate(codes)}
+    routes = [route(airports, a, b, rng, admissible) for a, b in zip(codes, codes[1:])]
+    direct = route(airports, codes[0], codes[-1], rng, admissible)
+    direct['price_usd'] += 100000
+    direct['duration_min'] += 100000
+    routes.append(direct)
+    if not admissible:
+        routes[0]['price_usd'] = routes[0]['duration_min'] = 1
+    return codes, CompiledGraph(airports, routes)
+
+
+@pytest.mark.parametrize('branch', BRANCHES)
+def test_long_optimum_over_stop_limit_falls_back(branch, tmp_path):
+    # El optimo global usa HOP_BOUNDED_LIMIT + 2 escalas: con limite
+    # HOP_BOUNDED_LIMIT + 1 el motor de la rama lo encuentra igual y el
+    # despacho debe rehacer la busqueda con el motor acotado
+    codes, graph = _chain_graph(branch != 'bidireccional')
+    _prepare(graph, branch, str(tmp_path))
+    origin, destination = codes[0], codes[-1]
+    for metric in METRICS:
+        assert heuristic_is_valid(graph, metric) == (branch != 'bidireccional')
+        for max_stops in (HOP_BOUNDED_LIMIT + 1, HOP_BOUNDED_LIMIT + 2, 999):
+            result = find_shortest_path_compiled(graph, origin, destination, max_stops, metric)
+            check(graph, result, origin, destination, max_stops, metric)
+        assert find_shortest_path_compiled(graph, origin, destination, 999, metric)['path'] == codes
+        result = find_shortest_path_compiled(graph, origin, destination, HOP_BOUNDED_LIMIT + 1, metric)
+        assert result['path'] == [origin, destination]
@@ -0,0 +1,58 @@
+import pytest
+
+from src.algorithms.dijkstra import find_shortest_path, find_shortest_path_compiled
+from src.algorithms.hop_bounded import find_shortest_path_hop_bounded
+from src.graph.grafo import CompiledGraph, Graph
+
+from oraculo import METRICS, airport, check, compile_network, network, pairs
+
+
+@pytest.fixture(scope='module')
+def graph():
+    return compile_network()
+
+
+@pytest.mark.parametrize('metric', METRICS)
+@pytest.mark.parametrize('max_stops', [0, 1, 2, 3])
+def test_hop_bounded_matches_brute_force(graph, max_stops, metric):
+    for origin, destination in pairs(graph):
+        result = find_shortest_path_hop_bounded(graph, origin, destination, max_stops, metric)
+        check(graph, result, origin, destination, max_stops, metric)
+
+
+@pytest.mark.parametrize('metric, optimization', [('price_usd', 'precio'), ('duration_min', 'duracion')])
+def test_dict_graph_uses_exact_engine(metric, optimization):
+    # El Graph de diccionarios pasa por el mismo despacho: optimo exacto con
+    # max_stops y total_stops en escalas
+    airports, routes = network()
+    graph = Graph()
+    graph.build_from_data(airports, routes, optimization)
+    compiled = graph.compiled()
+    for max_stops in range(4):
+        for origin, destination in pairs(compiled):
+            result = find_shortest_path(graph, origin, destination, max_stops, metric)
+            check(compiled, result, origin, destination, max_stops, metric)
+
+
+def test_unreachable_pairs(graph):
+    for origin, destination in (('A', 'Y'), ('Z', 'B'), ('A', 'W'), ('W', 'Y')):
+        for max_stops in range(4):
+            assert find_shortest_path_hop_bounded(graph, origin, destination, max_stops) is None
+            assert find_shortest_path_compiled(graph, origin, destination, max_stops) is None
+
+
+def test_stop_limit_forces_more_expensive_route():
+    # Cadena barata A-B-C-D contra el vuelo directo caro A-D
+    routes = [
+        {'origen': 'A', 'destino': 'B', 'aerolinea': 'XX', 'price_usd': 100, 'duration_min': 60},
+        {'origen': 'B', 'destino': 'C', 'aerolinea': 'XX', 'price_usd': 100, 'duration_min': 60},
+        {'origen': 'C', 'destino': 'D', 'aerolinea': 'XX', 'price_usd': 100, 'duration_min': 60},
+        {'origen': 'A', 'destino': 'D', 'aerolinea': 'XX', 'price_usd': 1000, 'duration_min': 300}
+    ]
+    graph = CompiledGraph({code: airport(code) for code in 'ABCD'}, routes)
+
+    expected = {0: (['A', 'D'], 1000), 1: (['A', 'D'], 1000), 2: (['A', 'B', 'C', 'D'], 300)}
+    for max_stops, (path, cost) in expected.items():
+        result = find_shortest_path_hop_bounded(graph, 'A', 'D', max_stops)
+        assert result['path'] == path
+        assert result['total_cost'] == cost
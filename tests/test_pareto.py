@@ -0,0 +1,59 @@
+from src.algorithms.pareto import find_pareto_front
+from src.graph.grafo import CompiledGraph
+
+from oraculo import network, pairs
+
+
+def _brute_force_front(routes, origin, destination, max_stops):
+    # Vectores (precio, duracion, escalas) de todos los itinerarios simples
+    # con rutas paralelas incluidas, sin los dominados
+    legs = {}
+    for route in routes:
+        legs.setdefault(route['origen'], []).append((route['destino'], route))
+        legs.setdefault(route['destino'], []).append((route['origen'], route))
+    vectors = set()
+
+    def visit(node, price, duration, path):
+        if node == destination:
+            vectors.add((price, duration, len(path) - 2))
+            return
+        if len(path) - 1 == max_stops + 1:
+            return
+        for next_node, route in legs.get(node, ()):
+            if next_node not in path:
+                path.append(next_node)
+                visit(next_node, price + route['price_usd'], duration + route['duration_min'], path)
+                path.pop()
+
+    visit(origin, 0, 0, [origin])
+    return {
+        v for v in vectors
+        if not any(w != v and all(a <= b for a, b in zip(w, v)) for w in vectors)
+    }
+
+
+def test_front_matches_brute_force():
+    airports, routes = network()
+    graph = CompiledGraph(airports, routes)
+    for max_stops in range(3):
+        for origin, destination in pairs(graph):
+            front, truncated = find_pareto_front(graph, origin, destination, max_stops, max_labels=1000, max_front=1000)
+            assert not truncated
+            vectors = {(x['total_price'], x['total_duration'], x['total_stops']) for x in front}
+            assert len(vectors) == len(front)
+            assert vectors == _brute_force_front(routes, origin, destination, max_stops)
+
+
+def test_caps_flag_truncated_front():
+    airports, routes = network()
+    graph = CompiledGraph(airports, routes)
+    flagged = 0
+    for origin, destination in pairs(graph):
+        full, _ = find_pareto_front(graph, origin, destination, 2, max_labels=1000, max_front=1000)
+        front, truncated = find_pareto_front(graph, origin, destination, 2, max_labels=1000, max_front=1)
+        if len(full) > 1:
+            assert truncated and len(front) == 1
+            flagged += 1
+        elif not truncated:
+            assert front == full
+    assert flagged
@@ -0,0 +1,29 @@
+import threading
+
+from src.query_cache import QueryCache
+
+
+def test_stats_is_consistent_under_concurrent_lookups():
+    cache = QueryCache(max_entries=16)
+    snapshots = []
+
+    def worker(offset):
+        for i in range(2000):
+            cache.get_or_compute((offset, i % 40), lambda: i)
+
+    def reader():
+        for _ in range(500):
+            snapshots.append(cache.stats())
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)] + [threading.Thread(target=reader)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for stats in snapshots:
+        assert stats['size'] <= 16
+        assert 0.0 <= stats['hit_rate'] <= 1.0
+    final = cache.stats()
+    assert final['hits'] + final['misses'] == 4 * 2000
+    assert len(cache) == final['size'] == 16
@@ -0,0 +1,51 @@
+from src.algorithms.constrained import find_shortest_path_constrained, lower_bounds
+from src.algorithms.dijkstra import find_shortest_path_compiled
+from src.validators.restricciones import Constraints, active_constraints
+
+from oraculo import METRICS, compile_network, pairs
+
+
+def test_defaults_every_leg_satisfies_are_dropped():
+    graph = compile_network()
+    leg_price, leg_duration = graph.leg_bounds()
+    defaults = Constraints(max_leg_duration=24 * 60, max_leg_price=leg_price, banned_airports=['ZZZ'])
+    assert leg_duration < 24 * 60
+    assert active_constraints(defaults, graph) is None
+    assert active_constraints(Constraints(max_price=leg_price * 3), graph, max_stops=2) is None
+
+
+def test_binding_limits_are_kept():
+    graph = compile_network()
+    leg_price, leg_duration = graph.leg_bounds()
+    for constraints in (
+        Constraints(max_leg_price=leg_price - 1),
+        Constraints(max_leg_duration=leg_duration - 1),
+        Constraints(max_price=leg_price * 3 - 1),
+        Constraints(banned_airports=['A'])
+    ):
+        assert active_constraints(constraints, graph, max_stops=2).key() == constraints.key()
+
+
+def test_dropped_defaults_do_not_change_results():
+    graph = compile_network()
+    defaults = Constraints(max_price=10 ** 6, max_duration=10 ** 6, max_leg_duration=24 * 60)
+    for metric in METRICS:
+        for origin, destination in pairs(graph):
+            fast = find_shortest_path_compiled(graph, origin, destination, 2, metric, defaults)
+            labels = find_shortest_path_constrained(graph, origin, destination, defaults, 2, metric)
+            assert (fast is None) == (labels is None)
+            if fast is not None:
+                assert fast['total_cost'] == labels['total_cost']
+
+
+def test_budget_without_admissible_bound():
+    # Con pesos bajo la cota de gran circulo no hay cota inferior: los
+    # topes de presupuesto deben podar solo con lo acumulado
+    graph = compile_network(seed=21, admissible=False, density=0.5)
+    constraints = Constraints(max_price=1200, max_duration=900)
+    for metric in METRICS:
+        assert lower_bounds(graph, {0}, metric) is None
+        for origin, destination in pairs(graph):
+            result = find_shortest_path_constrained(graph, origin, destination, constraints, 2, metric)
+            if result is not None:
+                assert constraints.allows(result['routes'], graph.airports)
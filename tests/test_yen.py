@@ -0,0 +1,68 @@
+import pytest
+
+from src.algorithms.yen import find_k_shortest_paths
+from src.graph.grafo import CompiledGraph
+from src.validators.restricciones import Constraints
+
+from oraculo import METRICS, brute_force_constrained, compile_network, network, pairs
+
+
+def _brute_force_sequences(graph, origin, destination, max_stops, metric):
+    # Costo de cada secuencia simple de aeropuertos en el grafo colapsado
+    weights = graph.weights[metric]
+    costs = {}
+
+    def visit(node, cost, path):
+        if node == graph.index[destination]:
+            costs[tuple(graph.codes[n] for n in path)] = cost
+            return
+        if len(path) - 1 == max_stops + 1:
+            return
+        for edge in graph.neighbors(node):
+            if graph.targets[edge] not in path:
+                path.append(graph.targets[edge])
+                visit(graph.targets[edge], cost + weights[edge], path)
+                path.pop()
+
+    visit(graph.index[origin], 0, [graph.index[origin]])
+    return costs
+
+
+@pytest.mark.parametrize('seed, density', [(8, 0.35), (13, 0.6)])
+@pytest.mark.parametrize('metric', METRICS + ('hops',))
+@pytest.mark.parametrize('max_stops', [1, 2, 999])
+def test_matches_brute_force(seed, density, metric, max_stops):
+    graph = compile_network(seed, admissible=False, density=density)
+    for origin, destination in pairs(graph):
+        costs = _brute_force_sequences(graph, origin, destination, max_stops, metric)
+        found = find_k_shortest_paths(graph, origin, destination, 6, max_stops, metric)
+        assert [x['total_cost'] for x in found] == pytest.approx(sorted(costs.values())[:6])
+        assert len({tuple(x['path']) for x in found}) == len(found)
+        for itinerary in found:
+            assert itinerary['total_cost'] == pytest.approx(costs[tuple(itinerary['path'])])
+            assert itinerary['total_stops'] <= max_stops
+
+
+# Topes que obligan a cambiar de ruta en la raiz de los desvios
+CONSTRAINTS = (
+    Constraints(max_price=1200, max_leg_duration=400),
+    Constraints(max_duration=700),
+    Constraints(max_price=900, max_duration=900)
+)
+
+
+@pytest.mark.parametrize('seed', [1, 4, 5])
+@pytest.mark.parametrize('constraints', CONSTRAINTS, ids=['tramo', 'duracion', 'presupuesto'])
+@pytest.mark.parametrize('metric', METRICS)
+def test_constrained_matches_brute_force(seed, constraints, metric):
+    airports, routes = network(seed, admissible=False, density=0.5)
+    graph = CompiledGraph(airports, routes)
+    for origin, destination in pairs(graph):
+        best = brute_force_constrained(graph, origin, destination, 2, metric, constraints)
+        found = find_k_shortest_paths(graph, origin, destination, 6, 2, metric, constraints)
+        assert [x['total_cost'] for x in found] == pytest.approx(sorted(best.values())[:6])
+        assert len({tuple(x['path']) for x in found}) == len(found)
+        for itinerary in found:
+            assert constraints.allows(itinerary['routes'], airports)
+            assert itinerary['total_cost'] == sum(route[metric] for route in itinerary['routes'])
+            assert itinerary['total_cost'] == best[tuple(itinerary['path'])]
@@ -1,16 +1,31 @@
+from datetime import datetime
 import streamlit as st
 import sys
 import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.data_loader import load_airports, load_routes, load_airlines
+from src.data_loader import load_processed_data, dataset_version, dataset_hash
+from src.query_cache import QueryCache
+from src.instrumentacion import snapshot, stage, start_run
+from src.validators.ruta_factible import schedule_path
+from src.validators.restricciones import Constraints
+from src.airport_catalog import catalog_from_graph
 from src.visualizations.mapa import create_route_map
-from src.graph.grafo import Graph
-from src.algorithms.dijkstra import find_shortest_path
+from src.graph.grafo import CompiledGraph, metric_for
+from src.graph.indices import RouteIndex
+from src.algorithms.dijkstra import find_shortest_path_nearby
+from src.algorithms.pareto import find_pareto_front
+from src.algorithms.yen import find_k_shortest_paths
+from src.algorithms.all_pairs import attach_all_pairs
+from src.algorithms.csa import Timetable, earliest_arrival
+from src.algorithms.dfs import reachability_index
+from src.algorithms.alt import attach_landmarks
+from src.algorithms.contraction import attach_hierarchies
 from ui.components.search import render_search_form
 from ui.components.filters import render_filters
-from ui.components.results import render_results
+from ui.components.results import render_results, render_pareto_front, render_k_shortest, render_timetable
+from ui.components.timings import render_timings
 
 
 st.set_page_config(
@@ -21,27 +36,76 @@ st.set_page_config(
 
 
 
-@st.cache_data
-def load_data():
-    airports = load_airports()
-    routes = load_routes()
-    airlines = load_airlines()
-    return airports, routes, airlines
+@st.cache_resource(max_entries=1)
+def load_data(version):
+    return load_processed_data()
+
+
+@st.cache_resource(max_entries=1)
+def load_graph(version):
+    airports, routes, _ = load_data(version)
+    graph = CompiledGraph(airports, routes)
+    attach_hierarchies(graph)
+    attach_landmarks(graph)
+    attach_all_pairs(graph)
+    reachability_index(graph)
+    return graph
+
+
+@st.cache_resource(max_entries=1)
+def load_route_index(version):
+    _, routes, _ = load_data(version)
+    return RouteIndex(routes)
+
+
+@st.cache_resource(max_entries=2)
+def load_timetable(version, start_date):
+    airports, routes, _ = load_data(version)
+    start = datetime.combine(start_date, datetime.min.time())
+    return Timetable.generate(airports, routes, start, route_index=load_route_index(version))
+
+
+@st.cache_resource(max_entries=1)
+def load_catalog(version):
+    return catalog_from_graph(load_graph(version))
+
+
+QUERY_CACHE_PATH = 'data/processed/query_cache.json'
+
+
+@st.cache_resource(max_entries=1)
+def load_query_cache(version):
+    # Compartida entre sesiones; arranca caliente desde disco con las
+    # entradas de la misma huella de contenido
+    content_hash = dataset_hash()
+    cache = QueryCache(max_entries=1024, ttl=24 * 3600, filepath=QUERY_CACHE_PATH)
+    cache.load(valid=lambda key: key[0] == content_hash)
+    cache.save_at_exit()
+    return content_hash, cache
 
 
 def main():
+    # El panel de tiempos se dibuja al final, pero su estado decide desde el
+    # inicio si esta ejecucion se mide
+    start_run(enabled=st.session_state.get('show_timings', False))
+
     st.title("Optimizador de Rutas de Vuelo")
     st.markdown("Encuentra las mejores rutas de vuelo con conexiones optimas")
     st.markdown("---")
 
-    airports, routes, airlines = load_data()
+    with stage('Carga de datos'):
+        version = dataset_version()
+        airports, routes, airlines = load_data(version)
 
     with st.sidebar:
         st.header("Buscar Vuelos")
-        origin, destination = render_search_form(airports, routes)
+        with stage('Grafo e indices'):
+            graph = load_graph(version)
+            catalog = load_catalog(version)
+        origin, destination = render_search_form(catalog, reachability_index(graph).reachable_from)
 
         st.header("Filtros")
-        filters = render_filters()
+        filters = render_filters({airport['pais'] for airport in airports.values() if airport['pais']})
 
     if origin and destination:
         if origin == destination:
@@ -49,23 +113,67 @@ def main():
         else:
             st.header(f"Ruta: {origin} → {destination}")
 
-            graph = Graph()
-            graph.build_from_data(airports, routes, filters['optimization'])
+            content_hash, query_cache = load_query_cache(version)
+            metric = metric_for(filters['optimization'])
+            constraints = Constraints.from_filters(filters)
 
-            result = find_shortest_path(graph, origin, destination, filters['max_stops'])
+            with stage('Busqueda'):
+                result = query_cache.get_or_compute(
+                    (content_hash, origin, destination, metric, filters['max_stops'],
+                     filters['origin_radius'], filters['destination_radius'], constraints.key()),
+                    lambda: find_shortest_path_nearby(
+                        graph, origin, destination, filters['origin_radius'],
+                        filters['destination_radius'], filters['max_stops'], metric, constraints
+                    )
+                )
 
             if result:
                 path = result['path']
+                if path[0] != origin or path[-1] != destination:
+                    st.info(f"Mejor opcion cercana: {path[0]} → {path[-1]}")
+                    origin, destination = path[0], path[-1]
                 route_list = result['routes']
                 total_cost = result['total_cost']
                 total_stops = result['total_stops']
 
-                map_obj = create_route_map(airports, routes, origin, destination, path)
-                if map_obj:
-                    from streamlit_folium import st_folium
-                    st_folium(map_obj, width=1400, height=600)
-
-                render_results(route_list, origin, destination, filters, airports, result)
+                with stage('Mapa'):
+                    route_index = load_route_index(version)
+                    map_obj = create_route_map(airports, routes, origin, destination, path, route_index)
+                    if map_obj:
+                        from streamlit_folium import st_folium
+                        st_folium(map_obj, width=1400, height=600)
+
+                with stage('Resultados'):
+                    render_results(route_list, origin, destination, filters, airports, result, route_index)
+
+                if filters['use_timetable']:
+                    st.markdown("---")
+                    with stage('Horarios'):
+                        timetable = load_timetable(version, filters['departure'].date())
+                        departure = timetable.to_minutes(filters['departure'])
+                        max_stops = filters['max_stops'] if filters['filters_enabled'] else None
+                        journey = earliest_arrival(
+                            timetable, origin, destination, departure, max_stops, constraints
+                        )
+                        scheduled = schedule_path(timetable, path, departure, constraints)
+                        render_timetable(journey, scheduled, timetable, not constraints.is_empty())
+
+                if filters['compare_alternatives']:
+                    st.markdown("---")
+                    with stage('Frente de Pareto'):
+                        front, truncated = find_pareto_front(
+                            graph, origin, destination, min(filters['max_stops'], 3), constraints=constraints
+                        )
+                        render_pareto_front(front, airports, truncated)
+
+                if filters['alternatives'] > 0:
+                    st.markdown("---")
+                    with stage('Itinerarios alternativos'):
+                        itineraries = find_k_shortest_paths(
+                            graph, origin, destination, filters['alternatives'],
+                            filters['max_stops'], metric, constraints
+                        )
+                        render_k_shortest(itineraries, airports, not constraints.is_empty())
             else:
                 st.error("No se encontraron rutas entre los aeropuertos seleccionados")
     else:
@@ -80,6 +188,18 @@ def main():
         with col3:
             st.metric("Total Aerolineas", len(airlines))
 
+    stats = load_query_cache(version)[1].stats()
+    if stats['hits'] + stats['misses']:
+        st.sidebar.caption(
+            f"Cache de busquedas: {stats['size']} entradas, "
+            f"{stats['hit_rate']:.0%} de aciertos ({stats['hits']}/{stats['hits'] + stats['misses']})"
+        )
+
+    with st.sidebar:
+        if st.checkbox("Tiempos por etapa", key='show_timings',
+                       help="Mide la carga, el grafo, la busqueda y el mapa de esta ejecucion"):
+            render_timings(snapshot())
+
 
 if __name__ == "__main__":
     main()
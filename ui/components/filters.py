@@ -1,7 +1,9 @@
+from datetime import date, datetime, time
+
 import streamlit as st
 
 
-def render_filters():
+def render_filters(countries=()):
     apply_filters = st.checkbox("Aplicar Filtros", value=False)
 
     if apply_filters:
@@ -28,10 +30,34 @@ def render_filters():
             value=2,
             step=1
         )
+
+        max_leg_duration = st.slider(
+            "Duracion Maxima por Tramo (horas)",
+            min_value=1,
+            max_value=24,
+            value=24,
+            step=1
+        )
+
+        banned_countries = st.multiselect(
+            "Evitar paises",
+            options=sorted(countries),
+            default=[]
+        )
+
+        banned_text = st.text_input(
+            "Evitar aeropuertos",
+            value="",
+            placeholder="Codigos separados por coma, p. ej. MIA, PTY"
+        )
+        banned_airports = [code.strip().upper() for code in banned_text.split(',') if code.strip()]
     else:
         max_price = 999999
         max_duration = 999999
         max_stops = 999
+        max_leg_duration = 999999
+        banned_countries = []
+        banned_airports = []
 
     optimization = st.radio(
         "Optimizar por",
@@ -39,10 +65,64 @@ def render_filters():
         index=0
     )
 
+    origin_radius = st.slider(
+        "Radio de origen (km)",
+        min_value=0,
+        max_value=500,
+        value=0,
+        step=25,
+        help="Permite salir desde cualquier aeropuerto cercano al origen"
+    )
+
+    destination_radius = st.slider(
+        "Radio de destino (km)",
+        min_value=0,
+        max_value=500,
+        value=0,
+        step=25,
+        help="Permite llegar a cualquier aeropuerto cercano al destino"
+    )
+
+    use_timetable = st.checkbox(
+        "Considerar horarios",
+        value=False,
+        help="Busca salidas concretas que conecten respetando el tiempo minimo de conexion"
+    )
+    departure = None
+    if use_timetable:
+        departure_date = st.date_input("Fecha de salida", value=date.today())
+        departure_time = st.time_input("Salir a partir de", value=time(6, 0), step=1800)
+        departure = datetime.combine(departure_date, departure_time)
+
+    compare_alternatives = st.checkbox(
+        "Comparar alternativas",
+        value=False,
+        help="Muestra todas las opciones no dominadas en precio, duracion y escalas"
+    )
+
+    alternatives = st.slider(
+        "Itinerarios alternativos",
+        min_value=0,
+        max_value=10,
+        value=0,
+        step=1,
+        help="Muestra los N mejores itinerarios con distinta secuencia de aeropuertos"
+    )
+
     return {
         'max_price': max_price,
         'max_duration': max_duration * 60 if apply_filters else max_duration,
         'max_stops': max_stops,
+        'max_leg_price': None,
+        'max_leg_duration': max_leg_duration * 60 if apply_filters else max_leg_duration,
+        'banned_airports': banned_airports,
+        'banned_countries': banned_countries,
         'optimization': optimization.lower(),
-        'filters_enabled': apply_filters
+        'filters_enabled': apply_filters,
+        'origin_radius': origin_radius,
+        'destination_radius': destination_radius,
+        'use_timetable': use_timetable,
+        'departure': departure,
+        'compare_alternatives': compare_alternatives,
+        'alternatives': alternatives
     }
@@ -1,11 +1,13 @@
 import streamlit as st
 from src.calculators.duracion import minutes_to_hours_format
+from src.graph.indices import RouteIndex
 
 
-def render_results(routes, origin, destination, filters, airports, dijkstra_result=None):
+def render_results(routes, origin, destination, filters, airports, dijkstra_result=None, route_index=None):
     if dijkstra_result:
         path = dijkstra_result['path']
         route_list = dijkstra_result['routes']
+        alternatives = dijkstra_result.get('alternatives')
         total_cost = dijkstra_result['total_cost']
         total_stops = dijkstra_result['total_stops']
 
@@ -51,6 +53,10 @@ def render_results(routes, origin, destination, filters, airports, dijkstra_resu
                     st.markdown(f"{route['distance_km']} km")
 
                 st.markdown(f"**Aerolinea:** {route['aerolinea']}")
+                if alternatives and len(alternatives[idx - 1]) > 1:
+                    others = sorted({r['aerolinea'] for r in alternatives[idx - 1]} - {route['aerolinea']})
+                    if others:
+                        st.markdown(f"**Otras aerolineas:** {', '.join(others)}")
                 st.markdown(f"**Desde:** {airports[origin_code]['ciudad']}, {airports[origin_code]['pais']} ({origin_code})")
                 st.markdown(f"**Hasta:** {airports[dest_code]['ciudad']}, {airports[dest_code]['pais']} ({dest_code})")
 
@@ -59,10 +65,9 @@ def render_results(routes, origin, destination, filters, airports, dijkstra_resu
         route_text = " → ".join([f"{code} ({airports[code]['ciudad']})" for code in path])
         st.markdown(route_text)
     else:
-        direct_routes = [
-            r for r in routes
-            if r['origen'] == origin and r['destino'] == destination
-        ]
+        if route_index is None:
+            route_index = RouteIndex(routes)
+        direct_routes = route_index.direct_routes(origin, destination)
 
         filtered_routes = [
             r for r in direct_routes
@@ -104,3 +109,85 @@ def render_results(routes, origin, destination, filters, airports, dijkstra_resu
                 st.markdown(f"**Aerolinea:** {route['aerolinea']}")
                 st.markdown(f"**Desde:** {airports[origin]['ciudad']}, {airports[origin]['pais']}")
                 st.markdown(f"**Hasta:** {airports[destination]['ciudad']}, {airports[destination]['pais']}")
+
+
+def _itinerary_rows(itineraries):
+    rows = []
+    for itinerary in itineraries:
+        routes = itinerary['routes']
+        rows.append({
+            'Ruta': " → ".join(itinerary['path']),
+            'Precio (USD)': sum(route['price_usd'] for route in routes),
+            'Duracion': minutes_to_hours_format(sum(route['duration_min'] for route in routes)),
+            'Escalas': itinerary['total_stops'],
+            'Aerolineas': ", ".join(route['aerolinea'] for route in routes)
+        })
+    return rows
+
+
+def render_pareto_front(front, airports, truncated=False):
+    if not front:
+        st.warning("No se encontraron alternativas con las escalas permitidas")
+        return
+
+    st.markdown(f"### Alternativas no dominadas ({len(front)})")
+    st.caption("Ninguna opcion es mejor que otra en precio, duracion y escalas a la vez")
+    if truncated:
+        st.info(
+            "La busqueda alcanzo su limite de alternativas: el frente es aproximado "
+            "y puede faltar alguna opcion no dominada"
+        )
+
+    st.table(_itinerary_rows(sorted(front, key=lambda x: (x['total_price'], x['total_duration']))))
+
+
+def render_k_shortest(itineraries, airports, constrained=False):
+    if len(itineraries) <= 1:
+        if constrained:
+            st.info("No hay itinerarios alternativos que cumplan los filtros")
+        else:
+            st.info("No hay itinerarios alternativos con las escalas permitidas")
+        return
+
+    st.markdown(f"### Mejores {len(itineraries)} itinerarios")
+    if constrained:
+        st.caption("Solo itinerarios dentro del presupuesto, los limites por tramo y sin aeropuertos excluidos")
+    st.table(_itinerary_rows(itineraries))
+
+
+def _timetable_rows(timetable, legs):
+    rows = []
+    for leg in legs:
+        rows.append({
+            'Tramo': f"{leg['origen']} → {leg['destino']}",
+            'Sale': timetable.to_datetime(leg['salida']).strftime('%d/%m %H:%M'),
+            'Llega': timetable.to_datetime(leg['llegada']).strftime('%d/%m %H:%M'),
+            'Aerolinea': leg.get('aerolinea', '-'),
+            'Precio (USD)': leg.get('price_usd', '-')
+        })
+    return rows
+
+
+def render_timetable(journey, scheduled, timetable, constrained=False):
+    st.markdown("### Itinerario con horarios")
+    st.caption("Horarios generados por ruta; las conexiones respetan el tiempo minimo de cada aeropuerto")
+    if constrained:
+        st.caption("Con los filtros activos solo se usan salidas que los cumplen")
+
+    if journey:
+        total = journey['llegada'] - journey['salida']
+        st.markdown(
+            f"**Llegada mas temprana:** {timetable.to_datetime(journey['llegada']).strftime('%d/%m %H:%M')} "
+            f"({minutes_to_hours_format(total)} puerta a puerta, {journey['total_stops']} escala(s))"
+        )
+        st.table(_timetable_rows(timetable, journey['legs']))
+    elif constrained:
+        st.warning("No hay salidas que conecten dentro del horizonte del horario y cumplan los filtros")
+    else:
+        st.warning("No hay salidas que conecten dentro del horizonte del horario")
+
+    if scheduled is None:
+        st.info("La ruta optima sin horarios no tiene conexiones validas en estas fechas")
+    elif not journey or [leg['destino'] for leg in scheduled] != journey['path'][1:]:
+        st.markdown("**Ruta optima con sus primeras salidas disponibles:**")
+        st.table(_timetable_rows(timetable, scheduled))
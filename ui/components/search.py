@@ -1,52 +1,82 @@
 import streamlit as st
 
 
-def render_search_form(airports, routes):
-    airports_with_routes = set()
-    for route in routes:
-        airports_with_routes.add(route['origen'])
-        airports_with_routes.add(route['destino'])
-
-    airport_codes = sorted([code for code in airports.keys() if code in airports_with_routes])
-    airport_options = {
-        code: f"{airports[code]['ciudad']}, {airports[code]['pais']} ({code})"
-        for code in airport_codes
-    }
+SEARCH_LIMIT = 50
 
+
+def _airport_select(label, catalog, options_source, default_code, key):
+    # Escribir en el buscador reduce la lista con el indice del catalogo en
+    # lugar de desplazarse por miles de aeropuertos
+    query = st.text_input(f"Buscar {label.lower()}", key=f"{key}_query", placeholder="Codigo, ciudad, pais o nombre")
+    if query:
+        options = catalog.search(query, SEARCH_LIMIT)
+        if options_source is not None:
+            allowed = set(options_source)
+            options = [code for code in options if code in allowed]
+    else:
+        options = options_source if options_source is not None else catalog.codes
+
+    if not options:
+        st.caption("Sin coincidencias")
+        return None
+
+    # Con estado previo manda la sesion (index=0 evita el aviso de Streamlit)
+    index = 0
+    if key not in st.session_state and default_code in options:
+        index = options.index(default_code)
+    return st.selectbox(
+        label,
+        options=options,
+        format_func=catalog.label,
+        index=index,
+        key=key
+    )
+
+
+def _destination_select(catalog, destination_source):
+    dest_default = None
+    if st.session_state.swap_airports and 'last_origin' in st.session_state:
+        dest_default = st.session_state.last_origin
+        st.session_state.destination_select = dest_default
+        st.session_state.destination_select_query = ''
+    elif 'destination_select' not in st.session_state:
+        codes = destination_source or catalog.codes
+        dest_default = codes[1] if len(codes) > 1 and destination_source is None else codes[0]
+
+    return _airport_select("Aeropuerto de Destino", catalog, destination_source, dest_default, "destination_select")
+
+
+def render_search_form(catalog, reachable_from=None):
     if 'swap_airports' not in st.session_state:
         st.session_state.swap_airports = False
 
-    origin_default = 0
+    origin_default = None
     if st.session_state.swap_airports and 'last_destination' in st.session_state:
-        try:
-            origin_default = airport_codes.index(st.session_state.last_destination)
-        except ValueError:
-            origin_default = 0
-
-    origin = st.selectbox(
-        "Aeropuerto de Origen",
-        options=airport_codes,
-        format_func=lambda x: airport_options[x],
-        index=origin_default,
-        key="origin_select"
-    )
+        origin_default = st.session_state.last_destination
+        st.session_state.origin_select = origin_default
+        st.session_state.origin_select_query = ''
 
-    dest_default = 1 if len(airport_codes) > 1 else 0
-    if st.session_state.swap_airports and 'last_origin' in st.session_state:
-        try:
-            dest_default = airport_codes.index(st.session_state.last_origin)
-        except ValueError:
-            dest_default = 1
-
-    destination = st.selectbox(
-        "Aeropuerto de Destino",
-        options=airport_codes,
-        format_func=lambda x: airport_options[x],
-        index=dest_default,
-        key="destination_select"
-    )
+    origin = _airport_select("Aeropuerto de Origen", catalog, None, origin_default, "origin_select")
+
+    destination_source = None
+    if reachable_from is not None and origin and st.checkbox(
+        "Solo destinos alcanzables",
+        value=False,
+        help="Oculta los aeropuertos sin ninguna conexion posible desde el origen"
+    ):
+        reachable = reachable_from(origin)
+        destination_source = [code for code in catalog.codes if code in reachable and code != origin]
+
+    if destination_source == []:
+        # Aeropuerto aislado: se dice explicitamente en lugar de ofrecer
+        # destinos a los que no hay forma de llegar
+        st.warning(f"No hay destinos alcanzables desde {origin}")
+        destination = None
+    else:
+        destination = _destination_select(catalog, destination_source)
 
-    if st.button("⇄ Invertir Ruta", help="Intercambiar origen y destino", use_container_width=True):
+    if st.button("⇄ Invertir Ruta", help="Intercambiar origen y destino", use_container_width=True,
+                 disabled=destination is None):
         st.session_state.swap_airports = True
         st.session_state.last_origin = origin
         st.session_state.last_destination = destination
@@ -0,0 +1,34 @@
+import streamlit as st
+
+
+COUNTER_LABELS = {
+    'queries': 'Consultas',
+    'settled': 'Asentados',
+    'relaxed': 'Aristas',
+    'heap_pushes': 'Inserciones',
+    'heap_pops': 'Extracciones',
+    'stale_pops': 'Obsoletas'
+}
+
+
+def render_timings(snapshot):
+    stages = snapshot['stages']
+    if not stages:
+        st.caption("Sin mediciones en esta ejecucion")
+        return
+
+    # Solo las etapas de primer nivel suman el total; las anidadas son su detalle
+    total = sum(ms for _, depth, ms in stages if depth == 0 and ms is not None)
+    st.caption(f"Total medido: {total:.1f} ms")
+    st.table([
+        {
+            'Etapa': '· ' * depth + name,
+            'ms': f"{ms:.1f}" if ms is not None else '-',
+            '%': f"{ms / total:.0%}" if ms is not None and total and depth == 0 else ''
+        }
+        for name, depth, ms in stages
+    ])
+
+    for engine, counters in snapshot['counters'].items():
+        st.markdown(f"**{engine}**")
+        st.table([{COUNTER_LABELS[name]: value for name, value in counters.items()}])